@@ -1,13 +1,57 @@
 import os
 import time
 
-from flask import Flask, send_from_directory
+from flask import Flask, current_app, jsonify, request, send_from_directory
 from flask_cors import CORS
 from backend.database import db
+from backend.startup import DatabaseBootstrap, StartupReport, get_bootstrap
+from backend.utils import metrics
+from backend.utils.metrics import REGISTRY
+from backend.utils.tracing import tracer
+
+
+def _start_indexer(app):
+    """
+    VoteCast indexer thread (see indexer_service).
+    """
+    from backend.services.indexer_service import start_indexer
+    try:
+        start_indexer(app)
+    except Exception as exc:
+        print(f"⚠ Indexer not started: {exc}")
+
+
+def start_background_tasks(app):
+    """
+    Database bootstrap thread; the indexer starts once the DB is ready.
+    """
+    get_bootstrap(app).start(on_ready=[_start_indexer])
+
+
+@REGISTRY.collector
+def _collect_app_state():
+    """
+    Scrape-time gauges for state other objects already track.
+    """
+    from backend.services.face_service import face_index, frame_encoder
+
+    cache = frame_encoder.cache.stats()
+    return [
+        ("voting_face_cache_lookups_total", "counter", "Frame cache lookups by result.",
+         [({"result": "hit"}, cache["hits"]), ({"result": "miss"}, cache["misses"])]),
+        ("voting_face_cache_bytes", "gauge", "Bytes held by the frame cache.",
+         [({}, cache["bytes"])]),
+        ("voting_face_index_size", "gauge", "Encodings in the in-memory face index.",
+         [({}, len(face_index))]),
+        ("voting_database_ready", "gauge", "1 once the database bootstrap has finished.",
+         [({}, int(get_bootstrap(current_app).ready))]),
+    ]
 
 
 def create_app():
 
+    startup = StartupReport()
+
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
     # =====================================================
@@ -40,14 +84,17 @@ def create_app():
     app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL", default_sqlite)
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
-    db.init_app(app)
-    CORS(app)
+    with startup.phase("extensions"):
+        db.init_app(app)
+        CORS(app)
 
     # =====================================================
     # BLUEPRINTS
+    # (face_recognition / cv2 / web3 load on first use, see utils/lazy.py)
     # =====================================================
-    from backend.routes.admin_routes import admin_bp
-    from backend.routes.voter_routes import voter_bp
+    with startup.phase("blueprints"):
+        from backend.routes.admin_routes import admin_bp
+        from backend.routes.voter_routes import voter_bp
 
     print("REGISTERING BLUEPRINTS...")
 
@@ -59,26 +106,89 @@ def create_app():
 
 
     # =====================================================
-    # DATABASE WAIT + CREATE TABLES
+    # RPC CALLS PER REQUEST (X-RPC-Calls HEADER)
     # =====================================================
-    from sqlalchemy import text
+    from backend.services.chain_common import start_rpc_count, current_rpc_count
+
+    @app.before_request
+    def _start_rpc_count():
+        start_rpc_count()
 
-    def wait_for_db(max_attempts=10, delay=2):
-        for attempt in range(1, max_attempts + 1):
-            try:
-                print(f"⏳ Checking Database (Attempt {attempt})")
-                with app.app_context():
-                    db.session.execute(text("SELECT 1"))
-                print("✅ Database Ready!")
-                return
-            except Exception as exc:
-                print(f"❌ DB not ready: {exc}")
-                time.sleep(delay)
-        print("⚠ Continuing even though DB not confirmed.")
+    @app.after_request
+    def _report_rpc_count(response):
+        response.headers["X-RPC-Calls"] = str(current_rpc_count())
+        return response
+
+    # =====================================================
+    # METRICS (GET /metrics, PROMETHEUS TEXT FORMAT)
+    # Registered before the readiness guard so 503s are timed too.
+    # =====================================================
+    @app.before_request
+    def _start_request_metrics():
+        request.environ["metrics.start"] = time.perf_counter()
+        request.environ["metrics.blueprint"] = request.blueprint or "app"
+        metrics.REQUESTS_IN_FLIGHT.inc(request.environ["metrics.blueprint"])
+
+    @app.after_request
+    def _observe_request(response):
+        started = request.environ.get("metrics.start")
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            metrics.REQUEST_SECONDS.observe(
+                time.perf_counter() - started, route, request.method, str(response.status_code)
+            )
+        return response
+
+    @app.teardown_request
+    def _finish_request_metrics(exc=None):
+        blueprint = request.environ.pop("metrics.blueprint", None)
+        if blueprint is not None:
+            metrics.REQUESTS_IN_FLIGHT.dec(blueprint)
+
+    @app.route("/metrics")
+    def metrics_endpoint():
+        return REGISTRY.render(), 200, {"Content-Type": metrics.CONTENT_TYPE}
 
-    with app.app_context():
-        wait_for_db()
-        db.create_all()
+    # =====================================================
+    # SLOW-REQUEST TRACES + SAMPLED PROFILES (OPT-IN)
+    # TRACE_ENABLED=1 or POST /admin/tracing, see utils/tracing.py
+    # =====================================================
+    tracer.init_app(app)
+
+    # =====================================================
+    # DATABASE READINESS (NON-BLOCKING)
+    # ping → create_all → migrations → face index run on a
+    # background thread; /readyz reports progress and the API
+    # answers 503 until it is done.
+    # =====================================================
+    bootstrap = DatabaseBootstrap(app)
+    app.extensions["db_bootstrap"] = bootstrap
+
+    @app.before_request
+    def _require_database():
+        if request.blueprint in ("admin", "voter") and not bootstrap.ready:
+            return jsonify({
+                "error": "Database not ready",
+                "last_error": bootstrap.last_error
+            }), 503, {"Retry-After": "2"}
+
+    @app.route("/healthz")
+    def healthz():
+        return jsonify({"status": "ok"}), 200
+
+    @app.route("/readyz")
+    def readyz():
+        status = bootstrap.status()
+        return jsonify(status), 200 if status["ready"] else 503
+
+    # =====================================================
+    # BACKGROUND THREADS
+    # Threads do not survive fork(): under a pre-forking server
+    # (gunicorn.conf.py) they are started in each worker instead.
+    # =====================================================
+    if os.getenv("DEFER_BACKGROUND_TASKS", "0") != "1":
+        with startup.phase("background_tasks"):
+            start_background_tasks(app)
 
     # =====================================================
     # FRONTEND STATIC ROUTES
@@ -137,6 +247,86 @@ def create_app():
         """
         return send_from_directory(app.config["UPLOAD_FOLDER"], filename)
 
+    # =====================================================
+    # CLI COMMANDS
+    # =====================================================
+    import click
+
+    def require_database():
+        if not bootstrap.wait_ready(float(os.getenv("DB_WAIT_TIMEOUT", "60"))):
+            raise click.ClickException(f"Database not ready: {bootstrap.last_error}")
+
+    @app.cli.command("face-index-report")
+    @click.option("--queries", default=200, help="Number of probe queries")
+    @click.option("--nprobe", default=None, type=int, help="Partitions scanned per query")
+    def face_index_report(queries, nprobe):
+        """Recall/latency of the approximate face index vs exact scan."""
+        require_database()
+        import json
+        from backend.services.face_service import face_index
+
+        print(json.dumps(face_index.recall_report(queries, nprobe=nprobe), indent=2))
+
+    @app.cli.command("migrate-face-encodings")
+    @click.option("--batch-size", default=500, help="Rows per UPDATE batch")
+    def migrate_face_encodings_command(batch_size):
+        """Convert legacy JSON face encodings to packed float32."""
+        require_database()
+        from backend.migrations import migrate_face_encodings
+
+        converted = migrate_face_encodings(batch_size=batch_size)
+        for table, count in converted.items():
+            print(f"{table}: {count} rows converted")
+
+    @app.cli.command("backfill-voter-hashes")
+    @click.option("--batch-size", default=500, help="Rows per UPDATE batch")
+    def backfill_voter_hashes_command(batch_size):
+        """Compute voter.voter_hash for voters registered before the column existed."""
+        require_database()
+        from backend.migrations import backfill_voter_hashes
+
+        print(f"voter: {backfill_voter_hashes(batch_size=batch_size)} hashes filled")
+
+    @app.cli.command("import-voters")
+    @click.argument("csv_path", type=click.Path(exists=True, dir_okay=False))
+    @click.argument("zip_path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--report", "report_path", default="import_report.csv",
+                  help="Where to write the per-row CSV report")
+    @click.option("--dry-run", is_flag=True, help="Validate and dedupe without inserting")
+    @click.option("--tolerance", default=0.45, help="Face distance treated as a duplicate")
+    def import_voters_command(csv_path, zip_path, report_path, dry_run, tolerance):
+        """Bulk-enroll voters from a CSV (name,enrollment[,image]) and a zip of photos."""
+        require_database()
+        import json
+        from backend.services.bulk_import_service import BulkImportService
+
+        service = BulkImportService(tolerance=tolerance)
+        summary, report = service.import_voters(csv_path, zip_path, dry_run=dry_run)
+        service.write_report(report, report_path)
+
+        print(json.dumps(summary, indent=2))
+        print(f"Report written to {report_path}")
+
+    @app.cli.command("check-query-plans")
+    @click.option("--mysql-url", default=lambda: os.getenv("QUERY_PLAN_MYSQL_URL"),
+                  help="Also EXPLAIN against this MySQL database")
+    def check_query_plans_command(mysql_url):
+        """Fail if any hot ORM query falls back to a full table scan."""
+        require_database()
+        from backend.utils.query_plans import check_query_plans
+
+        ok, reports = check_query_plans(mysql_url=mysql_url)
+        for dialect, report in reports.items():
+            for name, entry in report.items():
+                status = "FULL SCAN" if entry["full_scans"] else "ok"
+                print(f"[{dialect}] {name}: {status}")
+                for step in entry["plan"]:
+                    print(f"    {step}")
+
+        if not ok:
+            raise SystemExit(1)
+
+    startup.log_once()
     return app
 
 
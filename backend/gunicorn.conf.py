@@ -0,0 +1,60 @@
+# backend/gunicorn.conf.py
+#
+# Production server config:
+#   gunicorn -c backend/gunicorn.conf.py backend.wsgi:app
+#
+# Sizing (face paths are CPU bound, everything else waits on I/O):
+#   - WEB_CONCURRENCY gunicorn workers (default 2), each with
+#     GUNICORN_THREADS request threads (default 8, gthread workers)
+#   - face encoding runs in each worker's FrameEncoder process pool, so
+#     FACE_WORKERS defaults to CPU cores / workers: cores are split
+#     between workers instead of oversubscribed
+#   - pool processes are forked from the worker (FACE_POOL_START_METHOD=fork)
+#     and share the dlib models warmed in the master; forkserver/spawn
+#     pools load one copy of the models per pool process
+#   - request threads mostly wait on the face pool, the DB or the RPC
+#     node, so more threads than cores is fine
+
+import multiprocessing
+import os
+
+# Background threads are started per worker in post_fork, not in the master
+os.environ.setdefault("DEFER_BACKGROUND_TASKS", "1")
+
+cores = multiprocessing.cpu_count()
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+os.environ.setdefault("FACE_WORKERS", str(max(1, cores // workers)))
+
+# Import the app (models, ABI, face index) once in the master
+preload_app = True
+
+accesslog = "-"
+errorlog = "-"
+
+
+def when_ready(server):
+    from backend.serving import warm_up
+
+    timings = warm_up(server.app.wsgi())
+    server.log.info("Warmup done: %s", timings)
+
+
+def post_fork(server, worker):
+    from backend.serving import after_fork
+
+    after_fork(server.app.wsgi())
+
+
+def worker_exit(server, worker):
+    # Last metric values of this worker stay in the merged totals
+    from backend.utils.metrics import REGISTRY
+
+    REGISTRY.flush()
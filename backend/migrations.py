@@ -0,0 +1,204 @@
+# backend/migrations.py
+#
+# Lightweight schema/data migrations.
+# db.create_all() only creates missing TABLES; columns added to existing
+# models are applied here (called from create_app after create_all).
+
+from sqlalchemy import insert, inspect, literal, select, text, update
+
+from backend.database import db
+from backend.models import Admin, Candidate, Election, Voter, VoterParticipation
+from backend.utils.encoding_utils import compute_voter_hash, decode_legacy_json, pack_encodings
+
+
+# =====================================================
+# SCHEMA HELPERS
+# =====================================================
+def ensure_column(model, column_name):
+    """
+    ALTER TABLE ... ADD COLUMN when a model column is missing in the DB.
+    Returns True if the column was added.
+    """
+    table = model.__table__
+    existing = {c["name"] for c in inspect(db.engine).get_columns(table.name)}
+    if column_name in existing:
+        return False
+
+    column = table.columns[column_name]
+    col_type = column.type.compile(dialect=db.engine.dialect)
+
+    with db.engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column_name} {col_type}"))
+
+    return True
+
+
+def ensure_indexes(model):
+    """
+    CREATE INDEX for model indexes missing in the DB (create_all skips
+    tables that already exist). Returns the names created.
+    """
+    table = model.__table__
+    existing = {i["name"] for i in inspect(db.engine).get_indexes(table.name)}
+
+    created = []
+    for index in table.indexes:
+        if index.name not in existing:
+            index.create(bind=db.engine, checkfirst=True)
+            created.append(index.name)
+
+    return created
+
+
+def run_schema_migrations():
+    """
+    Cheap, idempotent schema upgrades. Safe on every start.
+    """
+    applied = []
+
+    for model in (Voter, Admin):
+        if ensure_column(model, "face_data"):
+            applied.append(f"{model.__tablename__}.face_data")
+
+    if ensure_column(Voter, "voter_hash"):
+        applied.append("voter.voter_hash")
+
+    for model in (Election, Candidate, Voter):
+        applied.extend(ensure_indexes(model))
+
+    if backfill_participation():
+        applied.append("voter_participation (from voter.has_voted)")
+
+    return applied
+
+
+def backfill_participation():
+    """
+    One-time carry-over of the legacy global has_voted flags into
+    participation rows for the active election, so voters who already
+    voted stay blocked. The flags are cleared in the same transaction
+    so a later election never inherits them.
+    """
+    flagged = db.session.query(Voter.id).filter(Voter.has_voted.is_(True)).first()
+    if not flagged:
+        return False
+
+    election = Election.query.filter_by(is_active=True).first()
+    if election:
+        voted = (
+            select(literal(election.id), Voter.id)
+            .where(Voter.has_voted.is_(True))
+            .where(~Voter.id.in_(
+                select(VoterParticipation.voter_id)
+                .where(VoterParticipation.election_id == election.id)
+            ))
+        )
+        db.session.execute(
+            insert(VoterParticipation).from_select(["election_id", "voter_id"], voted)
+        )
+
+    db.session.execute(
+        update(Voter).where(Voter.has_voted.is_(True)).values(has_voted=False)
+    )
+    db.session.commit()
+
+    return True
+
+
+# =====================================================
+# DATA MIGRATIONS
+# =====================================================
+def migrate_face_encodings(batch_size=500):
+    """
+    Convert legacy JSON face_encodings → packed float32 face_data.
+
+    Works in keyset batches of `batch_size` rows (one bulk UPDATE and
+    commit per batch) so it can run online. Rows written after this
+    change already use face_data and are skipped.
+
+    Voter hashes are backfilled first, from the original encodings, so
+    the on-chain hash of a voter does not change with the storage format.
+    """
+    backfill_voter_hashes(batch_size=batch_size)
+
+    converted = {}
+
+    for model in (Voter, Admin):
+        count = 0
+        last_id = 0
+
+        while True:
+            rows = (
+                db.session.query(model.id, model.face_encodings)
+                .filter(model.id > last_id)
+                .filter(model.face_data.is_(None))
+                .filter(model.face_encodings.isnot(None))
+                .order_by(model.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                break
+
+            params = []
+            for row_id, raw in rows:
+                try:
+                    encodings = decode_legacy_json(raw)
+                except ValueError:
+                    continue
+                if encodings:
+                    params.append({
+                        "id": row_id,
+                        "face_data": pack_encodings(encodings),
+                        "face_encodings": None
+                    })
+
+            if params:
+                db.session.execute(update(model), params)
+            db.session.commit()
+
+            count += len(params)
+            last_id = rows[-1][0]
+
+        converted[model.__tablename__] = count
+
+    return converted
+
+
+def backfill_voter_hashes(batch_size=500):
+    """
+    Fill voter.voter_hash for rows created before the column existed.
+    Keyset batches, one bulk UPDATE and commit each. Returns the count.
+    """
+    count = 0
+    last_id = 0
+
+    while True:
+        rows = (
+            db.session.query(Voter.id, Voter.face_data, Voter.face_encodings)
+            .filter(Voter.id > last_id)
+            .filter(Voter.voter_hash.is_(None))
+            .order_by(Voter.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+
+        params = []
+        for row_id, face_data, legacy in rows:
+            try:
+                voter_hash = compute_voter_hash(face_data, legacy)
+            except ValueError:
+                continue
+            if voter_hash:
+                params.append({"id": row_id, "voter_hash": voter_hash})
+
+        if params:
+            db.session.execute(update(Voter), params)
+        db.session.commit()
+
+        count += len(params)
+        last_id = rows[-1][0]
+
+    return count
@@ -18,9 +18,12 @@ class Admin(db.Model):
     # store hashed password only
     password_hash = db.Column(db.String(255), nullable=False)
 
-    # Store face encodings as JSON array (list of floats)
+    # Legacy: face encodings as JSON array (read-only, see migrations.py)
     face_encodings = db.Column(db.JSON, nullable=True)
 
+    # Packed little-endian float32 encodings (512 bytes each)
+    face_data = db.Column(db.LargeBinary, nullable=True)
+
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
     blockchain_hash = db.Column(db.String(66), nullable=True)
@@ -59,7 +62,7 @@ class Election(db.Model):
 
     contract_address = db.Column(db.String(42), unique=True, nullable=True)
 
-    is_active = db.Column(db.Boolean, default=False, nullable=False)
+    is_active = db.Column(db.Boolean, default=False, nullable=False, index=True)
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
@@ -80,6 +83,12 @@ class Election(db.Model):
 # ================================
 class Candidate(db.Model):
     __tablename__ = "candidate"
+    __table_args__ = (
+        # cast_vote: on-chain id → candidate (also serves election_id alone)
+        db.Index("ix_candidate_election_chain", "election_id", "on_chain_id"),
+        # add_candidate duplicate check
+        db.Index("ix_candidate_election_name", "election_id", "name"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -121,12 +130,153 @@ class Voter(db.Model):
 
     enrollment = db.Column(db.String(50), unique=True, nullable=False)
 
-    # Store face encodings as JSON list
+    # Legacy: face encodings as JSON list (read-only, see migrations.py)
     face_encodings = db.Column(db.JSON, nullable=True)
 
-    has_voted = db.Column(db.Boolean, default=False, nullable=False)
+    # Packed little-endian float32 encodings (512 bytes each)
+    face_data = db.Column(db.LargeBinary, nullable=True)
+
+    # sha256 hex of the first encoding, sent on-chain as the bytes32 voter hash
+    voter_hash = db.Column(db.String(64), nullable=True, index=True)
+
+    # Legacy global flag (no longer written, see VoterParticipation)
+    has_voted = db.Column(db.Boolean, default=False, nullable=False, index=True)
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
     def __repr__(self):
         return f"<Voter id={self.id} enrollment={self.enrollment} name={self.name}>"
+
+
+# ================================
+# PARTICIPATION (ONE ROW PER VOTER PER ELECTION)
+# ================================
+class VoterParticipation(db.Model):
+    __tablename__ = "voter_participation"
+    __table_args__ = (
+        # Voting = claiming this row; the constraint makes it race-free
+        db.UniqueConstraint("election_id", "voter_id", name="uq_participation_election_voter"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    # No FK: elections are deleted wholesale, participation is history
+    election_id = db.Column(db.Integer, nullable=False)
+
+    voter_id = db.Column(db.Integer, db.ForeignKey("voter.id"), nullable=False, index=True)
+
+    tx_hash = db.Column(db.String(66), nullable=True)
+
+    voted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<VoterParticipation election={self.election_id} voter={self.voter_id}>"
+
+
+# ================================
+# STREAMING AUTH SESSION (/voter/authenticate/start → /frame)
+# ================================
+class AuthStreamSession(db.Model):
+    __tablename__ = "auth_stream_session"
+
+    # Random id signed into the token; the row is shared by all workers
+    id = db.Column(db.String(32), primary_key=True)
+
+    # No FK: a session outliving its voter is simply rejected
+    voter_id = db.Column(db.Integer, nullable=False)
+
+    frames_used = db.Column(db.Integer, default=0, nullable=False)
+
+    # Set on the first match: the token can not be replayed
+    completed = db.Column(db.Boolean, default=False, nullable=False)
+
+    # Last face box "top,right,bottom,left" (ROI tracking across frames)
+    box = db.Column(db.String(64), nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<AuthStreamSession voter={self.voter_id} frames={self.frames_used} completed={self.completed}>"
+
+
+# ================================
+# BULK IMPORT JOB (/admin/bulk_import_voters)
+# ================================
+class ImportJob(db.Model):
+    __tablename__ = "import_job"
+
+    id = db.Column(db.String(32), primary_key=True)
+
+    # queued | running | done | failed
+    status = db.Column(db.String(16), default="queued", nullable=False)
+
+    dry_run = db.Column(db.Boolean, default=False, nullable=False)
+
+    # Process running the job (a dead pid means the worker exited)
+    worker_pid = db.Column(db.Integer, nullable=True)
+
+    summary = db.Column(db.JSON, nullable=True)
+
+    error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "dry_run": self.dry_run,
+            "summary": self.summary,
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    def __repr__(self):
+        return f"<ImportJob id={self.id} status={self.status}>"
+
+
+# ================================
+# INDEXER READ MODEL (VoteCast / CandidateAdded / CandidateDeactivated)
+# ================================
+class IndexerCursor(db.Model):
+    __tablename__ = "indexer_cursor"
+
+    # One row per indexed election contract
+    election_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+
+    contract_address = db.Column(db.String(42), nullable=False)
+
+    # Last block whose logs are applied to the tallies
+    last_block = db.Column(db.BigInteger, default=-1, nullable=False)
+
+    total_votes = db.Column(db.Integer, default=0, nullable=False)
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<IndexerCursor election={self.election_id} block={self.last_block}>"
+
+
+class CandidateTally(db.Model):
+    __tablename__ = "candidate_tally"
+    __table_args__ = (
+        db.UniqueConstraint("election_id", "on_chain_id", name="uq_tally_election_candidate"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    election_id = db.Column(db.Integer, nullable=False)
+
+    on_chain_id = db.Column(db.Integer, nullable=False)
+
+    name = db.Column(db.String(100), nullable=False)
+
+    vote_count = db.Column(db.Integer, default=0, nullable=False)
+
+    is_active = db.Column(db.Boolean, default=True, nullable=False)
+
+    def __repr__(self):
+        return f"<CandidateTally election={self.election_id} candidate={self.on_chain_id} votes={self.vote_count}>"
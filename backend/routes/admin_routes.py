@@ -1,16 +1,16 @@
-from flask import Blueprint, request, jsonify, current_app
-from backend.services.election_service import ElectionService
-from backend.services.user_service import UserService
-from backend.services.face_service import FaceService
-from backend.services.blockchain_service import BlockchainService
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
+from backend.services.election_service import ElectionService, election_cache, generate_unique_election_id
+from backend.services.user_service import UserService, VOTER_PAGE_DEFAULT
+from backend.services.face_service import FaceService, failed_frame_report, frames_timed_out
+from backend.services.bulk_import_service import import_jobs
 from backend.database import db
 from backend.models import Election, Candidate
 import os
-import random
+import json
 from werkzeug.utils import secure_filename
-import base64
 import numpy as np
-from backend.utils.image_utils import base64_to_image
+from backend.utils.image_utils import read_frame_request
+from backend.utils.encoding_utils import load_encodings
 from backend.models import Admin
 from werkzeug.security import check_password_hash
 
@@ -21,7 +21,6 @@ admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
 e_service = ElectionService()
 u_service = UserService()
 f_service = FaceService()
-bc_service = BlockchainService()
 
 # ====================================================
 # ⭐ REMOVE OLD UPLOAD BLOCK — REPLACED WITH FUNCTION
@@ -77,9 +76,11 @@ def create_election():
             "election_name": existing.name
         }), 200
 
+    from backend.services.blockchain_service import get_blockchain_service
+
     try:
-        contract_address, tx_hash = bc_service.deploy_new_election_contract()
-        unique_id = random.randint(1000, 99999999)
+        contract_address, tx_hash = get_blockchain_service().deploy_new_election_contract()
+        unique_id = generate_unique_election_id()
 
         new_election = Election(
             id=unique_id,
@@ -90,6 +91,7 @@ def create_election():
 
         db.session.add(new_election)
         db.session.commit()
+        election_cache.invalidate()
 
         return jsonify({
             "success": True,
@@ -112,21 +114,25 @@ def create_election():
 
 @admin_bp.route("/delete_election/<int:election_id>", methods=["DELETE"])
 def delete_election(election_id):
+    from backend.services.indexer_service import VoteIndexer
 
     try:
-        # 🔥 RESET ALL VOTERS (VERY IMPORTANT)
-        u_service.reset_all_voters_voted_status()
+        # Participation is per election: nothing to reset on the voter table
 
         # 🗑 DELETE ALL CANDIDATES OF THIS ELECTION
         Candidate.query.filter_by(election_id=election_id).delete()
 
+        # 🗑 DROP INDEXED TALLIES OF THIS ELECTION
+        VoteIndexer.clear(election_id)
+
         # 🗑 DELETE ELECTION
         Election.query.delete()
         db.session.commit()
+        election_cache.invalidate()
 
         return {
             "success": True,
-            "message": "🗑 Election deleted successfully & voters reset"
+            "message": "🗑 Election deleted successfully"
         }, 200
 
     except Exception as e:
@@ -212,8 +218,10 @@ def add_candidate():
         photo_url = f"/uploads/{filename}"
 
     # ---------- 🔥 ADD CANDIDATE ON BLOCKCHAIN ----------
+    from backend.services.blockchain_service import get_blockchain_service
+
     try:
-        on_chain_id = bc_service.add_candidate(
+        on_chain_id = get_blockchain_service().add_candidate(
             contract_address=election.contract_address,
             name=name,
             owner=os.getenv("OWNER_ADDRESS"),
@@ -236,6 +244,7 @@ def add_candidate():
 
     db.session.add(candidate)
     db.session.commit()
+    election_cache.invalidate()
 
     return jsonify({
         "message": "Candidate added successfully (DB + Blockchain)",
@@ -283,6 +292,7 @@ def delete_candidate(candidate_id):
 
     db.session.delete(candidate)
     db.session.commit()
+    election_cache.invalidate()
 
     return jsonify({"message": "Candidate deleted successfully!"})
 
@@ -293,12 +303,26 @@ def delete_candidate(candidate_id):
 
 @admin_bp.route("/results", methods=["GET"])
 def get_results():
+    from backend.services.indexer_service import VoteIndexer
+
     election = e_service.get_active()
     if not election or not election.contract_address:
         return jsonify({"error": "No active election"}), 400
 
-    results = bc_service.get_results(election.contract_address)
-    return jsonify({"results": results}), 200
+    # 📊 SERVED FROM THE INDEXER READ MODEL (O(candidates) DB reads)
+    read_model = VoteIndexer.get_results(election.id)
+    if read_model is not None:
+        return jsonify({**read_model, "source": "indexer"}), 200
+
+    # Not indexed yet → live contract read
+    from backend.services.blockchain_service import get_blockchain_service
+
+    results = get_blockchain_service().get_results(election.contract_address)
+    return jsonify({
+        "results": results,
+        "indexed_block": None,
+        "source": "chain"
+    }), 200
 
 
 # =======================================================
@@ -307,11 +331,10 @@ def get_results():
 
 @admin_bp.route("/register_voter_faces", methods=["POST"])
 def register_voter_faces():
-    data = request.get_json()
+    data, frames = read_frame_request(request)
 
     name = data.get("name")
     enrollment = data.get("enrollment")
-    frames = data.get("frames")
 
     if not name or not enrollment or not frames:
         return jsonify({"error": "Name, enrollment and face frames required"}), 400
@@ -319,33 +342,22 @@ def register_voter_faces():
     if u_service.get_by_enrollment(enrollment):
         return jsonify({"error": "Enrollment number already exists"}), 400
 
-    from backend.models import Voter
-    voters = Voter.query.all()
-    existing_encodings = []
-
-    for v in voters:
-        try:
-            if v.face_encodings:
-                for enc in v.face_encodings:
-                    existing_encodings.append(np.array(enc, dtype=np.float64))
-        except:
-            pass
-
     try:
-        encodings = []
-
-        for frame in frames:
-            img = base64_to_image(frame)
-            enc = f_service.encode_from_image(img)
-            if enc is not None:
-                encodings.append(enc)
+        # ⚡ ALL FRAMES ENCODED IN PARALLEL (PROCESS POOL)
+        encodings, report = f_service.encode_frames(frames)
 
         if len(encodings) == 0:
-            return jsonify({"error": "Face not detected"}), 400
+            if frames_timed_out(report):
+                return jsonify({"error": "Face check timed out, try again"}), 503
+            return jsonify({
+                "error": "Face not detected",
+                **failed_frame_report(report)
+            }), 400
 
         final_encoding = np.mean(encodings, axis=0)
 
-        if f_service.is_face_duplicate(final_encoding, existing_encodings):
+        # 🔍 ONE VECTORIZED PASS OVER THE IN-MEMORY FACE INDEX
+        if f_service.find_duplicate(final_encoding) is not None:
             return jsonify({"error": "This face is already registered"}), 400
 
         voter = u_service.create_voter(
@@ -364,6 +376,60 @@ def register_voter_faces():
         return jsonify({"error": str(e)}), 500
 
 
+# ====================================================
+# BULK VOTER IMPORT (CSV + ZIP OF PHOTOS)
+# ====================================================
+@admin_bp.route("/bulk_import_voters", methods=["POST"])
+def bulk_import_voters():
+    """
+    Queues the import and answers 202 at once; poll status_url. Large
+    rolls take longer than a request may (GUNICORN_TIMEOUT), see also
+    `flask import-voters` for imports run on the server itself.
+    """
+    csv_file = request.files.get("csv")
+    zip_file = request.files.get("images")
+    dry_run = request.form.get("dry_run", "").lower() in ("1", "true", "yes")
+
+    if not csv_file or not zip_file:
+        return jsonify({"error": "csv and images (zip) files required"}), 400
+
+    try:
+        job = import_jobs.submit(current_app._get_current_object(), csv_file, zip_file, dry_run=dry_run)
+    except Exception as e:
+        current_app.logger.exception("Bulk import error")
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify({
+        **job.to_dict(),
+        "status_url": f"/admin/bulk_import_voters/{job.id}"
+    }), 202
+
+
+@admin_bp.route("/bulk_import_voters/<job_id>", methods=["GET"])
+def bulk_import_status(job_id):
+    job = import_jobs.get(job_id)
+    if not job:
+        return jsonify({"error": "Import job not found"}), 404
+
+    data = job.to_dict()
+    if job.status == "done":
+        data["report_url"] = f"/admin/bulk_import_voters/{job.id}/report"
+    return jsonify(data), 200
+
+
+@admin_bp.route("/bulk_import_voters/<job_id>/report", methods=["GET"])
+def bulk_import_report(job_id):
+    from flask import send_file
+
+    job = import_jobs.get(job_id)
+    path = import_jobs.report_path(job_id) if job else None
+    if not path or not os.path.exists(path):
+        return jsonify({"error": "Report not found"}), 404
+
+    return send_file(path, mimetype="text/csv", as_attachment=True,
+                     download_name=f"import_report_{job_id}.csv")
+
+
 # ====================================================
 # GET ALL ELECTIONS
 # ====================================================
@@ -396,11 +462,10 @@ def check_admin():
 
 @admin_bp.route("/setup_admin", methods=["POST"])
 def setup_admin_route():
-    data = request.get_json()
+    data, frames = read_frame_request(request, allow_raw=False)
 
     username = data.get("username")
     password = data.get("password")
-    frames = data.get("frames")
 
     # ===============================
     # 1️⃣ BASIC VALIDATION
@@ -421,16 +486,15 @@ def setup_admin_route():
     # ===============================
     # 2️⃣ EXTRACT FACE ENCODINGS
     # ===============================
-    encodings = []
-
-    for f in frames:
-        img = base64_to_image(f)
-        enc = f_service.encode_from_image(img)
-        if enc is not None:
-            encodings.append(enc)
+    encodings, report = f_service.encode_frames(frames)
 
     if len(encodings) == 0:
-        return jsonify({"error": "Face not detected"}), 400
+        if frames_timed_out(report):
+            return jsonify({"error": "Face check timed out, try again"}), 503
+        return jsonify({
+            "error": "Face not detected",
+            **failed_frame_report(report)
+        }), 400
 
     final_enc = np.mean(encodings, axis=0)
 
@@ -454,14 +518,11 @@ def setup_admin_route():
 def admin_face_login():
     from werkzeug.security import check_password_hash
     from flask import session
-    import json
-    import numpy as np
 
-    data = request.get_json()
+    data, frames = read_frame_request(request, allow_raw=False)
 
     username = data.get("username")
     password = data.get("password")
-    frames = data.get("frames")
 
     # 1️⃣ BASIC VALIDATION
     if not username or not password:
@@ -479,44 +540,28 @@ def admin_face_login():
     if not check_password_hash(admin.password_hash, password):
         return jsonify({"error": "Invalid username or password"}), 401
 
-    if not admin.face_encodings:
+    if not admin.face_data and not admin.face_encodings:
         return jsonify({"error": "Admin face not registered"}), 400
 
-    # 3️⃣ LOAD STORED FACE ENCODINGS SAFELY
-    raw_encodings = admin.face_encodings
-
-    if isinstance(raw_encodings, str):
-        try:
-            raw_encodings = json.loads(raw_encodings)
-        except Exception:
-            return jsonify({"error": "Stored face data corrupted"}), 500
-
-    stored_encodings = []
-    for enc in raw_encodings:
-        try:
-            stored_encodings.append(np.array(enc, dtype=np.float64))
-        except Exception:
-            pass
+    # 3️⃣ LOAD STORED FACE ENCODINGS SAFELY (binary or legacy JSON)
+    try:
+        stored_encodings = list(load_encodings(admin.face_data, admin.face_encodings))
+    except ValueError:
+        return jsonify({"error": "Stored face data corrupted"}), 500
 
     if not stored_encodings:
         return jsonify({"error": "Stored face data corrupted"}), 500
 
-    # 4️⃣ FACE MATCH
-    matched = False
-
-    for frame in frames:
-        img = base64_to_image(frame)
-        live_enc = f_service.encode_from_image(img)
-
-        if live_enc is None:
-            continue
-
-        if f_service.is_face_duplicate(live_enc, stored_encodings, tolerance=0.5):
-            matched = True
-            break
+    # 4️⃣ FACE MATCH (PARALLEL, STOPS AT FIRST MATCHING FRAME)
+    matched, report = f_service.match_frames(frames, stored_encodings, tolerance=0.5)
 
     if not matched:
-        return jsonify({"error": "Face does not match"}), 401
+        if frames_timed_out(report):
+            return jsonify({"error": "Face check timed out, try again"}), 503
+        return jsonify({
+            "error": "Face does not match",
+            **failed_frame_report(report)
+        }), 401
 
     # 🔥🔥🔥 5️⃣ SET SESSION (THIS WAS MISSING)
     session["admin_id"] = admin.id
@@ -546,23 +591,111 @@ def admin_me():
         "username": admin.username
     }), 200
 
+
+# ===================================
+# FACE FRAME CACHE STATS
+# ===================================
+@admin_bp.route("/face_cache_stats", methods=["GET"])
+def face_cache_stats():
+    """
+    Hit/miss counters and size of this worker's frame encoding cache
+    (FACE_CACHE_TTL / FACE_CACHE_MAX_MB). ?clear=1 empties it.
+    """
+    from backend.services.face_service import frame_encoder
+
+    cache = frame_encoder.cache
+    if request.args.get("clear") == "1":
+        cache.clear()
+
+    return jsonify({**cache.stats(), "pid": os.getpid()}), 200
+
+# ===================================
+# REQUEST TRACING / PROFILING TOGGLE
+# ===================================
+@admin_bp.route("/tracing", methods=["GET", "POST"])
+def tracing_settings():
+    """
+    GET: this worker's tracing settings and counters.
+    POST JSON (all optional):
+      enabled      - collect span timelines
+      slow_ms      - log requests at least this slow
+      sample_rate  - fraction of requests profiled (0..1)
+      blueprints   - blueprints eligible for profiling, e.g. ["voter"]
+    """
+    from backend.utils.tracing import tracer
+
+    if request.method == "POST":
+        data = request.get_json(silent=True) or {}
+        try:
+            tracer.configure(
+                enabled=data.get("enabled"),
+                slow_ms=data.get("slow_ms"),
+                sample_rate=data.get("sample_rate"),
+                blueprints=data.get("blueprints"),
+            )
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": f"Invalid tracing settings: {e}"}), 400
+
+    return jsonify(tracer.status()), 200
+
 # ===================================
 # GET ALL THE REGISTER VOTER
 # ====================================
 @admin_bp.route("/get_voters", methods=["GET"])
 def get_voters():
-    from backend.models import Voter
+    """
+    Query params:
+      after      - last id of the previous page (default 0)
+      limit      - page size (capped by VOTER_PAGE_MAX)
+      has_voted  - "true" / "false" filter (active election)
+      prefix     - enrollment prefix filter
+      format     - "ndjson" streams the whole filtered roll, one voter per line
+    """
+    args = request.args
 
-    voters = Voter.query.all()
+    try:
+        after_id = int(args.get("after", 0))
+        limit = int(args.get("limit", VOTER_PAGE_DEFAULT))
+    except ValueError:
+        return jsonify({"error": "after and limit must be integers"}), 400
 
-    data = [{
-        "id": v.id,
-        "name": v.name,
-        "enrollment": v.enrollment,
-        "has_voted": v.has_voted
-    } for v in voters]
+    has_voted = args.get("has_voted")
+    if has_voted is not None:
+        has_voted = has_voted.lower() in ("1", "true", "yes")
+
+    prefix = args.get("prefix") or None
+
+    election = e_service.get_active()
+    election_id = election.id if election else None
 
-    return jsonify({"voters": data}), 200
+    if args.get("format") == "ndjson":
+        def generate():
+            for row in u_service.iter_voters(has_voted, prefix, election_id):
+                yield json.dumps(row) + "\n"
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype="application/x-ndjson"
+        )
+
+    voters, next_after = u_service.list_voters(after_id, limit, has_voted, prefix, election_id)
+
+    return jsonify({"voters": voters, "next_after": next_after}), 200
+
+# ===================================
+# ON-CHAIN VOTER HASH → VOTER (AUDIT)
+# ===================================
+@admin_bp.route("/voter_by_hash/<voter_hash>", methods=["GET"])
+def voter_by_hash(voter_hash):
+    voter = u_service.get_by_voter_hash(voter_hash)
+    if not voter:
+        return jsonify({"error": "Voter not found"}), 404
+
+    return jsonify({
+        "id": voter.id,
+        "name": voter.name,
+        "enrollment": voter.enrollment
+    }), 200
 
 # ===================================
 # DELETE REGISTERED VOTER
@@ -575,12 +708,12 @@ def delete_voter(voter_id):
     if not voter:
         return jsonify({"error": "Voter not found"}), 404
 
-    if voter.has_voted:
+    election = e_service.get_active()
+    if election and u_service.has_voted(election.id, voter.id):
         return jsonify({
             "error": "Cannot delete voter who has already voted"
         }), 400
 
-    db.session.delete(voter)
-    db.session.commit()
+    u_service.delete_voter(voter)
 
     return jsonify({"message": "Voter deleted successfully"}), 200
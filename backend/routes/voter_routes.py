@@ -1,35 +1,36 @@
 from flask import Blueprint, request, jsonify, current_app
-import json
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
 import os
-import io
-import base64
-import numpy as np
-import face_recognition
 
 from backend.services.user_service import UserService
-from backend.services.face_service import FaceService
-from backend.services.blockchain_service import BlockchainService
+from backend.services.face_service import FaceService, failed_frame_report, frames_timed_out
+from backend.services.chain_common import VoteNotRecorded
 from backend.services.election_service import ElectionService
-from backend.models import Candidate, Election, Voter
+from backend.models import Candidate
+from backend.utils.encoding_utils import load_encodings
+from backend.utils.image_utils import read_frame_request
+from backend.utils.metrics import VOTES
 
 voter_bp = Blueprint("voter", __name__, url_prefix="/voter")
 
 u_service = UserService()
 f_service = FaceService()
 e_service = ElectionService()
-bc_service = BlockchainService()
+
+# Streaming authentication: session lifetime and frames the client may send
+AUTH_STREAM_TTL = int(os.getenv("AUTH_STREAM_TTL", "30"))
+AUTH_STREAM_MAX_FRAMES = int(os.getenv("AUTH_STREAM_MAX_FRAMES", "10"))
 
 # ======================================================
-# VOTER FACE AUTHENTICATION (UNCHANGED)
+# VOTER FACE AUTHENTICATION (ALL FRAMES IN ONE UPLOAD)
 # ======================================================
 @voter_bp.route("/authenticate", methods=["POST"])
 def authenticate_voter():
     try:
-        data = request.get_json(force=True)
+        data, frames = read_frame_request(request)
 
         username = data.get("username")
         enrollment = data.get("enrollment")
-        frames = data.get("frames")
 
         if not username or not enrollment or not frames:
             return jsonify({"success": False, "error": "Missing data"}), 400
@@ -38,33 +39,138 @@ def authenticate_voter():
         if not voter:
             return jsonify({"success": False, "error": "Voter not found"}), 404
 
-        if voter.has_voted:
+        election = e_service.get_active()
+        if election and u_service.has_voted(election.id, voter.id):
             return jsonify({"success": False, "error": "Already voted"}), 403
 
-        stored_encodings = json.loads(voter.face_encodings)
-        known_encodings = [np.array(e, dtype=np.float64) for e in stored_encodings]
+        known_encodings = list(load_encodings(voter.face_data, voter.face_encodings))
 
-        verified = False
+        # ⚡ FRAMES ENCODED IN PARALLEL, FIRST MATCH WINS
+        verified, report = f_service.match_frames(frames, known_encodings, tolerance=0.45)
 
-        for frame in frames:
-            _, encoded = frame.split(",", 1)
-            img_bytes = base64.b64decode(encoded)
-            image = face_recognition.load_image_file(io.BytesIO(img_bytes))
+        if not verified:
+            if frames_timed_out(report):
+                return jsonify({"success": False, "error": "Face check timed out, try again"}), 503
+            return jsonify({
+                "success": False,
+                "error": "Face mismatch",
+                **failed_frame_report(report)
+            }), 401
 
-            locs = face_recognition.face_locations(image)
-            if not locs:
-                continue
+        return jsonify({
+            "success": True,
+            "voter_id": voter.id,
+            "voter_name": voter.name
+        }), 200
+
+    except Exception:
+        current_app.logger.exception("Auth failed")
+        return jsonify({"success": False, "error": "Server error"}), 500
+
+
+# ======================================================
+# ⚡ STREAMING FACE AUTHENTICATION (ONE FRAME PER REQUEST)
+# ======================================================
+def _auth_serializer():
+    return URLSafeTimedSerializer(
+        current_app.config["SECRET_KEY"],
+        salt="voter-stream-auth"
+    )
+
+
+@voter_bp.route("/authenticate/start", methods=["POST"])
+def authenticate_stream_start():
+    """
+    Checks the voter once and returns a short-lived signed token.
+    The browser then sends one POST per frame to /authenticate/frame
+    while it keeps capturing, and stops at the first match. The token
+    names an AuthStreamSession row that caps the frames at max_frames.
+    """
+    data = request.get_json(silent=True) or request.form
+
+    username = data.get("username")
+    enrollment = data.get("enrollment")
+
+    if not username or not enrollment:
+        return jsonify({"success": False, "error": "Missing data"}), 400
+
+    voter = u_service.get_by_enrollment(enrollment)
+    if not voter:
+        return jsonify({"success": False, "error": "Voter not found"}), 404
+
+    election = e_service.get_active()
+    if election and u_service.has_voted(election.id, voter.id):
+        return jsonify({"success": False, "error": "Already voted"}), 403
+
+    if voter.face_data is None and not voter.face_encodings:
+        return jsonify({"success": False, "error": "Voter face not registered"}), 400
+
+    session = u_service.start_auth_session(voter.id, AUTH_STREAM_TTL)
+    token = _auth_serializer().dumps({"voter_id": voter.id, "sid": session.id})
+
+    return jsonify({
+        "success": True,
+        "token": token,
+        "expires_in": AUTH_STREAM_TTL,
+        "max_frames": AUTH_STREAM_MAX_FRAMES
+    }), 200
+
+
+@voter_bp.route("/authenticate/frame", methods=["POST"])
+def authenticate_stream_frame():
+    """
+    One frame (raw image/jpeg body, or a multipart 'frames' part) plus
+    the token from /authenticate/start. Encoded as soon as it arrives:
+      200 success=True   → matched, same payload as /authenticate
+      200 success=False  → no match in this frame, send the next one
+      429                → max_frames used or already matched: restart
+    The face box of each frame is kept on the session, so the next
+    frame is searched around it first (ROI tracking across requests).
+    """
+    try:
+        data, frames = read_frame_request(request)
+
+        token = data.get("token") or request.headers.get("X-Auth-Token")
+        if not token or not frames:
+            return jsonify({"success": False, "error": "Missing data"}), 400
 
-            unknowns = face_recognition.face_encodings(image, locs)
-            for u in unknowns:
-                if True in face_recognition.compare_faces(known_encodings, u, tolerance=0.45):
-                    verified = True
-                    break
-            if verified:
-                break
+        try:
+            claims = _auth_serializer().loads(token, max_age=AUTH_STREAM_TTL)
+        except SignatureExpired:
+            return jsonify({"success": False, "error": "Authentication session expired"}), 401
+        except BadSignature:
+            return jsonify({"success": False, "error": "Invalid token"}), 401
+
+        session = u_service.claim_auth_frame(
+            claims.get("sid"), claims.get("voter_id"), AUTH_STREAM_MAX_FRAMES
+        )
+        if session is None:
+            return jsonify({
+                "success": False,
+                "error": "Frame limit reached or session finished"
+            }), 429
+
+        voter = u_service.get_by_id(session.voter_id)
+        if not voter:
+            return jsonify({"success": False, "error": "Voter not found"}), 404
+
+        known_encodings = list(load_encodings(voter.face_data, voter.face_encodings))
+
+        box = tuple(int(v) for v in session.box.split(",")) if session.box else None
+        verified, report = f_service.match_frames(
+            frames[:1], known_encodings, tolerance=0.45, box=box
+        )
+
+        entry = report[-1] if report else {}
+        u_service.finish_auth_frame(session, verified, entry.get("box"))
 
         if not verified:
-            return jsonify({"success": False, "error": "Face mismatch"}), 401
+            if frames_timed_out(report):
+                return jsonify({"success": False, "error": "Face check timed out, try again"}), 503
+            return jsonify({
+                "success": False,
+                **failed_frame_report(report)
+            }), 200
 
         return jsonify({
             "success": True,
@@ -73,7 +179,7 @@ def authenticate_voter():
         }), 200
 
     except Exception:
-        current_app.logger.exception("Auth failed")
+        current_app.logger.exception("Streaming auth failed")
         return jsonify({"success": False, "error": "Server error"}), 500
 
 
@@ -91,51 +197,66 @@ def cast_vote():
         if voter_id is None or on_chain_id is None:
             return jsonify({"error": "Invalid vote data"}), 400
 
-        voter = Voter.query.get(int(voter_id))
-        if not voter:
+        # 🔐 PRECOMPUTED HASH (ONE INDEXED COLUMN, NO FACE DATA)
+        found, voter_hash = u_service.get_voter_hash(int(voter_id))
+        if not found:
             return jsonify({"error": "Invalid voter"}), 404
 
-        if voter.has_voted:
-            return jsonify({"error": "You have already voted"}), 403
-
-        election = Election.query.filter_by(is_active=True).first()
-        if not election or not election.contract_address:
-            return jsonify({"error": "No active election"}), 400
+        if not voter_hash:
+            return jsonify({"error": "Voter has no face data"}), 400
 
+        # ⚡ CACHED ACTIVE ELECTION, CONFIRMED BY ONE PRIMARY-KEY EXISTS
         # 🔥 MAP ON-CHAIN ID → DB CANDIDATE
-        candidate = Candidate.query.filter_by(
-            election_id=election.id,
-            on_chain_id=int(on_chain_id)
-        ).first()
+        election, candidate = e_service.get_vote_target(on_chain_id)
+        if not election:
+            return jsonify({"error": "No active election"}), 400
 
         if not candidate:
             return jsonify({"error": "Invalid candidate selection"}), 400
 
-        # 🔐 SAME HASH AS USED BEFORE
-        stored_encodings = json.loads(voter.face_encodings)
-        face_enc = np.array(stored_encodings[0], dtype=np.float64)
-        voter_hash = f_service.create_face_data_hash(face_enc)
+        # 🗳 ONE INSERT CLAIMS THE VOTE (UNIQUE election_id + voter_id)
+        participation = u_service.claim_participation(election.id, int(voter_id))
+        if participation is None:
+            VOTES.inc("already_voted")
+            return jsonify({"error": "You have already voted"}), 403
 
         owner = os.getenv("OWNER_ADDRESS")
         private_key = os.getenv("PRIVATE_KEY")
 
-        tx_hash = bc_service.vote(
-            voter_hash,
-            int(on_chain_id),
-            election.contract_address,
-            owner,
-            private_key
-        )
-
-        voter.has_voted = True
-        u_service.set_voted(voter)
+        # 🔥 COALESCED INTO voteBatch WHEN THE CONTRACT SUPPORTS IT
+        from backend.services.blockchain_service import get_blockchain_service
+
+        try:
+            tx_hash = get_blockchain_service().submit_vote(
+                voter_hash,
+                int(on_chain_id),
+                election.contract_address,
+                owner,
+                private_key
+            )
+        except VoteNotRecorded as exc:
+            # Keep the claim only when the contract holds a vote for the hash
+            if not exc.already_voted:
+                u_service.release_participation(participation)
+            raise
+        except Exception:
+            u_service.release_participation(participation)
+            raise
+
+        u_service.record_vote_tx(participation, tx_hash)
+        VOTES.inc("recorded")
 
         return jsonify({
             "success": True,
             "tx_hash": tx_hash
         }), 200
 
+    except VoteNotRecorded as e:
+        VOTES.inc("not_recorded")
+        return jsonify({"error": str(e)}), 403 if e.already_voted else 400
+
     except Exception as e:
+        VOTES.inc("error")
         current_app.logger.exception("Vote failed")
         return jsonify({"error": str(e)}), 500
 
@@ -171,7 +292,7 @@ def get_candidates(election_id):
 
 
 # ======================================================
-# CHECK VOTER STATUS (UNCHANGED)
+# CHECK VOTER STATUS (PER ELECTION)
 # ======================================================
 @voter_bp.route("/status/<int:voter_id>", methods=["GET"])
 def voter_status(voter_id):
@@ -180,4 +301,12 @@ def voter_status(voter_id):
     if not voter:
         return jsonify({"error": "Voter not found"}), 404
 
-    return jsonify({"has_voted": voter.has_voted}), 200
+    election_id = request.args.get("election_id", type=int)
+    if election_id is None:
+        election = e_service.get_active()
+        election_id = election.id if election else None
+
+    return jsonify({
+        "has_voted": u_service.has_voted(election_id, voter.id),
+        "election_id": election_id
+    }), 200
@@ -1,43 +1,504 @@
 # backend/services/blockchain_service.py
 
 from web3 import Web3
+from web3.exceptions import Web3TypeError
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+import hashlib
 import json
+import logging
 import os
+import requests
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:     # Windows dev machines: single process only
+    fcntl = None
+
+from .chain_common import (  # noqa: F401  (re-exported)
+    RpcCounter,
+    VoteNotRecorded,
+    _rpc_counter,
+    current_rpc_count,
+    start_rpc_count,
+)
+from backend.utils.metrics import RPC_CALLS, stage
+from backend.utils.tracing import record_span
+
+
+logger = logging.getLogger(__name__)
+
+GAS_PRICE_GWEI = "10"
+
+
+# =====================================================
+# LOCAL NONCE MANAGER
+# =====================================================
+class NonceManager:
+    """
+    Nonce allocator for ONE sender address.
+
+    reserve() holds the sender for one sign + send, so no other thread
+    or worker process can take a nonce while a send is outstanding.
+    A failed send leaves nothing in flight, so rewinding to the node's
+    pending count cannot hand out a nonce someone else is using.
+
+    Workers share the sender through a flock()ed state file recording
+    (pid, next nonce) of the last successful send. A worker whose own
+    send is the latest reuses its local counter; otherwise (another
+    worker sent since, stale file, failed send) it reads the pending
+    count from the node once.
+    """
+
+    def __init__(self, web3, address, lock_path=None):
+        self.web3 = web3
+        self.address = address
+        self.lock_path = lock_path
+        self._lock = threading.Lock()
+        self._next = None
+        self._file = None
+        self._file_pid = None
+
+    @contextmanager
+    def reserve(self):
+        """
+            with nonces.reserve() as nonce:
+                ... sign and send with `nonce` ...
+
+        The nonce counts as used only if the block does not raise.
+        """
+        with self._lock, self._process_lock() as shared:
+            state = self._read(shared)
+            if self._next is None or (shared is not None and state != (os.getpid(), self._next)):
+                self._next = self.web3.eth.get_transaction_count(self.address, "pending")
+
+            nonce = self._next
+            try:
+                yield nonce
+            except BaseException:
+                self._next = None
+                raise
+
+            self._next = nonce + 1
+            self._write(shared, self._next)
+
+    # ------------------------------------------------------------
+    # CROSS-PROCESS LOCK + STATE FILE
+    # ------------------------------------------------------------
+    @contextmanager
+    def _process_lock(self):
+        if fcntl is None or self.lock_path is None:
+            yield None
+            return
+
+        # flock() locks belong to the open file: reopen after fork
+        if self._file is None or self._file_pid != os.getpid():
+            self._file = open(self.lock_path, "a+")
+            self._file_pid = os.getpid()
+
+        fcntl.flock(self._file, fcntl.LOCK_EX)
+        try:
+            yield self._file
+        finally:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _read(shared):
+        if shared is None:
+            return None
+        shared.seek(0)
+        try:
+            pid, nonce = shared.read().split()
+            return int(pid), int(nonce)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _write(shared, nonce):
+        if shared is None:
+            return
+        shared.seek(0)
+        shared.truncate()
+        shared.write(f"{os.getpid()} {nonce}")
+        shared.flush()
+
+
+def nonce_lock_path(rpc_url, address):
+    key = hashlib.sha1(f"{rpc_url}|{address}".encode()).hexdigest()[:16]
+    directory = os.getenv("NONCE_LOCK_DIR", tempfile.gettempdir())
+    return os.path.join(directory, f"voting-nonce-{key}.lock")
+
+
+# One manager per (node, sender) shared by every BlockchainService
+_nonce_managers = {}
+_nonce_managers_lock = threading.Lock()
+
+
+def get_nonce_manager(web3, rpc_url, address):
+    key = (rpc_url, address)
+    with _nonce_managers_lock:
+        manager = _nonce_managers.get(key)
+        if manager is None:
+            manager = NonceManager(web3, address, nonce_lock_path(rpc_url, address))
+            _nonce_managers[key] = manager
+        return manager
+
+
+def _is_nonce_error(exc):
+    message = str(exc).lower()
+    return (
+        "nonce too low" in message
+        or "nonce too high" in message
+        or "already known" in message
+        or "replacement transaction underpriced" in message
+        or "incorrect nonce" in message
+        or "invalid transaction nonce" in message     # py-evm / eth-tester
+    )
+
+
+def to_bytes32(voter_hash):
+    """
+    hex string (with or without 0x) / bytes → 32 raw bytes.
+    """
+    if isinstance(voter_hash, str):
+        if voter_hash.startswith("0x"):
+            voter_hash = voter_hash[2:]
+        voter_hash = Web3.to_bytes(hexstr="0x" + voter_hash)
+
+    if len(voter_hash) != 32:
+        raise ValueError("voter_hash must be exactly 32 bytes")
+
+    return bytes(voter_hash)
+
+
+# =====================================================
+# VOTE BATCHER
+# =====================================================
+class VoteBatcher:
+    """
+    Coalesces votes from concurrent /voter/vote requests into one
+    voteBatch transaction per contract.
+
+    A contract's queue is flushed when it holds `max_size` votes or
+    `window` seconds after its first vote. Each caller gets a Future
+    resolving to the batch tx hash once mined; entries the contract
+    skipped (no VoteCast event for that hash) fail with VoteNotRecorded,
+    whose already_voted comes from hasVoted(hash) after the batch.
+    Receipts are awaited off the batcher thread, so the next batch can
+    be broadcast while the previous one is being mined.
+    """
+
+    BASE_GAS = 60000
+    GAS_PER_VOTE = 45000
+
+    def __init__(self, service, owner, private_key, window=None, max_size=None):
+        self.service = service
+        self.owner = owner
+        self.private_key = private_key
+        self.window = window if window is not None else float(os.getenv("VOTE_BATCH_WINDOW_MS", "100")) / 1000
+        self.max_size = max_size or int(os.getenv("VOTE_BATCH_SIZE", "50"))
+
+        self._cond = threading.Condition()
+        self._queues = {}       # contract_address → [(hash, candidate_id, future)]
+        self._opened_at = {}    # contract_address → monotonic time of first vote
+        self._thread = None
+        self._thread_pid = None
+
+    def submit(self, voter_hash, candidate_id, contract_address):
+        future = Future()
+        item = (to_bytes32(voter_hash), int(candidate_id), future)
+
+        with self._cond:
+            self._ensure_thread()
+            queue = self._queues.setdefault(contract_address, [])
+            if not queue:
+                self._opened_at[contract_address] = time.monotonic()
+            queue.append(item)
+            self._cond.notify()
+
+        return future
+
+    def _ensure_thread(self):
+        # Threads do not survive fork(); restart in the child
+        if self._thread is None or self._thread_pid != os.getpid() or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="vote-batcher", daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    # ------------------------------------------------------------
+    # BATCHER LOOP
+    # ------------------------------------------------------------
+    def _run(self):
+        while True:
+            with self._cond:
+                ready = self._take_ready()
+                while not ready:
+                    self._cond.wait(timeout=self._next_deadline())
+                    ready = self._take_ready()
+
+            for contract_address, items in ready:
+                self._flush(contract_address, items)
+
+    def _take_ready(self):
+        now = time.monotonic()
+        ready = []
+
+        for address in list(self._queues):
+            queue = self._queues[address]
+            if len(queue) >= self.max_size or now - self._opened_at[address] >= self.window:
+                ready.append((address, queue[:self.max_size]))
+                rest = queue[self.max_size:]
+                if rest:
+                    self._queues[address] = rest
+                    self._opened_at[address] = now
+                else:
+                    del self._queues[address]
+                    del self._opened_at[address]
+
+        return ready
+
+    def _next_deadline(self):
+        if not self._opened_at:
+            return None
+        oldest = min(self._opened_at.values())
+        return max(0.0, self.window - (time.monotonic() - oldest))
+
+    # ------------------------------------------------------------
+    # FLUSH ONE BATCH
+    # ------------------------------------------------------------
+    def _flush(self, contract_address, items):
+        # The same voter twice in one batch: only the first is sent, the
+        # others are resolved once it is mined
+        seen = set()
+        batch, repeats = [], []
+        for voter_hash, candidate_id, future in items:
+            if voter_hash in seen:
+                repeats.append((voter_hash, candidate_id, future))
+                continue
+            seen.add(voter_hash)
+            batch.append((voter_hash, candidate_id, future))
+
+        if not batch:
+            return
+
+        try:
+            contract = self.service.load_contract(contract_address)
+            tx_hash = self.service.submit_transaction(
+                contract.functions.voteBatch(
+                    [h for h, _, _ in batch],
+                    [c for _, c, _ in batch]
+                ),
+                self.owner,
+                self.private_key,
+                gas=self.BASE_GAS + self.GAS_PER_VOTE * len(batch)
+            )
+        except Exception as exc:
+            for _, _, future in batch + repeats:
+                future.set_exception(exc)
+            return
+
+        receipt_future = self.service.watch_receipt(tx_hash)
+        receipt_future.add_done_callback(
+            lambda f: self._resolve(contract, tx_hash, batch, repeats, f)
+        )
+
+    @classmethod
+    def _resolve(cls, contract, tx_hash, batch, repeats, receipt_future):
+        try:
+            receipt = receipt_future.result()
+            if receipt.status != 1:
+                raise RuntimeError(f"voteBatch {Web3.to_hex(tx_hash)} reverted")
+            recorded = {
+                bytes(ev["args"]["voterHash"])
+                for ev in contract.events.VoteCast().process_receipt(receipt)
+            }
+        except Exception as exc:
+            for _, _, future in batch + repeats:
+                future.set_exception(exc)
+            return
+
+        voted = {}
+        for voter_hash, _, future in batch:
+            if voter_hash in recorded:
+                future.set_result(tx_hash.hex())
+            else:
+                future.set_exception(cls._not_recorded(contract, voter_hash, voted))
+        for voter_hash, _, future in repeats:
+            future.set_exception(cls._not_recorded(contract, voter_hash, voted))
+
+    @staticmethod
+    def _not_recorded(contract, voter_hash, voted):
+        """
+        Skipped entry → VoteNotRecorded. The contract skips an entry for
+        an earlier vote by the hash OR an invalid / inactive candidate;
+        hasVoted tells which (one eth_call per skipped hash).
+        """
+        if voter_hash not in voted:
+            try:
+                voted[voter_hash] = bool(contract.functions.hasVoted(voter_hash).call())
+            except Exception as exc:
+                # Unknown: let the caller release its claim, the contract
+                # still refuses a second vote for the hash
+                logger.error("hasVoted check failed: %s", exc)
+                voted[voter_hash] = False
+
+        if voted[voter_hash]:
+            return VoteNotRecorded("Already voted", already_voted=True)
+        return VoteNotRecorded("Vote not recorded: candidate rejected by the contract")
+
+
+# =====================================================
+# CONTRACT JSON (ABI + BYTECODE), PARSED ONCE PER PROCESS
+# =====================================================
+@lru_cache(maxsize=1)
+def load_contract_json():
+    possible_paths = [
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "contract", "ManagedElection.json"),
+        "/app/backend/contract/ManagedElection.json",
+        "/app/contract/ManagedElection.json",
+        "backend/contract/ManagedElection.json",
+        "contract/ManagedElection.json",
+    ]
+
+    json_path = None
+    for p in possible_paths:
+        if os.path.exists(p):
+            json_path = p
+            break
+
+    if not json_path:
+        raise Exception("❌ ManagedElection.json NOT FOUND!")
+
+    with open(json_path, "r") as f:
+        data = json.load(f)
+
+    # Remix / Hardhat JSON compatibility
+    if isinstance(data, list):
+        return data, None
+    return data.get("abi", []), data.get("bytecode")
+
+
+@lru_cache(maxsize=256)
+def checksum_address(address):
+    return Web3.to_checksum_address(address)
+
+
+# =====================================================
+# KEEP-ALIVE HTTP PROVIDER (counts calls, see chain_common)
+# =====================================================
+class CountingHTTPProvider(Web3.HTTPProvider):
+    """
+    HTTPProvider over a pooled keep-alive requests.Session that counts
+    calls (a JSON-RPC batch counts as one round trip).
+
+    cache_allowed_requests serves eth_chainId (checked by web3's
+    validation middleware on every call) from memory.
+    """
+
+    total_calls = 0
+
+    def _count(self, method):
+        CountingHTTPProvider.total_calls += 1
+        RPC_CALLS.inc(method)
+        counter = _rpc_counter.get()
+        if counter is not None:
+            counter.calls += 1
+
+    def _make_request(self, method, request_data):
+        # Below web3's request cache → only real HTTP round trips count
+        self._count(str(method))
+        t0 = time.perf_counter()
+        try:
+            return super()._make_request(method, request_data)
+        finally:
+            record_span("rpc", str(method), time.perf_counter() - t0)
+
+    def make_batch_request(self, batch_requests):
+        self._count("batch")
+        t0 = time.perf_counter()
+        try:
+            return super().make_batch_request(batch_requests)
+        finally:
+            record_span("rpc", f"batch[{len(batch_requests)}]", time.perf_counter() - t0)
+
+
+def build_http_provider(rpc_url):
+    pool_size = int(os.getenv("RPC_POOL_SIZE", "20"))
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return CountingHTTPProvider(
+        rpc_url,
+        request_kwargs={"timeout": float(os.getenv("RPC_TIMEOUT", "30"))},
+        session=session,
+        cache_allowed_requests=True
+    )
 
 
 class BlockchainService:
-    def __init__(self):
+    # Broadcast retries after a nonce resync
+    MAX_SEND_ATTEMPTS = 3
+
+    def __init__(self, web3=None):
         # Ganache RPC (Docker / Local)
         self.rpc_url = os.getenv("RPC_URL", "http://voting-ganache:8545")
-        self.web3 = Web3(Web3.HTTPProvider(self.rpc_url))
-
-        # -------- Locate contract JSON (ABI + Bytecode) --------
-        possible_paths = [
-            "/app/backend/contract/ManagedElection.json",
-            "/app/contract/ManagedElection.json",
-            "backend/contract/ManagedElection.json",
-            "contract/ManagedElection.json",
-        ]
-
-        json_path = None
-        for p in possible_paths:
-            if os.path.exists(p):
-                json_path = p
-                break
-
-        if not json_path:
-            raise Exception("❌ ManagedElection.json NOT FOUND!")
-
-        with open(json_path, "r") as f:
-            data = json.load(f)
-
-        # Remix / Hardhat JSON compatibility
-        if isinstance(data, list):
-            self.abi = data
-            self.bytecode = None
-        else:
-            self.abi = data.get("abi", [])
-            self.bytecode = data.get("bytecode")
+        self.web3 = web3 or Web3(build_http_provider(self.rpc_url))
+
+        self._chain_id = None
+
+        # Receipt polling runs off the request thread
+        self._receipt_pool = ThreadPoolExecutor(
+            max_workers=int(os.getenv("RECEIPT_WORKERS", "4")),
+            thread_name_prefix="receipts"
+        )
+
+        # Vote batching (see VoteBatcher)
+        self.batching_enabled = os.getenv("VOTE_BATCH_ENABLED", "1") == "1"
+        self.batch_result_timeout = float(os.getenv("VOTE_BATCH_TIMEOUT", "120"))
+        self._batcher = None
+        self._batcher_lock = threading.Lock()
+        self._supports = {}
+
+        # Contract objects keyed by lowercase address
+        self._contracts = {}
+        self._contracts_lock = threading.Lock()
+
+        # -------- Contract JSON (ABI + Bytecode) --------
+        self.abi, self.bytecode = load_contract_json()
+
+    # =====================================================
+    # PRE-FORK SERVERS
+    # =====================================================
+    def after_fork(self):
+        """
+        Called in each worker after fork(). Sockets, executor threads,
+        the vote batcher and nonce locks belong to the parent; rebuild
+        them. Cached contract objects stay valid (they reference self.web3,
+        whose provider is swapped in place).
+        """
+        global _nonce_managers_lock
+
+        if isinstance(self.web3.provider, CountingHTTPProvider):
+            self.web3.provider = build_http_provider(self.rpc_url)
+
+        self._receipt_pool = ThreadPoolExecutor(
+            max_workers=int(os.getenv("RECEIPT_WORKERS", "4")),
+            thread_name_prefix="receipts"
+        )
+        self._batcher = None
+        self._batcher_lock = threading.Lock()
+        self._contracts_lock = threading.Lock()
+
+        _nonce_managers_lock = threading.Lock()
+        _nonce_managers.clear()
 
     # =====================================================
     # DEPLOY CONTRACT (NO CONSTRUCTOR ARGUMENT)
@@ -46,57 +507,121 @@ class BlockchainService:
         if not self.bytecode:
             raise Exception("❌ No bytecode found")
 
-        owner = Web3.to_checksum_address(owner)
-
         contract = self.web3.eth.contract(
             abi=self.abi,
             bytecode=self.bytecode
         )
 
-        txn = contract.constructor().build_transaction({
-            "from": owner,
-            "nonce": self.web3.eth.get_transaction_count(owner),
-            "gas": 6000000,
-            "gasPrice": self.web3.to_wei("10", "gwei"),
-        })
-
-        signed = self.web3.eth.account.sign_transaction(txn, private_key)
-        tx_hash = self.web3.eth.send_raw_transaction(signed.raw_transaction)
-        receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
+        tx_hash = self.submit_transaction(
+            contract.constructor(), owner, private_key, gas=6000000
+        )
+        receipt = self.wait_for_receipt(tx_hash)
 
         return receipt.contractAddress, tx_hash.hex()
 
+    # =====================================================
+    # SUBMIT (SIGN + BROADCAST, NO RECEIPT WAIT)
+    # =====================================================
+    @property
+    def chain_id(self):
+        if self._chain_id is None:
+            self._chain_id = self.web3.eth.chain_id
+        return self._chain_id
+
+    def submit_transaction(self, call, owner, private_key, gas):
+        """
+        Build, sign and broadcast a contract call / constructor using a
+        locally allocated nonce. Returns the tx hash immediately.
+        """
+        owner = checksum_address(owner)
+        nonces = get_nonce_manager(self.web3, self.rpc_url, owner)
+
+        for attempt in range(1, self.MAX_SEND_ATTEMPTS + 1):
+            try:
+                # Sign + send hold the sender (all threads and workers)
+                with nonces.reserve() as nonce:
+                    with stage("chain.sign"):
+                        txn = call.build_transaction({
+                            "from": owner,
+                            "nonce": nonce,
+                            "gas": gas,
+                            "gasPrice": self.web3.to_wei(GAS_PRICE_GWEI, "gwei"),
+                            "chainId": self.chain_id,
+                        })
+                        signed = self.web3.eth.account.sign_transaction(txn, private_key)
+
+                    with stage("chain.send"):
+                        return self.web3.eth.send_raw_transaction(signed.raw_transaction)
+            except Exception as exc:
+                # Nothing else was in flight → the next reserve() resyncs safely
+                if not _is_nonce_error(exc) or attempt == self.MAX_SEND_ATTEMPTS:
+                    raise
+                logger.warning("Nonce collision (attempt %s), resynced: %s", attempt, exc)
+
+    # =====================================================
+    # RECEIPTS (DECOUPLED FROM SUBMISSION)
+    # =====================================================
+    def watch_receipt(self, tx_hash, timeout=120):
+        """
+        Start waiting for a receipt in the background → Future[receipt].
+        Failed (status 0) receipts are logged.
+        """
+        future = self._receipt_pool.submit(self.wait_for_receipt, tx_hash, timeout)
+
+        def _log_failure(f):
+            try:
+                receipt = f.result()
+            except Exception as exc:
+                logger.error("Receipt wait failed for %s: %s", Web3.to_hex(tx_hash), exc)
+                return
+            if receipt.status != 1:
+                logger.error("Transaction %s reverted", Web3.to_hex(tx_hash))
+
+        future.add_done_callback(_log_failure)
+        return future
+
+    def wait_for_receipt(self, tx_hash, timeout=120):
+        with stage("chain.receipt_wait"):
+            return self.web3.eth.wait_for_transaction_receipt(tx_hash, timeout)
+
     # =====================================================
     # LOAD DEPLOYED CONTRACT
     # =====================================================
     def load_contract(self, address):
-        return self.web3.eth.contract(
-            address=Web3.to_checksum_address(address),
-            abi=self.abi
-        )
+        """
+        Cached per address: ABI processing + checksum happen once.
+        """
+        key = address.lower()
+        contract = self._contracts.get(key)
+        if contract is None:
+            with self._contracts_lock:
+                contract = self._contracts.get(key)
+                if contract is None:
+                    contract = self.web3.eth.contract(
+                        address=checksum_address(address),
+                        abi=self.abi
+                    )
+                    self._contracts[key] = contract
+        return contract
 
     # =====================================================
     # ADD CANDIDATE (BLOCKCHAIN) ✅ FIXED ORDER
     # =====================================================
     def add_candidate(self, contract_address, name, owner, private_key):
         contract = self.load_contract(contract_address)
-        owner = Web3.to_checksum_address(owner)
-
-        txn = contract.functions.addCandidate(name).build_transaction({
-            "from": owner,
-            "nonce": self.web3.eth.get_transaction_count(owner),
-            "gas": 300000,
-            "gasPrice": self.web3.to_wei("10", "gwei"),
-        })
 
-        signed = self.web3.eth.account.sign_transaction(txn, private_key)
-        tx_hash = self.web3.eth.send_raw_transaction(signed.raw_transaction)
-        self.web3.eth.wait_for_transaction_receipt(tx_hash)
+        tx_hash = self.submit_transaction(
+            contract.functions.addCandidate(name), owner, private_key, gas=300000
+        )
+        receipt = self.wait_for_receipt(tx_hash)
 
-        # 🔥 THIS IS IMPORTANT
-        candidate_id = contract.functions.candidateCount().call()
+        # 🔥 THIS IS IMPORTANT: id from OUR CandidateAdded event
+        # (candidateCount() may already include a concurrent add)
+        events = contract.events.CandidateAdded().process_receipt(receipt)
+        if events:
+            return events[0]["args"]["id"]
 
-        return candidate_id
+        return contract.functions.candidateCount().call()
 
 
     # =====================================================
@@ -104,67 +629,120 @@ class BlockchainService:
     # =====================================================
     def deactivate_candidate(self, contract_address, owner, private_key, candidate_id):
         contract = self.load_contract(contract_address)
-        owner = Web3.to_checksum_address(owner)
 
-        txn = contract.functions.deactivateCandidate(
-            int(candidate_id)
-        ).build_transaction({
-            "from": owner,
-            "nonce": self.web3.eth.get_transaction_count(owner),
-            "gas": 200000,
-            "gasPrice": self.web3.to_wei("10", "gwei"),
-        })
-
-        signed = self.web3.eth.account.sign_transaction(txn, private_key)
-        tx_hash = self.web3.eth.send_raw_transaction(signed.raw_transaction)
-        self.web3.eth.wait_for_transaction_receipt(tx_hash)
+        tx_hash = self.submit_transaction(
+            contract.functions.deactivateCandidate(int(candidate_id)),
+            owner, private_key, gas=200000
+        )
+        self.wait_for_receipt(tx_hash)
 
         return tx_hash.hex()
 
     # =====================================================
     # CAST VOTE (CORE FUNCTION)
     # =====================================================
-    def vote(self, voter_hash, candidate_id, contract_address, owner, private_key):
+    def vote(self, voter_hash, candidate_id, contract_address, owner, private_key, wait=False):
+        """
+        Broadcasts the vote and returns its tx hash without blocking on
+        the receipt (watched in the background). wait=True restores the
+        old blocking behaviour.
+        """
         contract = self.load_contract(contract_address)
-        owner = Web3.to_checksum_address(owner)
-
-        # voter_hash → bytes32
-        if isinstance(voter_hash, str):
-            if voter_hash.startswith("0x"):
-                voter_hash = voter_hash[2:]
-            voter_hash = Web3.to_bytes(hexstr="0x" + voter_hash)
-
-        if len(voter_hash) != 32:
-            raise ValueError("voter_hash must be exactly 32 bytes")
 
+        voter_hash = to_bytes32(voter_hash)
         candidate_id = int(candidate_id)
 
-        txn = contract.functions.vote(
-            voter_hash,
-            candidate_id
-        ).build_transaction({
-            "from": owner,
-            "nonce": self.web3.eth.get_transaction_count(owner),
-            "gas": 300000,
-            "gasPrice": self.web3.to_wei("10", "gwei"),
-        })
+        tx_hash = self.submit_transaction(
+            contract.functions.vote(voter_hash, candidate_id),
+            owner, private_key, gas=300000
+        )
 
-        signed = self.web3.eth.account.sign_transaction(txn, private_key)
-        tx_hash = self.web3.eth.send_raw_transaction(signed.raw_transaction)
-        self.web3.eth.wait_for_transaction_receipt(tx_hash)
+        if wait:
+            self.wait_for_receipt(tx_hash)
+        else:
+            self.watch_receipt(tx_hash)
 
         return tx_hash.hex()
 
+    # =====================================================
+    # CAST VOTE VIA BATCHER (voteBatch) WHEN AVAILABLE
+    # =====================================================
+    def submit_vote(self, voter_hash, candidate_id, contract_address, owner, private_key):
+        """
+        Vote-path entry point: coalesces into a voteBatch transaction when
+        batching is enabled and the deployed contract has voteBatch,
+        otherwise falls back to a single vote() transaction.
+        Returns the tx hash that recorded this vote.
+        """
+        if self.batching_enabled and self.supports_function(contract_address, "voteBatch"):
+            future = self.get_vote_batcher(owner, private_key).submit(
+                voter_hash, candidate_id, contract_address
+            )
+            # Batch window + voteBatch receipt
+            with stage("chain.batch_wait"):
+                return future.result(timeout=self.batch_result_timeout)
+
+        return self.vote(voter_hash, candidate_id, contract_address, owner, private_key)
+
+    def get_vote_batcher(self, owner, private_key):
+        with self._batcher_lock:
+            if self._batcher is None:
+                self._batcher = VoteBatcher(self, owner, private_key)
+            return self._batcher
+
+    def supports_function(self, contract_address, fn_name):
+        """
+        True if the DEPLOYED bytecode dispatches fn_name.
+        Contracts deployed before a function was added to the ABI do not
+        have it; checked once per (address, function) via eth_getCode.
+        """
+        key = (contract_address.lower(), fn_name)
+        if key not in self._supports:
+            abi_fn = next(
+                (x for x in self.abi if x.get("type") == "function" and x.get("name") == fn_name),
+                None
+            )
+            if abi_fn is None:
+                self._supports[key] = False
+            else:
+                signature = "{}({})".format(
+                    fn_name, ",".join(i["type"] for i in abi_fn["inputs"])
+                )
+                selector = Web3.keccak(text=signature)[:4]
+                code = self.web3.eth.get_code(checksum_address(contract_address))
+                # PUSH4 <selector> in the function dispatcher
+                self._supports[key] = (b"\x63" + selector) in bytes(code)
+        return self._supports[key]
+
     # =====================================================
     # GET RESULTS (VOTE COUNT ONLY)
     # =====================================================
     def get_results(self, contract_address):
+        """
+        One eth_call via getAllCandidates() on current contracts;
+        contracts deployed before that view existed fall back to a
+        JSON-RPC batch of candidates(i) calls.
+        """
+        with stage("chain.get_results"):
+            return self._get_results(contract_address)
+
+    def _get_results(self, contract_address):
         contract = self.load_contract(contract_address)
+
+        if self.supports_function(contract_address, "getAllCandidates"):
+            ids, names, votes, active = contract.functions.getAllCandidates().call()
+            return [{
+                "candidate_id": ids[i],
+                "name": names[i],
+                "voteCount": votes[i],
+                "isActive": active[i]
+            } for i in range(len(ids))]
+
         count = contract.functions.candidateCount().call()
+        rows = self._call_candidates_batched(contract, count)
 
         results = []
-        for i in range(1, count + 1):
-            c = contract.functions.candidates(i).call()
+        for i, c in enumerate(rows, start=1):
             results.append({
                 "candidate_id": i,
                 "name": c[1],        # string name
@@ -174,6 +752,19 @@ class BlockchainService:
 
         return results
 
+    def _call_candidates_batched(self, contract, count):
+        if count == 0:
+            return []
+
+        try:
+            with self.web3.batch_requests() as batch:
+                for i in range(1, count + 1):
+                    batch.add(contract.functions.candidates(i))
+                return batch.execute()
+        except Web3TypeError:
+            # Provider without batch support → sequential calls
+            return [contract.functions.candidates(i).call() for i in range(1, count + 1)]
+
 
     # =====================================================
     # DEPLOY NEW ELECTION CONTRACT (HELPER)
@@ -186,3 +777,23 @@ class BlockchainService:
             raise Exception("OWNER_ADDRESS or PRIVATE_KEY missing")
 
         return self.deploy_contract(owner, private_key)
+
+
+# =====================================================
+# PROCESS-WIDE INSTANCE
+# =====================================================
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_blockchain_service():
+    """
+    The one BlockchainService of this process (shared Web3 provider,
+    HTTP connection pool, contract cache and receipt pool).
+    """
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = BlockchainService()
+    return _service
@@ -0,0 +1,473 @@
+# backend/services/bulk_import_service.py
+
+import csv
+import io
+import logging
+import os
+import secrets
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from backend.database import db
+from backend.models import ImportJob, Voter
+from backend.utils.encoding_utils import compute_voter_hash, pack_encodings
+from backend.utils.process_utils import pid_alive
+from .face_service import FaceService, face_index, frame_encoder
+
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+REPORT_FIELDS = ["row", "name", "enrollment", "image", "status", "reason", "duplicate_of", "distance"]
+
+IMPORT_JOB_DIR = os.getenv(
+    "IMPORT_JOB_DIR", os.path.join(tempfile.gettempdir(), "voting-import-jobs")
+)
+
+
+class BulkImportService:
+    """
+    Enrolls a whole roll of voters from a CSV (name, enrollment[, image])
+    and a zip of photos.
+
+    Pipeline:
+      1️⃣ validate rows (missing fields, repeated / existing enrollment,
+         missing photo)
+      2️⃣ encode photos on the FrameEncoder process pool, one chunk of
+         the archive at a time
+      3️⃣ duplicate faces inside the batch: blockwise pairwise distance
+         matrix against the earlier accepted rows
+      4️⃣ duplicate faces against enrolled voters: one
+         FaceIndex.nearest_many pass
+      5️⃣ executemany INSERT in batches, then refresh the face index
+
+    Every CSV row gets one report entry with status "imported", "valid"
+    (dry run) or "skipped" plus a reason.
+
+    Photos pass their own quality gates, not the webcam ones: the
+    Laplacian blur score falls with resolution and plain studio
+    backgrounds, so a sharp 1280px portrait can score below the webcam
+    threshold. By default only near-black photos are rejected before
+    face detection decides.
+    """
+
+    def __init__(self, tolerance=0.45, encode_chunk=None, insert_batch=None, block_size=None,
+                 min_blur=None, min_brightness=None):
+        self.tolerance = tolerance
+        self.encode_chunk = encode_chunk or int(os.getenv("IMPORT_ENCODE_CHUNK", "256"))
+        self.insert_batch = insert_batch or int(os.getenv("IMPORT_INSERT_BATCH", "500"))
+        self.block_size = block_size or int(os.getenv("IMPORT_DUPLICATE_BLOCK", "512"))
+        self.gates = {
+            "min_blur": min_blur if min_blur is not None else float(os.getenv("IMPORT_MIN_BLUR", "0")),
+            "min_brightness": (
+                min_brightness if min_brightness is not None
+                else float(os.getenv("IMPORT_MIN_BRIGHTNESS", "10"))
+            ),
+        }
+        self.face_service = FaceService()
+
+    # ------------------------------------------------------------
+    # ENTRY POINT
+    # ------------------------------------------------------------
+    def import_voters(self, csv_file, zip_file, dry_run=False):
+        """
+        csv_file: text or binary file object; zip_file: path or file object.
+        Returns (summary, report).
+        """
+        rows = self._read_csv(csv_file)
+
+        with zipfile.ZipFile(zip_file) as archive:
+            images = self._index_archive(archive)
+            pending = self._validate(rows, images)
+            encoded = self._encode(pending, archive)
+
+        accepted = self._dedupe_batch(encoded)
+        accepted = self._dedupe_existing(accepted)
+
+        if dry_run:
+            for row in accepted:
+                row["status"] = "valid"
+        else:
+            self._insert(accepted)
+
+        report = [self._report_entry(row) for row in rows]
+        return self._summarize(report), report
+
+    # ------------------------------------------------------------
+    # 1️⃣ INPUT
+    # ------------------------------------------------------------
+    @staticmethod
+    def _read_csv(csv_file):
+        if hasattr(csv_file, "read"):
+            data = csv_file.read()
+            text = data.decode("utf-8-sig") if isinstance(data, bytes) else data
+        else:
+            with open(csv_file, encoding="utf-8-sig") as fh:
+                text = fh.read()
+
+        reader = csv.DictReader(io.StringIO(text))
+        if not reader.fieldnames:
+            raise ValueError("CSV is empty")
+
+        fields = {f.strip().lower(): f for f in reader.fieldnames}
+        missing = {"name", "enrollment"} - set(fields)
+        if missing:
+            raise ValueError(f"CSV missing column(s): {', '.join(sorted(missing))}")
+
+        rows = []
+        for number, record in enumerate(reader, start=2):
+            rows.append({
+                "row": number,
+                "name": (record.get(fields["name"]) or "").strip(),
+                "enrollment": (record.get(fields["enrollment"]) or "").strip(),
+                "image": (record.get(fields["image"]) or "").strip() if "image" in fields else "",
+                "status": "skipped",
+                "reason": None,
+                "encoding": None,
+            })
+        return rows
+
+    @staticmethod
+    def _index_archive(archive):
+        """
+        Archive members by file name and by stem, so a row can reference
+        its photo explicitly or just be named after the enrollment.
+        """
+        images = {}
+        for member in archive.namelist():
+            base = os.path.basename(member)
+            stem, ext = os.path.splitext(base)
+            if not base or ext.lower() not in IMAGE_EXTENSIONS:
+                continue
+            images.setdefault(base.lower(), member)
+            images.setdefault(stem.lower(), member)
+        return images
+
+    def _validate(self, rows, images):
+        pending = []
+        seen = set()
+
+        for row in rows:
+            if not row["name"] or not row["enrollment"]:
+                row["reason"] = "missing_fields"
+                continue
+
+            key = row["enrollment"].lower()
+            if key in seen:
+                row["reason"] = "duplicate_enrollment_in_batch"
+                continue
+            seen.add(key)
+
+            lookup = os.path.basename(row["image"]).lower() if row["image"] else key
+            member = images.get(lookup)
+            if member is None:
+                row["reason"] = "missing_image"
+                continue
+
+            row["member"] = member
+            row["image"] = member
+            pending.append(row)
+
+        existing = self._existing_enrollments([r["enrollment"] for r in pending])
+        for row in pending:
+            if row["enrollment"] in existing:
+                row["reason"] = "enrollment_exists"
+
+        return [r for r in pending if r["reason"] is None]
+
+    def _existing_enrollments(self, enrollments):
+        existing = set()
+        for i in range(0, len(enrollments), self.insert_batch):
+            chunk = enrollments[i:i + self.insert_batch]
+            existing.update(
+                e for (e,) in db.session.query(Voter.enrollment)
+                .filter(Voter.enrollment.in_(chunk))
+            )
+        return existing
+
+    # ------------------------------------------------------------
+    # 2️⃣ ENCODE (PROCESS POOL)
+    # ------------------------------------------------------------
+    def _encode(self, pending, archive):
+        encoded = []
+
+        for i in range(0, len(pending), self.encode_chunk):
+            chunk = pending[i:i + self.encode_chunk]
+            images = [archive.read(row["member"]) for row in chunk]
+
+            for row, (enc, entry) in zip(chunk, frame_encoder.encode_images(images, self.gates)):
+                if enc is None:
+                    row["reason"] = entry["reason"] or "no_face"
+                    continue
+                row["encoding"] = np.asarray(enc, dtype=np.float64)
+                encoded.append(row)
+
+        return encoded
+
+    # ------------------------------------------------------------
+    # 3️⃣ DUPLICATES INSIDE THE BATCH
+    # ------------------------------------------------------------
+    def _dedupe_batch(self, rows):
+        """
+        A row is a duplicate if its face is within tolerance of an
+        EARLIER accepted row. Distances are computed one block of rows
+        at a time (block × n), so memory stays bounded for large rolls.
+        """
+        if len(rows) < 2:
+            return rows
+
+        matrix = np.vstack([r["encoding"] for r in rows])
+        norms = np.einsum("ij,ij->i", matrix, matrix)
+        accepted = np.zeros(len(rows), dtype=bool)
+        tol_sq = self.tolerance ** 2
+
+        for start in range(0, len(rows), self.block_size):
+            end = min(start + self.block_size, len(rows))
+            block = matrix[start:end]
+            sq = norms[start:end, None] - 2.0 * (block @ matrix[:end].T) + norms[None, :end]
+
+            for offset in range(end - start):
+                i = start + offset
+                hits = np.flatnonzero(accepted[:i] & (sq[offset, :i] <= tol_sq))
+                if hits.size == 0:
+                    accepted[i] = True
+                    continue
+
+                j = int(hits[np.argmin(sq[offset, hits])])
+                rows[i]["reason"] = "duplicate_face_in_batch"
+                rows[i]["duplicate_of"] = rows[j]["enrollment"]
+                rows[i]["distance"] = float(np.sqrt(max(sq[offset, j], 0.0)))
+
+        return [row for row, ok in zip(rows, accepted) if ok]
+
+    # ------------------------------------------------------------
+    # 4️⃣ DUPLICATES AGAINST ENROLLED VOTERS
+    # ------------------------------------------------------------
+    def _dedupe_existing(self, rows):
+        if not rows:
+            return rows
+
+        face_index.refresh()
+        voter_ids, distances = face_index.nearest_many([r["encoding"] for r in rows])
+
+        hit_ids = {int(v) for v, d in zip(voter_ids, distances) if d <= self.tolerance}
+        enrollments = {}
+        if hit_ids:
+            enrollments = dict(
+                db.session.query(Voter.id, Voter.enrollment)
+                .filter(Voter.id.in_(hit_ids))
+            )
+
+        # Voters deleted by another worker are still in this index
+        for stale in hit_ids - set(enrollments):
+            face_index.remove(stale)
+
+        accepted = []
+        for row, voter_id, distance in zip(rows, voter_ids, distances):
+            voter_id = int(voter_id)
+
+            if distance <= self.tolerance and voter_id not in enrollments:
+                match = self.face_service.find_duplicate(row["encoding"], self.tolerance)
+                if match is not None:
+                    voter_id, distance = match
+                    enrollments[voter_id] = db.session.get(Voter, voter_id).enrollment
+
+            if distance <= self.tolerance and voter_id in enrollments:
+                row["reason"] = "duplicate_face_existing"
+                row["duplicate_of"] = enrollments[voter_id]
+                row["distance"] = float(distance)
+                continue
+
+            accepted.append(row)
+
+        return accepted
+
+    # ------------------------------------------------------------
+    # 5️⃣ BULK INSERT
+    # ------------------------------------------------------------
+    def _insert(self, rows):
+        for i in range(0, len(rows), self.insert_batch):
+            batch = rows[i:i + self.insert_batch]
+            values = [self._voter_values(row) for row in batch]
+
+            try:
+                db.session.execute(insert(Voter), values)
+                db.session.commit()
+                for row in batch:
+                    row["status"] = "imported"
+            except IntegrityError:
+                # Someone registered one of these enrollments meanwhile:
+                # fall back to row-by-row for this batch only
+                db.session.rollback()
+                self._insert_one_by_one(batch, values)
+
+        face_index.refresh()
+
+    @staticmethod
+    def _insert_one_by_one(batch, values):
+        for row, value in zip(batch, values):
+            try:
+                db.session.execute(insert(Voter), [value])
+                db.session.commit()
+                row["status"] = "imported"
+            except IntegrityError:
+                db.session.rollback()
+                row["reason"] = "enrollment_exists"
+
+    @staticmethod
+    def _voter_values(row):
+        face_data = pack_encodings([row["encoding"]])
+        return {
+            "name": row["name"],
+            "enrollment": row["enrollment"],
+            "face_data": face_data,
+            "voter_hash": compute_voter_hash(face_data),
+            "has_voted": False,
+        }
+
+    # ------------------------------------------------------------
+    # REPORT
+    # ------------------------------------------------------------
+    @staticmethod
+    def _report_entry(row):
+        return {
+            "row": row["row"],
+            "name": row["name"],
+            "enrollment": row["enrollment"],
+            "image": row["image"],
+            "status": row["status"],
+            "reason": row["reason"],
+            "duplicate_of": row.get("duplicate_of"),
+            "distance": round(row["distance"], 4) if row.get("distance") is not None else None,
+        }
+
+    @staticmethod
+    def _summarize(report):
+        summary = {"rows": len(report), "imported": 0, "valid": 0, "skipped": {}}
+        for entry in report:
+            if entry["status"] == "skipped":
+                summary["skipped"][entry["reason"]] = summary["skipped"].get(entry["reason"], 0) + 1
+            else:
+                summary[entry["status"]] += 1
+        return summary
+
+    @staticmethod
+    def write_report(report, path):
+        with open(path, "w", newline="", encoding="utf-8") as fh:
+            writer = csv.DictWriter(fh, fieldnames=REPORT_FIELDS)
+            writer.writeheader()
+            writer.writerows(report)
+
+
+# ============================================================
+# BACKGROUND JOBS (ADMIN UPLOADS)
+# ============================================================
+class ImportJobQueue:
+    """
+    Runs uploaded imports off the request thread, so a large roll does
+    not hit GUNICORN_TIMEOUT. One job at a time per process: imports
+    share the FrameEncoder pool with live logins.
+
+    Job state lives in the import_job table, so any worker can answer
+    the status call. Uploads and the per-row CSV report live in
+    IMPORT_JOB_DIR/<job id>/, which all workers must share (one host,
+    as for NONCE_LOCK_DIR).
+    """
+
+    def __init__(self, job_dir=None):
+        self.job_dir = job_dir or IMPORT_JOB_DIR
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def after_fork(self):
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def path(self, job_id, name=""):
+        return os.path.join(self.job_dir, job_id, name)
+
+    def report_path(self, job_id):
+        return self.path(job_id, "report.csv")
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="import-job")
+            return self._executor
+
+    def submit(self, app, csv_file, zip_file, dry_run=False):
+        """
+        Save both uploads (werkzeug FileStorage), record the job and
+        queue it. Returns the ImportJob row.
+        """
+        job = ImportJob(id=secrets.token_hex(16), status="queued", dry_run=dry_run)
+
+        os.makedirs(self.path(job.id), exist_ok=True)
+        csv_file.save(self.path(job.id, "voters.csv"))
+        zip_file.save(self.path(job.id, "photos.zip"))
+
+        db.session.add(job)
+        db.session.commit()
+
+        self._get_executor().submit(self._run, app, job.id, dry_run)
+        return job
+
+    def _run(self, app, job_id, dry_run):
+        with app.app_context():
+            job = db.session.get(ImportJob, job_id)
+            job.status = "running"
+            job.worker_pid = os.getpid()
+            db.session.commit()
+
+            try:
+                service = BulkImportService()
+                summary, report = service.import_voters(
+                    self.path(job_id, "voters.csv"),
+                    self.path(job_id, "photos.zip"),
+                    dry_run=dry_run
+                )
+                service.write_report(report, self.report_path(job_id))
+                job.status, job.summary = "done", summary
+            except (ValueError, zipfile.BadZipFile) as e:
+                db.session.rollback()
+                job.status, job.error = "failed", str(e)
+            except Exception as e:
+                db.session.rollback()
+                logger.exception("Import job %s failed", job_id)
+                job.status, job.error = "failed", str(e)
+            finally:
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+                db.session.remove()
+
+                for name in ("voters.csv", "photos.zip"):
+                    try:
+                        os.remove(self.path(job_id, name))
+                    except OSError:
+                        pass
+
+    def get(self, job_id):
+        """
+        The job row, or None. A running job whose worker is gone (killed
+        or restarted mid-import) is marked failed.
+        """
+        job = db.session.get(ImportJob, job_id)
+        if job is None or job.status != "running" or pid_alive(job.worker_pid):
+            return job
+
+        job.status, job.error = "failed", "Worker exited during the import"
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        return job
+
+
+# Process-wide queue used by the admin upload route
+import_jobs = ImportJobQueue()
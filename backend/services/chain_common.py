@@ -0,0 +1,47 @@
+# backend/services/chain_common.py
+#
+# web3-free pieces of the blockchain layer: request-scoped RPC counting
+# and vote errors. Kept apart from blockchain_service so the app factory
+# and routes can use them without importing web3 at startup.
+
+from contextvars import ContextVar
+
+
+# =====================================================
+# RPC CALL COUNTING
+# =====================================================
+_rpc_counter = ContextVar("rpc_counter", default=None)
+
+
+class RpcCounter:
+    """Mutable per-request RPC call count (see start_rpc_count)."""
+
+    def __init__(self):
+        self.calls = 0
+
+
+def start_rpc_count():
+    """Begin counting RPC calls for the current request/context."""
+    counter = RpcCounter()
+    _rpc_counter.set(counter)
+    return counter
+
+
+def current_rpc_count():
+    counter = _rpc_counter.get()
+    return counter.calls if counter else 0
+
+
+# =====================================================
+# ERRORS
+# =====================================================
+class VoteNotRecorded(Exception):
+    """
+    voteBatch skipped this entry. already_voted tells the two causes
+    apart: True when the contract holds a vote for the hash (keep the
+    participation claim), False for a candidate it rejected.
+    """
+
+    def __init__(self, message, already_voted=False):
+        super().__init__(message)
+        self.already_voted = already_voted
@@ -1,8 +1,11 @@
-from backend.models import Election, Candidate
+from backend.models import Election, Candidate, VoterParticipation
 from backend.database import db
-from .blockchain_service import BlockchainService
+from backend.utils.metrics import timed
+from sqlalchemy import exists, true
 import os
 import random
+import threading
+import time
 
 
 
@@ -10,14 +13,131 @@ import random
 # ⭐ STEP 2 — UNIQUE 4–8 digit election ID generator
 # =====================================================
 def generate_unique_election_id():
-    """Generates a random 4 to 8 digit election ID."""
-    return random.randint(1000, 99999999)
+    """
+    Generates a random 4 to 8 digit election ID.
+    Participation rows outlive deleted elections, so an id that already
+    has any is never handed out again.
+    """
+    while True:
+        candidate_id = random.randint(1000, 99999999)
+        taken = (
+            db.session.get(Election, candidate_id) is not None
+            or db.session.query(VoterParticipation.id)
+            .filter_by(election_id=candidate_id).first() is not None
+        )
+        if not taken:
+            return candidate_id
+
+
+# =====================================================
+# ACTIVE ELECTION CACHE (VOTE HOT PATH)
+# =====================================================
+class CandidateRef:
+    """Plain, session-independent copy of a Candidate row."""
+
+    __slots__ = ("id", "name", "party", "photo", "on_chain_id", "election_id")
+
+    def __init__(self, candidate):
+        self.id = candidate.id
+        self.name = candidate.name
+        self.party = candidate.party
+        self.photo = candidate.photo
+        self.on_chain_id = candidate.on_chain_id
+        self.election_id = candidate.election_id
+
+
+class ActiveElection:
+    """
+    Plain copy of the active Election plus its on_chain_id → CandidateRef
+    map. Exposes the same attributes routes read from the ORM object.
+    """
+
+    is_active = True
+
+    def __init__(self, election, candidates):
+        self.id = election.id
+        self.name = election.name
+        self.contract_address = election.contract_address
+        self.candidates = {
+            c.on_chain_id: CandidateRef(c)
+            for c in candidates
+            if c.on_chain_id is not None
+        }
+
+    def get_candidate(self, on_chain_id):
+        return self.candidates.get(int(on_chain_id))
+
+
+class ElectionCache:
+    """
+    Versioned in-process cache of the active election.
+
+    invalidate() bumps the version; a load that started before the bump
+    is never stored, so a commit followed by invalidate() can not be
+    overwritten by stale data. Other server processes do not see this
+    process' invalidations, so entries also expire after
+    ELECTION_CACHE_TTL seconds, and the vote path re-checks its target
+    against the database (ElectionService.get_vote_target).
+    """
+
+    _MISSING = object()
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl if ttl is not None else float(os.getenv("ELECTION_CACHE_TTL", "5"))
+        self._lock = threading.Lock()
+        self._version = 0
+        self._entry = None      # (version, loaded_at, ActiveElection | None)
+
+    def after_fork(self):
+        self._lock = threading.Lock()
+        self._entry = None
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+            self._entry = None
+
+    def get(self):
+        entry = self._entry
+        if (
+            entry is not None
+            and entry[0] == self._version
+            and time.monotonic() - entry[1] < self.ttl
+        ):
+            return entry[2]
+
+        with self._lock:
+            version = self._version
+
+        snapshot = self._load()
+
+        with self._lock:
+            if self._version == version:
+                self._entry = (version, time.monotonic(), snapshot)
+
+        return snapshot
+
+    @staticmethod
+    def _load():
+        election = Election.query.filter_by(is_active=True).first()
+        if not election:
+            return None
+
+        candidates = Candidate.query.filter_by(election_id=election.id).all()
+        return ActiveElection(election, candidates)
+
+
+# Process-wide cache, invalidated by every election/candidate write
+election_cache = ElectionCache()
 
 
 class ElectionService:
 
-    def __init__(self):
-        self.bc_service = BlockchainService()
+    @property
+    def bc_service(self):
+        # web3 is imported on first contract call, not at app import
+        from .blockchain_service import get_blockchain_service
+        return get_blockchain_service()
 
     # =====================================================
     # ====================== ELECTION ======================
@@ -53,6 +173,7 @@ class ElectionService:
 
         db.session.add(election)
         db.session.commit()
+        election_cache.invalidate()
 
         return election
 
@@ -60,7 +181,50 @@ class ElectionService:
         return Election.query.get(election_id)
 
     def get_active(self):
-        return Election.query.filter_by(is_active=True).first()
+        """
+        Cached ActiveElection (id, name, contract_address, candidates)
+        or None. No queries while the cache is warm.
+        """
+        return election_cache.get()
+
+    def get_vote_target(self, on_chain_id):
+        """
+        (ActiveElection, CandidateRef) for a vote, (election, None) for
+        an unknown candidate, (None, None) without a votable election.
+
+        The cache can be ELECTION_CACHE_TTL behind a change made on
+        another worker, so a cached hit is confirmed with one EXISTS on
+        two primary keys. A failed check or an unknown candidate drops
+        this worker's cache and resolves once more from fresh rows.
+        """
+        on_chain_id = int(on_chain_id)
+
+        for attempt in range(2):
+            election = self.get_active()
+            if not election or not election.contract_address:
+                return None, None
+
+            candidate = election.get_candidate(on_chain_id)
+            if candidate is not None and self._is_current(election, candidate):
+                return election, candidate
+
+            if attempt == 0:
+                election_cache.invalidate()
+
+        return election, None
+
+    @timed("db.confirm_vote_target")
+    def _is_current(self, election, candidate):
+        return db.session.query(
+            exists().where(
+                Election.id == election.id,
+                Election.is_active == true(),
+                Election.contract_address == election.contract_address,
+                Candidate.id == candidate.id,
+                Candidate.election_id == Election.id,
+                Candidate.on_chain_id == candidate.on_chain_id,
+            )
+        ).scalar()
 
     def set_active(self, election_id):
         """
@@ -72,6 +236,7 @@ class ElectionService:
         if election:
             election.is_active = True
             db.session.commit()
+        election_cache.invalidate()
 
         return election
 
@@ -79,6 +244,7 @@ class ElectionService:
         """Turns off all elections."""
         Election.query.update({Election.is_active: False})
         db.session.commit()
+        election_cache.invalidate()
 
     def get_all_elections(self):
         return Election.query.all()
@@ -109,6 +275,7 @@ class ElectionService:
 
         db.session.add(candidate)
         db.session.commit()
+        election_cache.invalidate()
 
         return candidate
 
@@ -129,6 +296,7 @@ class ElectionService:
 
         db.session.delete(candidate)
         db.session.commit()
+        election_cache.invalidate()
         return True
 
     # =====================================================
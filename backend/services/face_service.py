@@ -1,10 +1,1351 @@
 # backend/services/face_service.py
 
-import face_recognition
 import numpy as np
 import hashlib
-import cv2
-from PIL import Image
+import os
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from backend.database import db
+from backend.utils.encoding_utils import ENCODING_DIM, load_encodings
+from backend.utils.image_utils import decode_frame, frame_to_bytes
+from backend.utils.lazy import lazy_import
+from backend.utils.metrics import FACE_FRAMES, observe_stage, stage
+
+# dlib models load on first use (or in serving.warm_up), not at import
+face_recognition = lazy_import("face_recognition")
+cv2 = lazy_import("cv2")
+
+
+class CoarsePartition:
+    """
+    IVF-style approximate index: k-means centroids over the encodings
+    and one inverted list of row positions per centroid.
+
+    A query only scans the rows in its `nprobe` closest lists, so the
+    cost is O(nlist·128 + N·nprobe/nlist·128) instead of O(N·128).
+    Built with NumPy only.
+    """
+
+    def __init__(self, centroids, assign, size):
+        self.centroids = centroids
+        self.centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+        self.nlist = centroids.shape[0]
+
+        # Row → list id, same capacity as the FaceIndex arrays
+        self.assign = assign
+
+        order = np.argsort(assign[:size], kind="stable")
+        bounds = np.searchsorted(assign[:size][order], np.arange(self.nlist + 1))
+        self.lists = [order[bounds[i]:bounds[i + 1]] for i in range(self.nlist)]
+
+        # Rows appended after the build (python lists, append is atomic)
+        self.tails = [[] for _ in range(self.nlist)]
+        self.built_size = size
+
+    # ------------------------------------------------------------
+    # TRAINING
+    # ------------------------------------------------------------
+    SAMPLE_PER_LIST = 256
+    SPLIT_EPS = 1.0 / 1024
+
+    @classmethod
+    def train(cls, matrix, norms, capacity, nlist, iterations=20, seed=0):
+        """
+        k-means on a sample of SAMPLE_PER_LIST rows per list, then
+        assign every row.
+
+        List sizes set the query cost (a probe scans whole lists), so
+        after each update near-empty lists are re-seeded to split the
+        largest ones, until no list holds more than twice the mean.
+        """
+        size = matrix.shape[0]
+        rng = np.random.default_rng(seed)
+
+        sample_size = min(size, nlist * cls.SAMPLE_PER_LIST)
+        sample = matrix[np.sort(rng.choice(size, sample_size, replace=False))]
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+
+        for iteration in range(iterations):
+            labels = cls._closest(sample, None, centroids)
+            counts = np.bincount(labels, minlength=nlist)
+
+            order = np.argsort(labels, kind="stable")
+            filled = np.flatnonzero(counts)
+            starts = np.concatenate(([0], np.cumsum(counts[filled])[:-1]))
+            centroids[filled] = (
+                np.add.reduceat(sample[order], starts, axis=0) / counts[filled, None]
+            )
+
+            if iteration < iterations - 1:
+                cls._split_largest(centroids, counts, sample_size / nlist)
+
+        assign = np.empty(capacity, dtype=np.int32)
+        assign[:size] = cls._closest(matrix, norms, centroids)
+
+        return cls(centroids, assign, size)
+
+    @classmethod
+    def _split_largest(cls, centroids, counts, mean):
+        """
+        Move lists holding under mean/8 rows (their rows go to neighbours
+        on the next assignment) next to the largest list, perturbing the
+        two centroids apart so the next update splits it.
+        """
+        sign = np.where(np.arange(centroids.shape[1]) % 2 == 0, 1.0, -1.0).astype(centroids.dtype)
+
+        for small in np.argsort(counts, kind="stable"):
+            if counts[small] >= max(1.0, mean / 8):
+                break
+            large = int(np.argmax(counts))
+            if counts[large] <= 2 * mean:
+                break
+
+            centroids[small] = centroids[large] * (1 + sign * cls.SPLIT_EPS)
+            centroids[large] = centroids[large] * (1 - sign * cls.SPLIT_EPS)
+            counts[small] = counts[large] // 2
+            counts[large] -= counts[small]
+
+    @staticmethod
+    def _closest(rows, row_norms, centroids, chunk=65536):
+        """
+        Nearest centroid for every row, chunked to bound memory.
+        """
+        c_norms = np.einsum("ij,ij->i", centroids, centroids)
+        labels = np.empty(rows.shape[0], dtype=np.int32)
+
+        for start in range(0, rows.shape[0], chunk):
+            block = rows[start:start + chunk]
+            # ||row||² is constant per row, so it does not change argmin
+            scores = c_norms[None, :] - 2.0 * (block @ centroids.T)
+            labels[start:start + chunk] = np.argmin(scores, axis=1)
+
+        return labels
+
+    # ------------------------------------------------------------
+    # UPDATES
+    # ------------------------------------------------------------
+    def assign_rows(self, rows, start):
+        labels = self._closest(rows, None, self.centroids)
+        self.assign[start:start + rows.shape[0]] = labels
+        for offset, label in enumerate(labels):
+            self.tails[label].append(start + offset)
+
+    def grow(self, capacity, size):
+        assign = np.empty(capacity, dtype=np.int32)
+        assign[:size] = self.assign[:size]
+        self.assign = assign
+
+    # ------------------------------------------------------------
+    # QUERY
+    # ------------------------------------------------------------
+    def candidates(self, q, nprobe, size):
+        """
+        Row positions in the `nprobe` lists closest to q.
+        """
+        nprobe = min(nprobe, self.nlist)
+        scores = self.centroid_norms - 2.0 * (self.centroids @ q)
+        probes = np.argpartition(scores, nprobe - 1)[:nprobe]
+
+        parts = []
+        for p in probes:
+            parts.append(self.lists[p])
+            if self.tails[p]:
+                parts.append(np.asarray(self.tails[p], dtype=np.int64))
+
+        rows = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+        # Tail rows may be newer than the caller's snapshot
+        return rows[rows < size]
+
+
+class FaceIndex:
+    """
+    In-memory index of every enrolled voter face.
+
+    All encodings live in ONE contiguous float32 matrix (plus a parallel
+    voter id array and precomputed squared norms), so a duplicate check
+    is a single vectorized distance pass instead of a per-row JSON decode.
+
+    Rows are appended in place into spare capacity; readers take a
+    snapshot of (matrix, ids, norms) views under the lock and compute
+    outside it, so queries never block each other.
+
+    mode="ivf" adds an approximate CoarsePartition once the index holds
+    at least `ann_min_size` rows: only `nprobe` partitions are scanned,
+    then the candidates are re-ranked with the exact distance. It is
+    trained at startup (load_from_db) and retrained on a background
+    thread; queries use the previous partition (or the exact scan)
+    until the new one is swapped in.
+    """
+
+    # Candidates given the float64 distance after the float32 ranking
+    RERANK_K = 16
+
+    # Ids below the watermark re-checked by refresh(): ids are allocated
+    # at INSERT but visible at COMMIT, so in-flight registrations sit
+    # just under the newest loaded id
+    GAP_SPAN = 1000
+
+    def __init__(
+        self,
+        dim=ENCODING_DIM,
+        initial_capacity=1024,
+        mode="exact",
+        nlist=None,
+        nprobe=8,
+        ann_min_size=50000,
+        gap_ttl=600
+    ):
+        self.dim = dim
+        self.mode = mode
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.ann_min_size = ann_min_size
+        self.gap_ttl = gap_ttl
+
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._build_thread = None
+        self._generation = 0
+        self._matrix = np.empty((initial_capacity, dim), dtype=np.float32)
+        self._norms = np.empty(initial_capacity, dtype=np.float32)
+        self._ids = np.empty(initial_capacity, dtype=np.int64)
+        self._ivf = None
+        self._size = 0
+        self._max_id = 0
+        self._gaps = {}     # voter id → monotonic time it was first missing
+        self.loaded = False
+
+    @classmethod
+    def from_env(cls):
+        nlist = os.getenv("FACE_INDEX_NLIST")
+        return cls(
+            mode=os.getenv("FACE_INDEX_MODE", "exact").lower(),
+            nlist=int(nlist) if nlist else None,
+            nprobe=int(os.getenv("FACE_INDEX_NPROBE", "8")),
+            ann_min_size=int(os.getenv("FACE_INDEX_ANN_MIN_SIZE", "50000")),
+            gap_ttl=float(os.getenv("FACE_INDEX_GAP_TTL", "600"))
+        )
+
+    def __len__(self):
+        return self._size
+
+    def after_fork(self):
+        """
+        Fresh locks in a forked worker; the arrays are shared
+        copy-on-write with the parent until the first write.
+        """
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._build_thread = None
+
+    # ------------------------------------------------------------
+    # LOAD / SYNC FROM DATABASE
+    # ------------------------------------------------------------
+    def load_from_db(self, batch_size=1000):
+        """
+        Build the index from the voter table (called once at startup).
+        """
+        with self._refresh_lock:
+            with self._lock:
+                self._size = 0
+                self._max_id = 0
+                self._ivf = None
+            self._gaps = {}
+
+            self._load_rows(None, batch_size=batch_size)
+            # Older gaps are deleted voters, not uncommitted ones
+            floor = self._max_id - self.GAP_SPAN
+            self._gaps = {i: t for i, t in self._gaps.items() if i > floor}
+            self.loaded = True
+
+        if self.mode == "ivf":
+            self.build_ann()
+
+    def refresh(self, batch_size=1000):
+        """
+        Pick up voters inserted by other worker processes since the
+        last load: one indexed range query above the newest loaded id,
+        plus one IN query for gaps below it (usually none).
+        Serialized: two threads reading the same _max_id would both
+        append the new rows.
+        """
+        if not self.loaded:
+            self.load_from_db(batch_size=batch_size)
+            return
+
+        from backend.models import Voter
+
+        with self._refresh_lock:
+            self._load_rows(Voter.id > self._max_id, batch_size=batch_size)
+
+            now = time.monotonic()
+            self._gaps = {i: t for i, t in self._gaps.items() if now - t <= self.gap_ttl}
+            if self._gaps:
+                self._load_rows(Voter.id.in_(list(self._gaps)), batch_size=batch_size)
+
+    def _load_rows(self, criterion, batch_size):
+        from backend.models import Voter
+
+        query = db.session.query(Voter.id, Voter.face_data, Voter.face_encodings)
+        if criterion is not None:
+            query = query.filter(criterion)
+
+        for voter_id, face_data, legacy in query.order_by(Voter.id).yield_per(batch_size):
+            try:
+                encodings = load_encodings(face_data, legacy)
+            except ValueError:
+                encodings = []
+            self._append(voter_id, encodings)
+
+    def _advance(self, voter_id):
+        """
+        Move the watermark to voter_id. Lower ids not seen yet (another
+        transaction still open, or rolled back) are remembered as gaps
+        until they show up or gap_ttl passes.
+        """
+        self._gaps.pop(voter_id, None)
+        if voter_id <= self._max_id:
+            return
+
+        now = time.monotonic()
+        for missing in range(max(self._max_id, voter_id - self.GAP_SPAN) + 1, voter_id):
+            self._gaps.setdefault(missing, now)
+        self._max_id = voter_id
+
+    # ------------------------------------------------------------
+    # APPROXIMATE INDEX (IVF)
+    # ------------------------------------------------------------
+    def build_ann(self, nlist=None):
+        """
+        (Re)train the coarse partition over the current rows.
+        Returns False when the index is too small to benefit.
+        """
+        with self._lock:
+            generation = self._generation
+        matrix, norms, _ = self._snapshot()
+        size = matrix.shape[0]
+        if size < self.ann_min_size:
+            return False
+
+        nlist = nlist or self.nlist or max(16, int(np.sqrt(size)))
+        nlist = min(nlist, size)
+
+        ivf = CoarsePartition.train(matrix, norms, self._matrix.shape[0], nlist)
+
+        with self._lock:
+            if self._generation != generation:
+                # Rows were removed while training; positions are stale
+                return False
+
+            # Assign rows appended while training ran
+            if self._matrix.shape[0] != ivf.assign.shape[0]:
+                ivf.grow(self._matrix.shape[0], size)
+            if self._size > size:
+                ivf.assign_rows(self._matrix[size:self._size], size)
+            self._ivf = ivf
+
+        return True
+
+    def _maybe_rebuild_ann(self):
+        if self.mode != "ivf":
+            return
+
+        ivf = self._ivf
+        stale = (
+            self._size >= self.ann_min_size if ivf is None
+            # Centroids drift as the roll grows; retrain on doubling
+            else self._size >= 2 * ivf.built_size
+        )
+        if not stale or not self._build_lock.acquire(blocking=False):
+            return
+
+        # Training + reassignment take seconds at 1M rows: never on the
+        # request thread
+        self._build_thread = threading.Thread(
+            target=self._build_in_background, name="face-index-ann", daemon=True
+        )
+        self._build_thread.start()
+
+    def _build_in_background(self):
+        try:
+            self.build_ann()
+        except Exception as e:
+            print("⚠️ Face index ANN rebuild failed:", e)
+        finally:
+            self._build_lock.release()
+
+    # ------------------------------------------------------------
+    # UPDATES
+    # ------------------------------------------------------------
+    def add(self, voter_id, encodings):
+        """
+        Append one or more encodings for voter_id (after its INSERT is
+        committed). Skipped when a concurrent refresh already loaded it.
+        """
+        voter_id = int(voter_id)
+        with self._refresh_lock:
+            with self._lock:
+                loaded = voter_id <= self._max_id and bool(
+                    (self._ids[:self._size] == voter_id).any()
+                )
+            if not loaded:
+                self._append(voter_id, encodings)
+
+    def _append(self, voter_id, encodings):
+        # Callers hold _refresh_lock (watermark + gaps)
+        voter_id = int(voter_id)
+        self._advance(voter_id)
+
+        if isinstance(encodings, np.ndarray):
+            rows = encodings.astype(np.float32, copy=False).reshape(-1, self.dim)
+        else:
+            rows = np.asarray(
+                [np.asarray(e, dtype=np.float32) for e in encodings],
+                dtype=np.float32
+            ).reshape(-1, self.dim)
+
+        if rows.shape[0] == 0:
+            return
+
+        with self._lock:
+            needed = self._size + rows.shape[0]
+            if needed > self._matrix.shape[0]:
+                self._grow(needed)
+
+            start, end = self._size, needed
+            self._matrix[start:end] = rows
+            self._norms[start:end] = np.einsum("ij,ij->i", rows, rows)
+            self._ids[start:end] = int(voter_id)
+            if self._ivf is not None:
+                self._ivf.assign_rows(rows, start)
+            self._size = end
+
+    def remove(self, voter_id):
+        """
+        Drop every encoding belonging to voter_id.
+        Builds fresh arrays so in-flight readers keep a consistent view.
+        """
+        with self._lock:
+            size = self._size
+            keep = self._ids[:size] != int(voter_id)
+            kept = int(keep.sum())
+            if kept == size:
+                return
+
+            capacity = self._matrix.shape[0]
+            matrix = np.empty((capacity, self.dim), dtype=np.float32)
+            norms = np.empty(capacity, dtype=np.float32)
+            ids = np.empty(capacity, dtype=np.int64)
+
+            matrix[:kept] = self._matrix[:size][keep]
+            norms[:kept] = self._norms[:size][keep]
+            ids[:kept] = self._ids[:size][keep]
+
+            if self._ivf is not None:
+                assign = np.empty(capacity, dtype=np.int32)
+                assign[:kept] = self._ivf.assign[:size][keep]
+                self._ivf = CoarsePartition(self._ivf.centroids, assign, kept)
+
+            self._matrix, self._norms, self._ids = matrix, norms, ids
+            self._size = kept
+            self._generation += 1
+
+    def _grow(self, needed):
+        capacity = max(needed, self._matrix.shape[0] * 2)
+
+        matrix = np.empty((capacity, self.dim), dtype=np.float32)
+        norms = np.empty(capacity, dtype=np.float32)
+        ids = np.empty(capacity, dtype=np.int64)
+
+        matrix[:self._size] = self._matrix[:self._size]
+        norms[:self._size] = self._norms[:self._size]
+        ids[:self._size] = self._ids[:self._size]
+
+        if self._ivf is not None:
+            self._ivf.grow(capacity, self._size)
+
+        self._matrix, self._norms, self._ids = matrix, norms, ids
+
+    def _snapshot(self):
+        with self._lock:
+            size = self._size
+            return self._matrix[:size], self._norms[:size], self._ids[:size]
+
+    # ------------------------------------------------------------
+    # QUERY
+    # ------------------------------------------------------------
+    def nearest(self, encoding, nprobe=None):
+        """
+        Returns (voter_id, distance) of the closest enrolled face,
+        or (None, inf) when the index is empty.
+
+        Exact mode uses ||a - q||² = ||a||² - 2·a·q + ||q||² so the only
+        work is one matrix-vector product (no N×128 temporary).
+        """
+        self._maybe_rebuild_ann()
+
+        with self._lock:
+            ivf = self._ivf
+        if ivf is not None:
+            return self.nearest_approx(encoding, nprobe=nprobe)
+
+        return self.nearest_exact(encoding)
+
+    def nearest_exact(self, encoding):
+        matrix, norms, ids = self._snapshot()
+        if ids.shape[0] == 0:
+            return None, float("inf")
+
+        q = np.asarray(encoding, dtype=np.float32).reshape(self.dim)
+
+        sq = norms - 2.0 * (matrix @ q) + float(q @ q)
+        best = int(np.argmin(sq))
+
+        return int(ids[best]), float(np.sqrt(max(float(sq[best]), 0.0)))
+
+    def nearest_many(self, encodings, chunk=1024):
+        """
+        Exact nearest enrolled face for every row of `encodings`.
+        Returns (voter_ids, distances) arrays; voter id -1 / inf when
+        the index is empty. One (chunk × N) matrix product per chunk.
+        """
+        queries = np.asarray(encodings, dtype=np.float32).reshape(-1, self.dim)
+        n = queries.shape[0]
+
+        voter_ids = np.full(n, -1, dtype=np.int64)
+        distances = np.full(n, np.inf, dtype=np.float64)
+
+        matrix, norms, ids = self._snapshot()
+        if ids.shape[0] == 0 or n == 0:
+            return voter_ids, distances
+
+        for start in range(0, n, chunk):
+            q = queries[start:start + chunk]
+            sq = norms[None, :] - 2.0 * (q @ matrix.T) + np.einsum("ij,ij->i", q, q)[:, None]
+            best = np.argmin(sq, axis=1)
+
+            voter_ids[start:start + chunk] = ids[best]
+            distances[start:start + chunk] = np.sqrt(
+                np.maximum(sq[np.arange(q.shape[0]), best], 0.0)
+            )
+
+        return voter_ids, distances
+
+    def nearest_approx(self, encoding, nprobe=None):
+        """
+        Probe the closest partitions and rank their rows with the same
+        float32 matvec as the exact scan; only the best RERANK_K get the
+        exact float64 distance (same metric as face_recognition.face_distance).
+        """
+        with self._lock:
+            ivf = self._ivf
+            size = self._size
+            matrix, norms, ids = self._matrix[:size], self._norms[:size], self._ids[:size]
+
+        if ivf is None:
+            return self.nearest_exact(encoding)
+
+        q = np.asarray(encoding, dtype=np.float32).reshape(self.dim)
+        rows = ivf.candidates(q, nprobe or self.nprobe, size)
+        if rows.shape[0] == 0:
+            return None, float("inf")
+
+        # ||a - q||² up to the constant ||q||²
+        scores = norms[rows] - 2.0 * (matrix[rows] @ q)
+        k = min(self.RERANK_K, rows.shape[0])
+        top = rows[np.argpartition(scores, k - 1)[:k]]
+
+        distances = np.linalg.norm(
+            matrix[top].astype(np.float64) - q.astype(np.float64), axis=1
+        )
+        best = int(np.argmin(distances))
+
+        return int(ids[top[best]]), float(distances[best])
+
+    # ------------------------------------------------------------
+    # RECALL / LATENCY REPORT
+    # ------------------------------------------------------------
+    def recall_report(self, n_queries=200, nprobe=None, noise=0.02, seed=0):
+        """
+        Compare the approximate search against the exact scan.
+
+        Queries are enrolled encodings plus small gaussian noise (a
+        re-registration of the same face). Returns recall@1 plus
+        latency percentiles in milliseconds for both modes.
+        """
+        matrix, _, ids = self._snapshot()
+        size = matrix.shape[0]
+        if size == 0:
+            return {"size": 0}
+
+        if self._ivf is None and not self.build_ann():
+            return {"size": size, "error": "index below ann_min_size"}
+
+        rng = np.random.default_rng(seed)
+        picks = rng.choice(size, min(n_queries, size), replace=False)
+        queries = matrix[picks] + rng.normal(0, noise, (picks.shape[0], self.dim)).astype(np.float32)
+
+        exact_ms, approx_ms, hits = [], [], 0
+
+        for q in queries:
+            t0 = time.perf_counter()
+            exact_id, _ = self.nearest_exact(q)
+            t1 = time.perf_counter()
+            approx_id, _ = self.nearest_approx(q, nprobe=nprobe)
+            t2 = time.perf_counter()
+
+            exact_ms.append((t1 - t0) * 1000)
+            approx_ms.append((t2 - t1) * 1000)
+            hits += int(exact_id == approx_id)
+
+        return {
+            "size": size,
+            "nlist": self._ivf.nlist,
+            "nprobe": nprobe or self.nprobe,
+            "queries": len(queries),
+            "recall_at_1": hits / len(queries),
+            "exact_ms_p50": float(np.percentile(exact_ms, 50)),
+            "exact_ms_p95": float(np.percentile(exact_ms, 95)),
+            "approx_ms_p50": float(np.percentile(approx_ms, 50)),
+            "approx_ms_p95": float(np.percentile(approx_ms, 95)),
+        }
+
+
+# Process-wide index (loaded in create_app, kept current by UserService)
+face_index = FaceIndex.from_env()
+
+
+# ============================================================
+# FRAME PIPELINE (ROI TRACKING + QUALITY GATING)
+# ============================================================
+class FramePipeline:
+    """
+    Encodes a SEQUENCE of webcam frames of the same person.
+
+    - Detects once, then reuses the previous face box, expanded by
+      `roi_margin`, to crop the next frame and only searches that crop.
+      detect_width (FACE_DETECT_WIDTH, off by default) runs that first
+      detection on a copy downscaled to that width: faster, but the
+      smallest detectable face grows by the same factor.
+    - Rejects frames with cheap OpenCV checks before any dlib work:
+      too dark (mean gray), blurry (Laplacian variance), face too small.
+    - reduced=True (FACE_DECODE_REDUCED=1) decodes webcam frames at half
+      resolution; the face size threshold is halved to match.
+    - One face per frame (the largest): authentication used to compare
+      every face in the frame, now a bystander behind the voter is
+      ignored and the tracked box stays on the voter.
+
+    Every frame appends one entry to `self.report`:
+        {"frame", "status": "encoded"|"skipped", "reason", "box",
+         "tracked", "cached", "decode_ms", "detect_ms", "encode_ms"}
+    """
+
+    def __init__(
+        self,
+        detect_width=None,
+        roi_margin=None,
+        min_blur=None,
+        min_brightness=None,
+        min_face=None,
+        reduced=None
+    ):
+        self.reduced = reduced if reduced is not None else os.getenv("FACE_DECODE_REDUCED", "0") == "1"
+        self.detect_width = detect_width if detect_width is not None else int(os.getenv("FACE_DETECT_WIDTH", "0"))
+        self.roi_margin = roi_margin if roi_margin is not None else float(os.getenv("FACE_ROI_MARGIN", "0.25"))
+        self.min_blur = min_blur if min_blur is not None else float(os.getenv("FACE_MIN_BLUR", "25"))
+        self.min_brightness = min_brightness if min_brightness is not None else float(os.getenv("FACE_MIN_BRIGHTNESS", "40"))
+        self.min_face = min_face if min_face is not None else int(os.getenv("FACE_MIN_SIZE", "60"))
+        if self.reduced:
+            self.min_face //= 2
+
+        self.box = None     # (top, right, bottom, left) in full-frame pixels
+        self.report = []
+
+    # ------------------------------------------------------------
+    # ENTRY POINTS
+    # ------------------------------------------------------------
+    def process_frame(self, frame, index=None):
+        """
+        Frame (raw bytes or base64) → encoding or None (reason recorded
+        in report).
+        """
+        entry = {
+            "frame": len(self.report) if index is None else index,
+            "status": "skipped",
+            "reason": None,
+            "box": None,
+            "tracked": False,
+            "cached": False,
+            "decode_ms": 0.0,
+            "detect_ms": 0.0,
+            "encode_ms": 0.0,
+        }
+        self.report.append(entry)
+
+        t0 = time.perf_counter()
+        try:
+            img = decode_frame(frame, reduced=self.reduced)
+        except Exception:
+            entry["reason"] = "decode_failed"
+            return None
+        finally:
+            entry["decode_ms"] = (time.perf_counter() - t0) * 1000
+
+        return self._process_image(img, entry)
+
+    def _process_image(self, img, entry):
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+        # 1️⃣ QUALITY GATE (no dlib yet)
+        if gray.mean() < self.min_brightness:
+            entry["reason"] = "too_dark"
+            return None
+
+        region = self._crop(gray, self.box) if self.box else gray
+        if cv2.Laplacian(region, cv2.CV_64F).var() < self.min_blur:
+            entry["reason"] = "blurry"
+            return None
+
+        rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+        # 2️⃣ DETECT (tracked ROI first, full frame as fallback)
+        t0 = time.perf_counter()
+        box = None
+        if self.box:
+            box = self._detect_in_roi(rgb, self.box)
+            entry["tracked"] = box is not None
+        if box is None:
+            box = self._detect_full(rgb)
+        entry["detect_ms"] = (time.perf_counter() - t0) * 1000
+
+        if box is None:
+            self.box = None
+            entry["reason"] = "no_face"
+            return None
+
+        entry["box"] = box
+        top, right, bottom, left = box
+        if min(bottom - top, right - left) < self.min_face:
+            entry["reason"] = "face_too_small"
+            return None
+
+        self.box = box
+
+        # 3️⃣ ENCODE (full resolution, known location)
+        t1 = time.perf_counter()
+        encs = face_recognition.face_encodings(rgb, [box])
+        entry["encode_ms"] = (time.perf_counter() - t1) * 1000
+
+        if not encs:
+            entry["reason"] = "no_face"
+            return None
+
+        entry["status"] = "encoded"
+        return encs[0]
+
+    # ------------------------------------------------------------
+    # DETECTION HELPERS
+    # ------------------------------------------------------------
+    def _detect_full(self, rgb):
+        h, w = rgb.shape[:2]
+        scale = min(1.0, self.detect_width / float(w)) if self.detect_width else 1.0
+
+        small = rgb if scale == 1.0 else cv2.resize(
+            rgb, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA
+        )
+
+        locations = face_recognition.face_locations(small, model="hog")
+        if not locations:
+            return None
+
+        top, right, bottom, left = _largest(locations)
+        return (
+            int(top / scale),
+            min(w, int(right / scale)),
+            min(h, int(bottom / scale)),
+            int(left / scale),
+        )
+
+    def _detect_in_roi(self, rgb, box):
+        top, right, bottom, left = self._expand(box, rgb.shape)
+        crop = np.ascontiguousarray(rgb[top:bottom, left:right])
+
+        locations = face_recognition.face_locations(crop, model="hog")
+        if not locations:
+            return None
+
+        t, r, b, l = _largest(locations)
+        return (t + top, r + left, b + top, l + left)
+
+    def _expand(self, box, shape):
+        top, right, bottom, left = box
+        h, w = shape[:2]
+        dy = int((bottom - top) * self.roi_margin)
+        dx = int((right - left) * self.roi_margin)
+
+        return (
+            max(0, top - dy),
+            min(w, right + dx),
+            min(h, bottom + dy),
+            max(0, left - dx),
+        )
+
+    def _crop(self, img, box):
+        top, right, bottom, left = self._expand(box, img.shape)
+        return img[top:bottom, left:right]
+
+
+def _largest(locations):
+    """
+    One face per frame: the biggest box, i.e. the person closest to the
+    camera, not whichever face HOG happened to list first.
+    """
+    return max(locations, key=lambda b: (b[2] - b[0]) * (b[1] - b[3]))
+
+
+def summarize_frame_report(report):
+    """
+    Per-frame report → counts per skip reason and detection timings,
+    so callers can see how much detection work tracking saved.
+    """
+    skipped = {}
+    tracked_ms, full_ms = [], []
+
+    for entry in report:
+        if entry["reason"]:
+            skipped[entry["reason"]] = skipped.get(entry["reason"], 0) + 1
+        if entry["detect_ms"]:
+            (tracked_ms if entry["tracked"] else full_ms).append(entry["detect_ms"])
+
+    return {
+        "frames": len(report),
+        "encoded": sum(1 for e in report if e["status"] == "encoded"),
+        "cached": sum(1 for e in report if e.get("cached")),
+        "skipped": skipped,
+        "tracked": len(tracked_ms),
+        "tracked_detect_ms_avg": float(np.mean(tracked_ms)) if tracked_ms else None,
+        "full_detect_ms_avg": float(np.mean(full_ms)) if full_ms else None,
+    }
+
+
+def failed_frame_report(report):
+    """
+    Extra fields for a failed face check. The per-frame reasons tell a
+    caller what to change (light, distance, pose) to get past the gate,
+    so they are only returned with FACE_DEBUG_REPORTS=1.
+    """
+    if os.getenv("FACE_DEBUG_REPORTS", "0") != "1":
+        return {}
+    return {"frame_report": summarize_frame_report(report)}
+
+
+# ============================================================
+# CONTENT-ADDRESSED FRAME CACHE
+# ============================================================
+class FrameCache:
+    """
+    Bounded LRU of frame → (encoding | None, report entry), keyed by a
+    blake2b digest of the frame's image bytes (base64 and raw uploads of
+    the same JPEG share a key).
+
+    Retried logins and identical back-to-back webcam frames skip
+    detection and encoding. Only results that do not depend on the
+    previous frame's face box are stored: encoded frames, "no_face"
+    and "face_too_small". Cheap rejections (too dark, blurry, decode
+    failed) are simply recomputed, and pool timeouts are retried.
+
+    Entries expire after FACE_CACHE_TTL seconds; least recently used
+    entries are evicted beyond FACE_CACHE_MAX_MB. FACE_CACHE_MAX_MB=0
+    disables the cache.
+    """
+
+    CACHEABLE = (None, "no_face", "face_too_small")
+    ENTRY_OVERHEAD = 512    # digest, tuple, report dict (approximate bytes)
+
+    def __init__(self, ttl=None, max_bytes=None):
+        self.ttl = ttl if ttl is not None else float(os.getenv("FACE_CACHE_TTL", "300"))
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv("FACE_CACHE_MAX_MB", "8")) * 1024 * 1024)
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key → (stored_at, encoding, entry, nbytes)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    @staticmethod
+    def key(frame):
+        return hashlib.blake2b(frame_to_bytes(frame), digest_size=16).digest()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+
+            if now - item[0] > self.ttl:
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[1], item[2]
+
+    def put(self, key, encoding, entry):
+        if not self.enabled or entry["reason"] not in self.CACHEABLE:
+            return
+
+        if encoding is not None:
+            encoding = np.array(encoding, dtype=np.float64)
+        entry = {**entry, "decode_ms": 0.0, "detect_ms": 0.0, "encode_ms": 0.0, "tracked": False}
+        nbytes = self.ENTRY_OVERHEAD + (encoding.nbytes if encoding is not None else 0)
+
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic(), encoding, entry, nbytes)
+            self._bytes += nbytes
+
+            while self._bytes > self.max_bytes and self._entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _drop(self, key):
+        self._bytes -= self._entries.pop(key)[3]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def after_fork(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    # ------------------------------------------------------------
+    # BATCH HELPERS (FrameEncoder)
+    # ------------------------------------------------------------
+    def lookup(self, frames):
+        """
+        frames → (keys, hits, misses, repeats)
+          keys:    digest per frame (None if the frame is not decodable
+                   base64, left for the pipeline to report)
+          hits:    {frame index: (encoding | None, entry)} from the cache
+          misses:  frame indexes still to encode
+          repeats: {frame index: earlier missed index with the same bytes}
+                   (identical back-to-back webcam frames are encoded once)
+        """
+        keys = [None] * len(frames)
+        hits, misses, repeats = {}, [], {}
+        first_seen = {}
+
+        for i, frame in enumerate(frames):
+            if self.enabled:
+                try:
+                    keys[i] = self.key(frame)
+                except Exception:
+                    keys[i] = None
+
+            key = keys[i]
+            if key is not None and key in first_seen:
+                repeats[i] = first_seen[key]
+                continue
+
+            cached = self.get(key) if key is not None else None
+            if cached is None:
+                if key is not None:
+                    first_seen[key] = i
+                misses.append(i)
+                continue
+
+            encoding, entry = cached
+            hits[i] = (encoding, {**entry, "frame": i, "cached": True})
+
+        return keys, hits, misses, repeats
+
+    def store(self, keys, misses, results):
+        """
+        results: (encoding, entry) pairs from a pipeline run over the
+        missed frames only, so entry["frame"] indexes `misses`. Caches
+        each result and renumbers its entry to the original frame index.
+        """
+        for encoding, entry in results:
+            i = misses[entry["frame"]]
+            entry["frame"] = i
+            if keys[i] is not None:
+                self.put(keys[i], encoding, entry)
+
+
+# ============================================================
+# PARALLEL FRAME ENCODER
+# ============================================================
+def _encode_chunk_worker(frames, offset=0, box=None):
+    """
+    Runs inside a pool process: consecutive base64 frames → list of
+    (encoding or None, report entry). One FramePipeline per chunk so
+    ROI tracking carries across the chunk; `box` seeds it with a face
+    box from an earlier request.
+    Top-level so ProcessPoolExecutor can pickle it.
+    """
+    pipeline = FramePipeline()
+    pipeline.box = box
+    encodings = [
+        pipeline.process_frame(frame, index=offset + i)
+        for i, frame in enumerate(frames)
+    ]
+    return list(zip(encodings, pipeline.report))
+
+
+def _encode_image_worker(images, offset=0, gates=None):
+    """
+    Runs inside a pool process: independent photo files (raw bytes) →
+    list of (encoding or None, report entry). Each photo is a different
+    person, so every image gets a fresh FramePipeline (no ROI tracking).
+    `gates` overrides the webcam quality thresholds (min_blur, ...).
+    """
+    results = []
+    for i, data in enumerate(images):
+        # Enrollment photos are always decoded at full resolution
+        pipeline = FramePipeline(reduced=False, **(gates or {}))
+        enc = pipeline.process_frame(data, index=offset + i)
+        results.append((enc, pipeline.report[0]))
+    return results
+
+
+def _timeout_results(count, offset=0):
+    """
+    (None, entry) for frames a pool chunk did not return within
+    FACE_POOL_TIMEOUT; reason "timeout" (see frames_timed_out).
+    """
+    return [
+        (None, {
+            "frame": offset + i,
+            "status": "skipped",
+            "reason": "timeout",
+            "box": None,
+            "tracked": False,
+            "cached": False,
+            "decode_ms": 0.0,
+            "detect_ms": 0.0,
+            "encode_ms": 0.0,
+        })
+        for i in range(count)
+    ]
+
+
+def frames_timed_out(report):
+    """
+    True when some frames were never checked because the pool was too
+    slow; routes answer 503 (retry) instead of "no face"/"mismatch".
+    """
+    return any(entry["reason"] == "timeout" for entry in report)
+
+
+def _matches(known, encoding, tolerance):
+    with stage("face.compare"):
+        distances = np.linalg.norm(known - encoding, axis=1)
+        return bool((distances <= tolerance).any())
+
+
+def _observe_frames(report):
+    """
+    Feeds FramePipeline report entries into the stage histograms. The
+    pipeline runs in pool processes, so timings travel back in the
+    entries and are recorded here, in the serving process.
+    """
+    for entry in report:
+        if entry.get("cached"):
+            FACE_FRAMES.inc("cached")
+            continue
+        FACE_FRAMES.inc(entry["reason"] or entry["status"])
+        for name in ("decode", "detect", "encode"):
+            ms = entry.get(f"{name}_ms")
+            if ms:
+                observe_stage(f"face.{name}", ms / 1000)
+
+
+def _chunks(frames, size):
+    return [(frames[i:i + size], i) for i in range(0, len(frames), size)]
+
+
+class FrameEncoder:
+    """
+    Fans submitted frames out across CPU cores, in contiguous chunks
+    so each worker can track the face box from frame to frame.
+
+    - encode_all():  registration paths, gathers every encoding
+                     (one chunk per worker)
+    - first_match(): authentication paths, small chunks; returns on the
+                     first matching frame and cancels queued chunks
+
+    Both return the per-frame FramePipeline report alongside. Frames
+    already in the FrameCache are answered from it and never reach the
+    pool.
+
+    FACE_WORKERS=0/1 (or a broken pool) falls back to serial encoding
+    on the request thread. The pool is created lazily so each server
+    process gets its own after fork.
+
+    The default "fork" start method makes pool processes children of
+    the server process, sharing the dlib models warmed before fork
+    (serving.warm_up) copy-on-write. Under gunicorn, start() forks them
+    in post_fork, before the worker runs any threads. With forkserver
+    or spawn every pool process loads its own copy of the models.
+    """
+
+    def __init__(self, workers=None, start_method=None, timeout=None, match_chunk=None, cache=None):
+        if workers is None:
+            workers = int(os.getenv("FACE_WORKERS", str(os.cpu_count() or 1)))
+        self.workers = workers
+        self.start_method = start_method or os.getenv("FACE_POOL_START_METHOD", "fork")
+        self.timeout = timeout or float(os.getenv("FACE_POOL_TIMEOUT", "30"))
+        self.match_chunk = match_chunk or int(os.getenv("FACE_MATCH_CHUNK", "3"))
+        self.cache = cache if cache is not None else FrameCache()
+
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        if self.workers <= 1:
+            return None
+
+        with self._lock:
+            # A pool inherited across fork() is unusable in the child
+            if self._pool is None or self._pool_pid != os.getpid():
+                ctx = multiprocessing.get_context(self.start_method)
+                if self.start_method == "forkserver":
+                    # Loaded once in the fork server, not per task
+                    ctx.set_forkserver_preload([__name__, "face_recognition"])
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx)
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def start(self):
+        """
+        Starts the pool processes now rather than on the first request.
+        A fork pool launches all of them on its first task.
+        """
+        pool = self._get_pool()
+        if pool is not None:
+            pool.submit(os.getpid).result(timeout=self.timeout)
+        return pool
+
+    def _reset_pool(self):
+        with self._lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def shutdown(self):
+        self._reset_pool()
+
+    def after_fork(self):
+        self._lock = threading.Lock()
+        self._pool = None
+        self.cache.after_fork()
+
+    # ------------------------------------------------------------
+    # REGISTRATION: ALL FRAMES
+    # ------------------------------------------------------------
+    def encode_all(self, frames):
+        """
+        Returns (encodings, report): encodings of every frame with a
+        usable face, in frame order.
+        """
+        keys, hits, misses, repeats = self.cache.lookup(frames)
+        results = self._encode_chunks([frames[i] for i in misses])
+        self.cache.store(keys, misses, results)
+
+        merged = dict(hits)
+        merged.update((entry["frame"], (enc, entry)) for enc, entry in results)
+        for i, first in repeats.items():
+            enc, entry = merged[first]
+            merged[i] = (enc, {**entry, "frame": i, "cached": True,
+                               "decode_ms": 0.0, "detect_ms": 0.0, "encode_ms": 0.0})
+        results = [merged[i] for i in sorted(merged)]
+
+        report = [entry for _, entry in results]
+        _observe_frames(report)
+        encodings = [enc for enc, _ in results if enc is not None]
+        return encodings, report
+
+    def _encode_chunks(self, frames):
+        if not frames:
+            return []
+
+        pool = self._get_pool()
+        if pool is None or len(frames) <= 1:
+            return _encode_chunk_worker(frames)
+
+        size = -(-len(frames) // self.workers)
+        chunks = _chunks(frames, size)
+        futures, results = [], []
+        try:
+            futures = [pool.submit(_encode_chunk_worker, c, o) for c, o in chunks]
+            for future in futures:
+                results.extend(future.result(timeout=self.timeout))
+            return results
+        except BrokenProcessPool:
+            self._reset_pool()
+            return _encode_chunk_worker(frames)
+        except FuturesTimeoutError:
+            # Chunks return in frame order: everything after `results`
+            for future in futures:
+                future.cancel()
+            return results + _timeout_results(len(frames) - len(results), len(results))
+
+    # ------------------------------------------------------------
+    # BULK IMPORT: INDEPENDENT PHOTOS
+    # ------------------------------------------------------------
+    def encode_images(self, images, gates=None):
+        """
+        Photo files (bytes) → list of (encoding or None, report entry),
+        one per image and in input order. `gates`: FramePipeline
+        quality thresholds for these photos (see BulkImportService).
+        """
+        results = self._encode_image_chunks(images, gates)
+        _observe_frames([entry for _, entry in results])
+        return results
+
+    def _encode_image_chunks(self, images, gates=None):
+        pool = self._get_pool()
+        if pool is None or len(images) <= 1:
+            return _encode_image_worker(images, 0, gates)
+
+        size = -(-len(images) // (self.workers * 4))
+        futures, results = [], []
+        try:
+            futures = [
+                pool.submit(_encode_image_worker, c, o, gates)
+                for c, o in _chunks(images, size)
+            ]
+            for future in futures:
+                results.extend(future.result(timeout=self.timeout * 4))
+            return results
+        except BrokenProcessPool:
+            self._reset_pool()
+            return _encode_image_worker(images, 0, gates)
+        except FuturesTimeoutError:
+            for future in futures:
+                future.cancel()
+            return results + _timeout_results(len(images) - len(results), len(results))
+
+    # ------------------------------------------------------------
+    # AUTHENTICATION: FIRST MATCH WINS
+    # ------------------------------------------------------------
+    def first_match(self, frames, known_encodings, tolerance, box=None):
+        """
+        Returns (matched, report). matched is True as soon as any frame
+        matches any known encoding; chunks not yet started are cancelled.
+        `box` is the face box of a previous frame (report entry "box"),
+        so ROI tracking can continue across requests.
+        """
+        known = np.asarray(known_encodings, dtype=np.float64).reshape(-1, ENCODING_DIM)
+        if known.shape[0] == 0:
+            return False, []
+
+        matched, report = self._first_match(frames, known, tolerance, box)
+        _observe_frames(report)
+        return matched, report
+
+    def _first_match(self, frames, known, tolerance, box=None):
+        # Retried frames are matched straight from the cache; repeats of
+        # a frame in this request can not match where it did not
+        keys, hits, misses, _ = self.cache.lookup(frames)
+        cached_report = []
+        for i in sorted(hits):
+            enc, entry = hits[i]
+            cached_report.append(entry)
+            if enc is not None and _matches(known, enc, tolerance):
+                return True, cached_report
+
+        pending = [frames[i] for i in misses]
+        pool = self._get_pool()
+        if pool is None or len(pending) <= self.match_chunk:
+            return self._first_match_serial(pending, known, tolerance, keys, misses, cached_report, box)
+
+        report = list(cached_report)
+        futures = {
+            pool.submit(_encode_chunk_worker, c, o, box if o == 0 else None): (c, o)
+            for c, o in _chunks(pending, self.match_chunk)
+        }
+        try:
+            for future in as_completed(futures, timeout=self.timeout):
+                results = future.result()
+                self.cache.store(keys, misses, results)
+                for enc, entry in results:
+                    report.append(entry)
+                    if enc is not None and _matches(known, enc, tolerance):
+                        return True, report
+            return False, report
+        except BrokenProcessPool:
+            self._reset_pool()
+            return self._first_match_serial(pending, known, tolerance, keys, misses, cached_report, box)
+        except FuturesTimeoutError:
+            # No match so far; the frames still in the pool are reported
+            # as "timeout" so the caller can tell "retry" from "mismatch"
+            for future, (chunk, offset) in futures.items():
+                if not future.done():
+                    results = _timeout_results(len(chunk), offset)
+                    self.cache.store(keys, misses, results)
+                    report.extend(entry for _, entry in results)
+            return False, report
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def _first_match_serial(self, frames, known, tolerance, keys, misses, cached_report, box=None):
+        report = list(cached_report)
+        pipeline = FramePipeline()
+        pipeline.box = box
+        for frame in frames:
+            enc = pipeline.process_frame(frame)
+            entry = pipeline.report[-1]
+            self.cache.store(keys, misses, [(enc, entry)])
+            report.append(entry)
+            if enc is not None and _matches(known, enc, tolerance):
+                return True, report
+        return False, report
+
+
+# Process-wide encoder used by the face endpoints
+frame_encoder = FrameEncoder()
 
 
 class FaceService:
@@ -19,20 +1360,21 @@ class FaceService:
     def encode_from_image_file(self, file):
         """
         file: werkzeug FileStorage (image upload)
+        Decoded through the same OpenCV path as camera frames.
         """
         try:
-            image = face_recognition.load_image_file(file)
-            encs = face_recognition.face_encodings(image)
-            if not encs:
+            image = decode_frame(file.read())
+            enc = self.encode_from_image(image)
+            if enc is None:
                 raise ValueError("No face detected in uploaded image")
-            return encs[0]
+            return enc
         except Exception as e:
             raise ValueError(f"Image processing failed: {e}")
 
     # ------------------------------------------------------------
     # 2️⃣ ENCODE FROM PIL IMAGE
     # ------------------------------------------------------------
-    def encode_from_pil_image(self, pil_img: Image.Image):
+    def encode_from_pil_image(self, pil_img):
         """
         For frontend camera (base64 → PIL)
         Returns encoding OR None if no face detected
@@ -65,23 +1407,71 @@ class FaceService:
         except Exception:
             return None
 
-        locations = face_recognition.face_locations(rgb, model="hog")
+        with stage("face.detect"):
+            locations = face_recognition.face_locations(rgb, model="hog")
         if not locations:
             return None
 
-        encs = face_recognition.face_encodings(rgb, locations)
+        with stage("face.encode"):
+            encs = face_recognition.face_encodings(rgb, locations)
         if not encs:
             return None
 
         return encs[0]
 
+    # ------------------------------------------------------------
+    # 3️⃣b MULTI-FRAME ENCODING (PROCESS POOL)
+    # ------------------------------------------------------------
+    def encode_frames(self, frames):
+        """
+        base64 frames → (encodings, report).
+        Frames without a usable face are dropped (reason in report).
+        Used by registration paths before np.mean.
+        """
+        return frame_encoder.encode_all(frames)
+
+    def match_frames(self, frames, known_encodings, tolerance=0.45, box=None):
+        """
+        (matched, report): matched is True on the first frame matching
+        any known encoding. Used by authentication paths; `box` carries
+        the tracked face box between streamed frames.
+        """
+        return frame_encoder.first_match(frames, known_encodings, tolerance, box)
+
     # ------------------------------------------------------------
     # 4️⃣ DUPLICATE FACE CHECK
     # ------------------------------------------------------------
-    def is_face_duplicate(self, new_encoding, existing_encodings, tolerance=0.45):
+    def find_duplicate(self, new_encoding, tolerance=0.45, index=None):
+        """
+        1:N search against the enrolled-voter index.
+        Returns (voter_id, distance) of the closest match within
+        tolerance, or None.
+        """
+        from backend.models import Voter
+
+        index = index if index is not None else face_index
+        index.refresh()
+
+        while True:
+            with stage("face.search"):
+                voter_id, distance = index.nearest(new_encoding)
+            if voter_id is None or distance > tolerance:
+                return None
+
+            # Another worker may have deleted this voter
+            if db.session.get(Voter, voter_id) is not None:
+                return voter_id, distance
+
+            index.remove(voter_id)
+
+    def is_face_duplicate(self, new_encoding, existing_encodings=None, tolerance=0.45):
         """
         Checks if new face matches ANY existing face encoding.
+        existing_encodings=None searches the enrolled-voter index.
         """
+        if existing_encodings is None:
+            return self.find_duplicate(new_encoding, tolerance) is not None
+
         if not isinstance(new_encoding, np.ndarray):
             new_encoding = np.array(new_encoding, dtype=np.float64)
 
@@ -96,10 +1486,8 @@ class FaceService:
         if not clean_list:
             return False
 
-        results = face_recognition.compare_faces(
-            clean_list, new_encoding, tolerance
-        )
-        return True in results
+        distances = np.linalg.norm(np.vstack(clean_list) - new_encoding, axis=1)
+        return bool((distances <= tolerance).any())
 
     # ------------------------------------------------------------
     # 5️⃣ ONE-TO-ONE FACE COMPARISON
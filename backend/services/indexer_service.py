@@ -0,0 +1,240 @@
+# backend/services/indexer_service.py
+
+import logging
+import os
+import threading
+from datetime import datetime
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from web3 import Web3
+
+from backend.database import db
+from backend.models import CandidateTally, Election, IndexerCursor
+from .blockchain_service import get_blockchain_service
+
+
+logger = logging.getLogger(__name__)
+
+EVENT_SIGNATURES = {
+    "CandidateAdded": "CandidateAdded(uint256,string)",
+    "CandidateDeactivated": "CandidateDeactivated(uint256)",
+    "VoteCast": "VoteCast(bytes32,uint256)",
+}
+
+
+class VoteIndexer:
+    """
+    Follows ManagedElection logs for every election contract and keeps
+    the CandidateTally / IndexerCursor read model current.
+
+    Each block range is applied in ONE transaction together with a
+    compare-and-set on the cursor (last_block must still be what we
+    read), so several server processes can run the indexer without
+    double counting: the loser of the race rolls back.
+    """
+
+    def __init__(self, app, bc_service=None, poll_interval=None, confirmations=None, max_range=None):
+        self.app = app
+        self.bc_service = bc_service or get_blockchain_service()
+        self.poll_interval = poll_interval or float(os.getenv("INDEXER_POLL_SECONDS", "2"))
+        self.confirmations = confirmations if confirmations is not None else int(os.getenv("INDEXER_CONFIRMATIONS", "0"))
+        self.max_range = max_range or int(os.getenv("INDEXER_MAX_BLOCK_RANGE", "5000"))
+
+        self.topics = {
+            Web3.keccak(text=sig): name for name, sig in EVENT_SIGNATURES.items()
+        }
+
+        self._thread = None
+        self._stop = threading.Event()
+
+    # ------------------------------------------------------------
+    # BACKGROUND LOOP
+    # ------------------------------------------------------------
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="vote-indexer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Indexer pass failed")
+            self._stop.wait(self.poll_interval)
+
+    def run_once(self):
+        with self.app.app_context():
+            elections = (
+                db.session.query(Election.id, Election.contract_address)
+                .filter(Election.contract_address.isnot(None))
+                .all()
+            )
+            head = self.bc_service.web3.eth.block_number - self.confirmations
+
+            for election_id, contract_address in elections:
+                self.sync_election(election_id, contract_address, head)
+
+    # ------------------------------------------------------------
+    # SYNC ONE CONTRACT
+    # ------------------------------------------------------------
+    def sync_election(self, election_id, contract_address, head):
+        cursor = db.session.get(IndexerCursor, election_id)
+        if cursor is None:
+            cursor = IndexerCursor(
+                election_id=election_id,
+                contract_address=contract_address,
+                last_block=-1,
+                total_votes=0
+            )
+            db.session.add(cursor)
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Created concurrently by another process
+                db.session.rollback()
+                cursor = db.session.get(IndexerCursor, election_id)
+
+        contract = self.bc_service.load_contract(contract_address)
+        from_block = cursor.last_block + 1
+
+        while from_block <= head:
+            to_block = min(head, from_block + self.max_range - 1)
+
+            logs = self.bc_service.web3.eth.get_logs({
+                "address": contract.address,
+                "fromBlock": from_block,
+                "toBlock": to_block,
+            })
+
+            if not self._apply(election_id, contract, logs, from_block - 1, to_block):
+                # Another process advanced this cursor first
+                db.session.rollback()
+                return
+
+            from_block = to_block + 1
+
+    def _apply(self, election_id, contract, logs, expected_block, to_block):
+        votes = {}
+        total = 0
+
+        for log in logs:
+            name = self.topics.get(bytes(log["topics"][0])) if log["topics"] else None
+            if name is None:
+                continue
+
+            event = getattr(contract.events, name)().process_log(log)
+            args = event["args"]
+
+            if name == "VoteCast":
+                votes[args["candidateId"]] = votes.get(args["candidateId"], 0) + 1
+                total += 1
+
+            elif name == "CandidateAdded":
+                self._apply_votes(election_id, votes)
+                votes = {}
+                db.session.add(CandidateTally(
+                    election_id=election_id,
+                    on_chain_id=args["id"],
+                    name=args["name"],
+                    vote_count=0,
+                    is_active=True
+                ))
+                db.session.flush()
+
+            elif name == "CandidateDeactivated":
+                db.session.execute(
+                    update(CandidateTally)
+                    .where(CandidateTally.election_id == election_id)
+                    .where(CandidateTally.on_chain_id == args["id"])
+                    .values(is_active=False)
+                )
+
+        self._apply_votes(election_id, votes)
+
+        # Compare-and-set: only advance from the block we started at
+        moved = db.session.execute(
+            update(IndexerCursor)
+            .where(IndexerCursor.election_id == election_id)
+            .where(IndexerCursor.last_block == expected_block)
+            .values(
+                last_block=to_block,
+                total_votes=IndexerCursor.total_votes + total,
+                updated_at=datetime.utcnow()
+            )
+        ).rowcount
+
+        if moved != 1:
+            return False
+
+        db.session.commit()
+        return True
+
+    @staticmethod
+    def _apply_votes(election_id, votes):
+        # One UPDATE per candidate per block range, not per vote
+        for on_chain_id, count in votes.items():
+            db.session.execute(
+                update(CandidateTally)
+                .where(CandidateTally.election_id == election_id)
+                .where(CandidateTally.on_chain_id == on_chain_id)
+                .values(vote_count=CandidateTally.vote_count + count)
+            )
+
+    # ------------------------------------------------------------
+    # READ MODEL
+    # ------------------------------------------------------------
+    @staticmethod
+    def get_results(election_id):
+        """
+        Results from the read model in O(candidates) DB time, or None
+        if this election has not been indexed yet.
+        Shape matches BlockchainService.get_results().
+        """
+        cursor = db.session.get(IndexerCursor, election_id)
+        if cursor is None or cursor.last_block < 0:
+            return None
+
+        tallies = (
+            CandidateTally.query
+            .filter_by(election_id=election_id)
+            .order_by(CandidateTally.on_chain_id)
+            .all()
+        )
+
+        return {
+            "results": [{
+                "candidate_id": t.on_chain_id,
+                "name": t.name,
+                "voteCount": t.vote_count,
+                "isActive": t.is_active
+            } for t in tallies],
+            "total_votes": cursor.total_votes,
+            "indexed_block": cursor.last_block,
+            "indexed_at": cursor.updated_at.isoformat() + "Z",
+        }
+
+    @staticmethod
+    def clear(election_id):
+        """Drop the read model of a deleted election."""
+        CandidateTally.query.filter_by(election_id=election_id).delete()
+        IndexerCursor.query.filter_by(election_id=election_id).delete()
+
+
+def start_indexer(app):
+    """
+    Start the background indexer unless INDEXER_ENABLED=0.
+    """
+    if os.getenv("INDEXER_ENABLED", "1") != "1":
+        return None
+
+    indexer = VoteIndexer(app)
+    indexer.start()
+    return indexer
@@ -1,40 +1,70 @@
 # backend/services/user_service.py
 
-import json
-from backend.models import Voter, Admin
+import os
+import secrets
+from datetime import datetime, timedelta
+
+from sqlalchemy import exists, false
+from sqlalchemy.exc import IntegrityError
+
+from backend.models import Voter, Admin, VoterParticipation, AuthStreamSession
 from backend.database import db
+from backend.services.face_service import face_index
+from backend.utils.encoding_utils import compute_voter_hash, normalize_voter_hash, pack_encodings
+from backend.utils.metrics import timed
 from werkzeug.security import generate_password_hash, check_password_hash
 
 
+# Columns returned by the voter roll; face data is never loaded.
+VOTER_LIST_COLUMNS = (Voter.id, Voter.name, Voter.enrollment)
+
+VOTER_PAGE_DEFAULT = int(os.getenv("VOTER_PAGE_DEFAULT", "100"))
+VOTER_PAGE_MAX = int(os.getenv("VOTER_PAGE_MAX", "1000"))
+
+
 class UserService:
 
     # ======================================================
     # CREATE VOTER
     # ======================================================
+    @timed("db.create_voter")
     def create_voter(self, name, enrollment, face_encodings):
         """
         Creates voter with:
         - name
         - enrollment
         - face_encodings: list of numpy arrays
+          (stored packed float32 in face_data)
+        - voter_hash computed once from the stored bytes
         """
-
-        face_enc_json = json.dumps([
-            enc.tolist() if hasattr(enc, "tolist") else enc
-            for enc in face_encodings
-        ])
+        face_data = pack_encodings(face_encodings)
 
         voter = Voter(
             name=name,
             enrollment=enrollment,
-            face_encodings=face_enc_json,
+            face_data=face_data,
+            voter_hash=compute_voter_hash(face_data),
             has_voted=False
         )
 
         db.session.add(voter)
         db.session.commit()
+
+        face_index.add(voter.id, face_encodings)
         return voter
 
+    # ======================================================
+    # DELETE VOTER
+    # ======================================================
+    def delete_voter(self, voter):
+        voter_id = voter.id
+
+        VoterParticipation.query.filter_by(voter_id=voter_id).delete()
+        db.session.delete(voter)
+        db.session.commit()
+
+        face_index.remove(voter_id)
+
     # ======================================================
     # GET VOTER BY ID
     # ======================================================
@@ -44,9 +74,42 @@ class UserService:
     # ======================================================
     # GET VOTER BY ENROLLMENT
     # ======================================================
+    @timed("db.get_by_enrollment")
     def get_by_enrollment(self, enrollment):
         return Voter.query.filter_by(enrollment=enrollment).first()
 
+    # ======================================================
+    # VOTER HASH (VOTE PATH / REVERSE LOOKUP)
+    # ======================================================
+    @timed("db.get_voter_hash")
+    def get_voter_hash(self, voter_id):
+        """
+        Returns (exists, voter_hash) reading only the voter_hash column.
+        Rows the backfill has not reached yet are hashed and stored once.
+        """
+        row = (
+            db.session.query(Voter.voter_hash)
+            .filter(Voter.id == voter_id)
+            .first()
+        )
+        if row is None:
+            return False, None
+
+        if row.voter_hash:
+            return True, row.voter_hash
+
+        voter = db.session.get(Voter, voter_id)
+        voter.voter_hash = compute_voter_hash(voter.face_data, voter.face_encodings)
+        db.session.commit()
+
+        return True, voter.voter_hash
+
+    def get_by_voter_hash(self, voter_hash):
+        """
+        On-chain VoteCast.voterHash (bytes32 or hex) → Voter, via the index.
+        """
+        return Voter.query.filter_by(voter_hash=normalize_voter_hash(voter_hash)).first()
+
     # ======================================================
     # GET ALL VOTERS
     # ======================================================
@@ -54,22 +117,173 @@ class UserService:
         return Voter.query.all()
 
     # ======================================================
-    # MARK VOTER AS VOTED
+    # LIST VOTERS (KEYSET PAGINATION, NO FACE DATA)
+    # ======================================================
+    def list_voters(self, after_id=0, limit=VOTER_PAGE_DEFAULT,
+                    has_voted=None, enrollment_prefix=None, election_id=None):
+        """
+        One page of the voter roll ordered by id, starting after `after_id`.
+        Only the listed columns are selected, so the face blobs stay on disk.
+        has_voted is participation in `election_id` (False without one).
+        Returns (rows, next_after) — next_after is None on the last page.
+        """
+        limit = max(1, min(int(limit), VOTER_PAGE_MAX))
+
+        if election_id is None:
+            voted = false()
+        else:
+            voted = exists().where(
+                VoterParticipation.election_id == election_id,
+                VoterParticipation.voter_id == Voter.id
+            )
+
+        query = (
+            db.session.query(*VOTER_LIST_COLUMNS, voted.label("has_voted"))
+            .filter(Voter.id > after_id)
+        )
+
+        if has_voted is not None:
+            query = query.filter(voted if has_voted else ~voted)
+
+        if enrollment_prefix:
+            query = query.filter(
+                Voter.enrollment.startswith(enrollment_prefix, autoescape=True)
+            )
+
+        rows = [
+            {
+                "id": r.id,
+                "name": r.name,
+                "enrollment": r.enrollment,
+                "has_voted": bool(r.has_voted)
+            }
+            for r in query.order_by(Voter.id).limit(limit + 1)
+        ]
+
+        next_after = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_after = rows[-1]["id"]
+
+        return rows, next_after
+
+    def iter_voters(self, has_voted=None, enrollment_prefix=None,
+                    election_id=None, page_size=VOTER_PAGE_MAX):
+        """
+        Walk the whole roll page by page at constant memory.
+        """
+        after_id = 0
+        while True:
+            rows, next_after = self.list_voters(
+                after_id, page_size, has_voted, enrollment_prefix, election_id
+            )
+            yield from rows
+
+            if next_after is None:
+                return
+            after_id = next_after
+
+    # ======================================================
+    # PARTICIPATION (PER ELECTION)
     # ======================================================
-    def set_voted(self, voter):
-        voter.has_voted = True
+    @timed("db.has_voted")
+    def has_voted(self, election_id, voter_id):
+        """
+        Indexed lookup on (election_id, voter_id).
+        """
+        if election_id is None:
+            return False
+
+        return db.session.query(
+            exists().where(
+                VoterParticipation.election_id == election_id,
+                VoterParticipation.voter_id == voter_id
+            )
+        ).scalar()
+
+    @timed("db.claim_participation")
+    def claim_participation(self, election_id, voter_id):
+        """
+        Record the vote BEFORE it is sent: one INSERT, and the unique
+        (election_id, voter_id) constraint rejects a second attempt even
+        when two requests race. Returns the row, or None if already voted.
+        """
+        participation = VoterParticipation(election_id=election_id, voter_id=voter_id)
+        db.session.add(participation)
+
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return None
+
+        return participation
+
+    @timed("db.release_participation")
+    def release_participation(self, participation):
+        """
+        Undo a claim whose transaction was never sent.
+        """
+        db.session.delete(participation)
+        db.session.commit()
+
+    @timed("db.record_vote_tx")
+    def record_vote_tx(self, participation, tx_hash):
+        participation.tx_hash = tx_hash
         db.session.commit()
 
     # ======================================================
-    # 🔥 RESET VOTED STATUS (THIS IS THE FIX)
+    # STREAMING AUTH SESSIONS (FRAME BUDGET SHARED BY WORKERS)
     # ======================================================
-    def reset_all_voters_voted_status(self):
+    @timed("db.start_auth_session")
+    def start_auth_session(self, voter_id, ttl):
         """
-        Call this when:
-        - Election is deleted
-        - New election is created
+        New session row for /authenticate/start. Rows older than the
+        token TTL can never be used again and are dropped here.
         """
-        Voter.query.update({Voter.has_voted: False})
+        now = datetime.utcnow()
+        AuthStreamSession.query.filter(
+            AuthStreamSession.created_at < now - timedelta(seconds=ttl)
+        ).delete(synchronize_session=False)
+
+        session = AuthStreamSession(id=secrets.token_hex(16), voter_id=voter_id, created_at=now)
+        db.session.add(session)
+        db.session.commit()
+        return session
+
+    @timed("db.claim_auth_frame")
+    def claim_auth_frame(self, session_id, voter_id, max_frames):
+        """
+        Count one frame against the session: a single conditional
+        UPDATE, so concurrent frames on any worker can not exceed
+        max_frames. Returns the session, or None when it is unknown,
+        finished or out of frames.
+        """
+        claimed = AuthStreamSession.query.filter(
+            AuthStreamSession.id == session_id,
+            AuthStreamSession.voter_id == voter_id,
+            AuthStreamSession.completed == false(),
+            AuthStreamSession.frames_used < max_frames,
+        ).update(
+            {AuthStreamSession.frames_used: AuthStreamSession.frames_used + 1},
+            synchronize_session=False
+        )
+        db.session.commit()
+
+        if not claimed:
+            return None
+        return db.session.get(AuthStreamSession, session_id)
+
+    @timed("db.finish_auth_frame")
+    def finish_auth_frame(self, session, matched, box=None):
+        """
+        A match closes the session; otherwise keep the face box for the
+        next frame's ROI (None drops back to a full-frame search).
+        """
+        if matched:
+            session.completed = True
+        else:
+            session.box = ",".join(str(int(v)) for v in box) if box else None
         db.session.commit()
 
     # ======================================================
@@ -94,15 +308,10 @@ class UserService:
 
         password_hash = generate_password_hash(password)
 
-        face_enc_json = json.dumps([
-            enc.tolist() if hasattr(enc, "tolist") else enc
-            for enc in face_encodings
-        ])
-
         admin = Admin(
             username=username,
             password_hash=password_hash,
-            face_encodings=face_enc_json
+            face_data=pack_encodings(face_encodings)
         )
 
         db.session.add(admin)
@@ -119,10 +328,8 @@ class UserService:
             admin.password_hash = generate_password_hash(password)
 
         if new_face_encodings:
-            admin.face_encodings = json.dumps([
-                enc.tolist() if hasattr(enc, "tolist") else enc
-                for enc in new_face_encodings
-            ])
+            admin.face_data = pack_encodings(new_face_encodings)
+            admin.face_encodings = None
 
         db.session.commit()
         return admin
@@ -0,0 +1,95 @@
+# backend/serving.py
+#
+# Hooks for pre-forking servers (see gunicorn.conf.py).
+#
+#   master:  create_app() → warm_up()  → gc.freeze() → fork workers
+#   worker:  after_fork()  (fresh sockets, locks, pools, threads)
+
+import gc
+import time
+
+import numpy as np
+
+
+def warm_up(app):
+    """
+    Load everything large BEFORE fork so workers and their face pool
+    processes share the pages copy-on-write: dlib detector / landmark / ResNet models (loaded at
+    face_recognition import), OpenCV, the contract ABI and the voter
+    face index. create_app imports none of these (see utils/lazy.py),
+    so this is where they load. Returns timings in ms.
+    """
+    from backend.startup import get_bootstrap
+    from backend.utils.lazy import LAZY_IMPORT_MS
+
+    timings = {}
+
+    t0 = time.perf_counter()
+    import cv2  # noqa: F401
+    import face_recognition
+
+    # First call allocates dlib's network buffers
+    blank = np.zeros((150, 150, 3), dtype=np.uint8)
+    face_recognition.face_encodings(blank, [(0, 150, 150, 0)])
+    timings["face_models_ms"] = (time.perf_counter() - t0) * 1000
+
+    t1 = time.perf_counter()
+    from backend.services.blockchain_service import get_blockchain_service, load_contract_json
+    load_contract_json()
+    get_blockchain_service()
+    timings["contract_abi_ms"] = (time.perf_counter() - t1) * 1000
+
+    # Tables + face index once in the master; workers that fork before
+    # the database is reachable retry on their own (after_fork)
+    t2 = time.perf_counter()
+    bootstrap = get_bootstrap(app)
+    timings["database_ready"] = bootstrap.run_once()
+    timings["database_ms"] = (time.perf_counter() - t2) * 1000
+
+    from backend.services.face_service import face_index
+    timings["face_index_rows"] = len(face_index)
+    timings["lazy_imports_ms"] = {name: round(ms, 1) for name, ms in LAZY_IMPORT_MS.items()}
+
+    # Workers write metric snapshots to one shared directory (utils/metrics.py)
+    from backend.utils.metrics import REGISTRY
+    REGISTRY.enable_multiprocess()
+
+    # Keep the warmed objects out of the GC's generations: a collection
+    # in a worker would otherwise touch (and copy) every shared page
+    gc.freeze()
+
+    return timings
+
+
+def after_fork(app):
+    """
+    Run in every worker right after fork().
+    """
+    from backend.app import start_background_tasks
+    from backend.database import db
+    from backend.services.blockchain_service import get_blockchain_service
+    from backend.services.bulk_import_service import import_jobs
+    from backend.services.election_service import election_cache
+    from backend.services.face_service import face_index, frame_encoder
+    from backend.startup import get_bootstrap
+    from backend.utils.metrics import REGISTRY
+    from backend.utils.tracing import tracer
+
+    # Connections opened by the master must not be shared
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+    # Fork the face pool first, while this is the only thread: pool
+    # processes inherit the models warmed in the master
+    frame_encoder.after_fork()
+    frame_encoder.start()
+
+    get_blockchain_service().after_fork()
+    face_index.after_fork()
+    election_cache.after_fork()
+    import_jobs.after_fork()
+    get_bootstrap(app).after_fork()
+    REGISTRY.after_fork(context=app.app_context)
+    tracer.after_fork()
+
+    start_background_tasks(app)
@@ -0,0 +1,273 @@
+# backend/startup.py
+#
+# Startup instrumentation and database readiness.
+#
+#   ImportTimer        → per-package import self-time during create_app
+#                        (a `python -X importtime` style breakdown)
+#   StartupReport      → phase timings + import breakdown, printed once
+#   DatabaseBootstrap  → ping → create_all → schema migrations → face
+#                        index, retried in the background; /readyz reports
+#                        its state instead of create_app blocking on it
+
+import builtins
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+# =====================================================
+# IMPORT TIMER
+# =====================================================
+class ImportTimer:
+    """
+    Wraps builtins.__import__ while active and charges each import's
+    SELF time (excluding nested imports) to its top-level package.
+    Only the thread that entered the timer is measured.
+    """
+
+    def __init__(self):
+        self.self_ms = defaultdict(float)
+        self.total_ms = 0.0
+        self._stack = []
+        self._original = None
+        self._thread = None
+
+    def __enter__(self):
+        self._original = builtins.__import__
+        self._thread = threading.get_ident()
+        builtins.__import__ = self._import
+        return self
+
+    def __exit__(self, *exc):
+        builtins.__import__ = self._original
+        return False
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if threading.get_ident() != self._thread:
+            return self._original(name, globals, locals, fromlist, level)
+
+        self._stack.append(0.0)
+        t0 = time.perf_counter()
+        try:
+            return self._original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - t0
+            children = self._stack.pop()
+
+            if self._stack:
+                self._stack[-1] += elapsed
+            else:
+                self.total_ms += elapsed * 1000
+
+            if level and globals:
+                name = globals.get("__package__") or name
+            self.self_ms[(name or "?").split(".")[0]] += (elapsed - children) * 1000
+
+    def top(self, n=10):
+        ranked = sorted(self.self_ms.items(), key=lambda item: item[1], reverse=True)
+        return [(package, ms) for package, ms in ranked[:n] if ms >= 1]
+
+
+# =====================================================
+# STARTUP REPORT
+# =====================================================
+_report_printed = False
+
+
+class StartupReport:
+    """
+    Collects create_app phase timings and the import breakdown.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.imports = ImportTimer()
+
+    @contextmanager
+    def phase(self, name):
+        t0 = time.perf_counter()
+        with self.imports:
+            try:
+                yield
+            finally:
+                self.phases[name] = self.phases.get(name, 0.0) + (time.perf_counter() - t0) * 1000
+
+    def as_dict(self):
+        return {
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            "phases_ms": {name: round(ms, 1) for name, ms in self.phases.items()},
+            "imports_ms": round(self.imports.total_ms, 1),
+            "top_imports_ms": {package: round(ms, 1) for package, ms in self.imports.top()},
+            "modules_loaded": len(sys.modules),
+        }
+
+    def log_once(self):
+        """
+        Print the report the first time an app is created in this process.
+        """
+        global _report_printed
+        if _report_printed:
+            return
+        _report_printed = True
+
+        report = self.as_dict()
+        phases = " | ".join(f"{name} {ms:.0f} ms" for name, ms in report["phases_ms"].items())
+        print(f"⏱ Startup {report['total_ms']:.0f} ms "
+              f"(imports {report['imports_ms']:.0f} ms, {report['modules_loaded']} modules)")
+        print(f"   phases: {phases}")
+        for package, ms in report["top_imports_ms"].items():
+            print(f"   import {package:<24} {ms:8.1f} ms")
+
+
+# =====================================================
+# DATABASE BOOTSTRAP
+# =====================================================
+class DatabaseBootstrap:
+    """
+    Brings the database up to date without blocking the app factory.
+
+    run_once() tries every step once; start() retries it on a daemon
+    thread (backoff from DB_RETRY_DELAY up to DB_RETRY_MAX_DELAY
+    seconds) and then runs the on_ready callbacks. Until it succeeds
+    /readyz answers 503 and so do the API blueprints.
+    """
+
+    def __init__(self, app, retry_delay=None, max_delay=None):
+        self.app = app
+        self.retry_delay = retry_delay or float(os.getenv("DB_RETRY_DELAY", "2"))
+        self.max_delay = max_delay or float(os.getenv("DB_RETRY_MAX_DELAY", "30"))
+
+        self.ready = False
+        self.attempts = 0
+        self.last_error = None
+        self.timings = {}
+
+        self._ready_event = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    # ------------------------------------------------------------
+    # ONE ATTEMPT
+    # ------------------------------------------------------------
+    def run_once(self):
+        """
+        Returns True once the database is reachable, migrated and the
+        face index loaded.
+        """
+        with self._lock:
+            if self.ready:
+                return True
+
+            self.attempts += 1
+            try:
+                self._bootstrap()
+            except Exception as exc:
+                self.last_error = str(exc)
+                print(f"❌ DB not ready (attempt {self.attempts}): {exc}")
+                return False
+
+            self.ready = True
+            self.last_error = None
+            self._ready_event.set()
+            print(f"✅ Database Ready! {self.timings}")
+            return True
+
+    def _bootstrap(self):
+        from sqlalchemy import text
+        from backend.database import db
+        from backend.migrations import run_schema_migrations
+        from backend.services.face_service import face_index
+
+        with self.app.app_context():
+            t0 = time.perf_counter()
+            db.session.execute(text("SELECT 1"))
+            db.session.remove()
+
+            t1 = time.perf_counter()
+            db.create_all()
+
+            t2 = time.perf_counter()
+            try:
+                for applied in run_schema_migrations():
+                    print(f"✅ Migrated {applied}")
+            except Exception as exc:
+                print(f"⚠ Schema migration failed: {exc}")
+
+            # Load every voter encoding once into the in-memory face index
+            t3 = time.perf_counter()
+            try:
+                face_index.load_from_db()
+                print(f"✅ Face index loaded ({len(face_index)} encodings)")
+            except Exception as exc:
+                print(f"⚠ Face index not loaded: {exc}")
+            t4 = time.perf_counter()
+
+        self.timings = {
+            "ping_ms": round((t1 - t0) * 1000, 1),
+            "create_all_ms": round((t2 - t1) * 1000, 1),
+            "migrations_ms": round((t3 - t2) * 1000, 1),
+            "face_index_ms": round((t4 - t3) * 1000, 1),
+        }
+
+    # ------------------------------------------------------------
+    # BACKGROUND RETRIES
+    # ------------------------------------------------------------
+    def start(self, on_ready=()):
+        """
+        Retry run_once() on a daemon thread until it succeeds, then call
+        each of on_ready(app). No-op while a bootstrap thread is running.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._thread = threading.Thread(
+            target=self._run, args=(tuple(on_ready),), name="db-bootstrap", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, on_ready):
+        delay = self.retry_delay
+        while not self.run_once():
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_delay)
+
+        for callback in on_ready:
+            try:
+                callback(self.app)
+            except Exception as exc:
+                print(f"⚠ {getattr(callback, '__name__', callback)} failed: {exc}")
+
+    def wait_ready(self, timeout=None):
+        """
+        Block until ready (starting the retry thread if needed), for CLI
+        commands and scripts. Returns readiness.
+        """
+        if not self.ready:
+            self.start()
+        return self._ready_event.wait(timeout)
+
+    def after_fork(self):
+        """
+        The master's bootstrap thread does not survive fork().
+        """
+        self._lock = threading.Lock()
+        self._thread = None
+        self._ready_event = threading.Event()
+        if self.ready:
+            self._ready_event.set()
+
+    def status(self):
+        return {
+            "ready": self.ready,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+            "timings_ms": self.timings,
+        }
+
+
+def get_bootstrap(app):
+    return app.extensions["db_bootstrap"]
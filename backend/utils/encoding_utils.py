@@ -0,0 +1,97 @@
+# backend/utils/encoding_utils.py
+
+import hashlib
+import json
+import numpy as np
+
+
+ENCODING_DIM = 128
+
+# Packed little-endian float32, 512 bytes per encoding
+ENCODING_DTYPE = np.dtype("<f4")
+ENCODING_BYTES = ENCODING_DIM * ENCODING_DTYPE.itemsize
+
+
+def pack_encodings(encodings) -> bytes:
+    """
+    List of encodings (numpy arrays or lists) → packed float32 bytes.
+    """
+    arr = np.asarray(
+        [np.asarray(e, dtype=np.float64) for e in encodings],
+        dtype=ENCODING_DTYPE
+    ).reshape(-1, ENCODING_DIM)
+    return arr.tobytes()
+
+
+def unpack_encodings(blob) -> np.ndarray:
+    """
+    Packed bytes → (k, 128) float32 array.
+    Zero-copy: the array is a read-only view over the column bytes.
+    """
+    if not blob or len(blob) % ENCODING_BYTES:
+        return np.empty((0, ENCODING_DIM), dtype=ENCODING_DTYPE)
+
+    return np.frombuffer(blob, dtype=ENCODING_DTYPE).reshape(-1, ENCODING_DIM)
+
+
+def decode_legacy_json(raw):
+    """
+    Legacy face_encodings column → list of float64 numpy arrays.
+    Handles both JSON text (written by UserService) and decoded lists.
+    """
+    if not raw:
+        return []
+
+    if isinstance(raw, str):
+        raw = json.loads(raw)
+
+    encodings = []
+    for enc in raw:
+        try:
+            arr = np.asarray(enc, dtype=np.float64)
+        except (TypeError, ValueError):
+            continue
+        if arr.shape == (ENCODING_DIM,):
+            encodings.append(arr)
+
+    return encodings
+
+
+def load_encodings(face_data, face_encodings=None) -> np.ndarray:
+    """
+    Read path used everywhere: prefer the binary column, fall back to
+    legacy JSON rows that have not been migrated yet.
+    Returns a (k, 128) array (float32 for binary rows, float64 for JSON).
+    """
+    if face_data:
+        return unpack_encodings(face_data)
+
+    legacy = decode_legacy_json(face_encodings)
+    if not legacy:
+        return np.empty((0, ENCODING_DIM), dtype=np.float64)
+
+    return np.vstack(legacy)
+
+
+def compute_voter_hash(face_data, face_encodings=None):
+    """
+    On-chain voter hash: sha256 hex of the first stored encoding as
+    float64 bytes (same value cast_vote always sent). None if the row
+    has no usable encoding.
+    """
+    encodings = load_encodings(face_data, face_encodings)
+    if encodings.shape[0] == 0:
+        return None
+
+    return hashlib.sha256(encodings[0].astype(np.float64).tobytes()).hexdigest()
+
+
+def normalize_voter_hash(voter_hash):
+    """
+    bytes32 / "0x..." / hex → lowercase 64-char hex as stored in voter.voter_hash.
+    """
+    if isinstance(voter_hash, (bytes, bytearray)):
+        return bytes(voter_hash).hex()
+
+    voter_hash = voter_hash.lower()
+    return voter_hash[2:] if voter_hash.startswith("0x") else voter_hash
@@ -2,10 +2,14 @@
 
 import base64
 import io
-from PIL import Image
 import numpy as np
-import cv2
 from werkzeug.datastructures import FileStorage
+from werkzeug.exceptions import UnsupportedMediaType
+
+from backend.utils.lazy import lazy_import
+
+cv2 = lazy_import("cv2")
+Image = lazy_import("PIL.Image")
 
 
 def save_file_to_disk(file_storage: FileStorage, dest_path: str):
@@ -15,13 +19,56 @@ def save_file_to_disk(file_storage: FileStorage, dest_path: str):
     file_storage.save(dest_path)
 
 
-def pil_image_from_bytes(bts: bytes) -> Image.Image:
+def pil_image_from_bytes(bts: bytes):
     """
     Convert raw bytes → PIL RGB image.
     """
     return Image.open(io.BytesIO(bts)).convert("RGB")
 
 
+# =====================================================
+# FRAME DECODING (ONE PATH FOR EVERY FACE ENDPOINT)
+# =====================================================
+RAW_FRAME_TYPES = ("image/jpeg", "image/png", "image/webp", "application/octet-stream")
+
+
+def frame_to_bytes(frame):
+    """
+    Raw image bytes / memoryview pass through untouched; base64 strings
+    and data URLs ("data:image/jpeg;base64,...") are decoded.
+    """
+    if isinstance(frame, (bytes, bytearray, memoryview)):
+        return frame
+
+    if not isinstance(frame, str):
+        raise ValueError("Frame must be raw bytes or a base64 string")
+
+    # Remove data URL prefix if present (e.g. "data:image/png;base64,...")
+    if "," in frame:
+        frame = frame.split(",", 1)[1]
+
+    return base64.b64decode(frame)
+
+
+def decode_frame(frame, reduced=False):
+    """
+    Frame (raw bytes or base64) → OpenCV BGR image (numpy array).
+
+    The bytes are wrapped with np.frombuffer (no copy) and decoded once
+    by OpenCV. reduced=True decodes straight to half resolution
+    (cv2.IMREAD_REDUCED_COLOR_2), which skips most of the JPEG work.
+    """
+    np_arr = np.frombuffer(frame_to_bytes(frame), np.uint8)
+
+    flag = cv2.IMREAD_REDUCED_COLOR_2 if reduced else cv2.IMREAD_COLOR
+    img = cv2.imdecode(np_arr, flag)
+
+    if img is None:
+        raise ValueError("Failed to decode image")
+
+    return img
+
+
 def base64_to_image(base64_str: str):
     """
     Convert base64 string → OpenCV BGR image (numpy array).
@@ -31,20 +78,42 @@ def base64_to_image(base64_str: str):
     if not isinstance(base64_str, str):
         raise ValueError("base64_to_image expects a base64 string")
 
-    # Remove data URL prefix if present (e.g. "data:image/png;base64,...")
-    if "," in base64_str:
-        base64_str = base64_str.split(",", 1)[1]
+    return decode_frame(base64_str)
 
-    # Decode base64 → raw bytes
-    img_bytes = base64.b64decode(base64_str)
 
-    # Convert bytes → numpy array
-    np_arr = np.frombuffer(img_bytes, np.uint8)
+# =====================================================
+# FRAME TRANSPORT (MULTIPART / RAW IMAGE / LEGACY JSON)
+# =====================================================
+def read_frame_request(req, field="frames", allow_raw=True):
+    """
+    Returns (fields, frames) for a face endpoint request.
 
-    # Decode numpy → OpenCV BGR image
-    img = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+    - multipart/form-data: text fields from the form, one file part per
+      frame under `field` (raw JPEG bytes, no base64)
+    - image/jpeg (or other raw type) body: exactly one frame, fields from
+      the query string. allow_raw=False (endpoints taking a password)
+      answers 415 instead: credentials must not travel in the URL, where
+      access logs and proxies record them.
+    - JSON (legacy, with or without the JSON content type):
+      {"...": ..., "frames": [base64 data URLs]}
+    """
+    content_type = (req.mimetype or "").lower()
 
-    if img is None:
-        raise ValueError("Failed to decode image from base64")
+    if content_type == "multipart/form-data":
+        frames = [f.read() for f in req.files.getlist(field)]
+        return req.form, frames
 
-    return img
+    if content_type in RAW_FRAME_TYPES:
+        if not allow_raw:
+            raise UnsupportedMediaType(
+                "Send credentials and frames as multipart/form-data or JSON"
+            )
+        body = req.get_data(cache=False)
+        return req.args, [body] if body else []
+
+    data = req.get_json(force=True, silent=True)
+    if not isinstance(data, dict):
+        return {}, []
+
+    frames = data.get(field) or []
+    return data, frames if isinstance(frames, list) else []
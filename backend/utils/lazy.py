@@ -0,0 +1,50 @@
+# backend/utils/lazy.py
+#
+# Deferred imports for heavy dependencies (dlib / face_recognition,
+# OpenCV, PIL, web3) so importing the app, running the CLI or a test
+# does not pay for them until a code path actually uses them.
+
+import importlib
+import threading
+import time
+import types
+
+
+class LazyModule(types.ModuleType):
+    """
+    Module placeholder: the real import runs on first attribute access.
+
+        cv2 = lazy_import("cv2")
+        cv2.imdecode(...)      # imports OpenCV here, once
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self):
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    t0 = time.perf_counter()
+                    module = importlib.import_module(self.__name__)
+                    LAZY_IMPORT_MS[self.__name__] = (time.perf_counter() - t0) * 1000
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+# module name → milliseconds its first (deferred) import took
+LAZY_IMPORT_MS = {}
+
+
+def lazy_import(name):
+    return LazyModule(name)
@@ -0,0 +1,432 @@
+# backend/utils/metrics.py
+#
+# In-process metrics rendered in the Prometheus text format (GET /metrics).
+# No client library: a histogram observation is one bisect and a few
+# integer adds under a per-metric lock, cheap enough to leave on in
+# production. METRICS_ENABLED=0 turns every observation into a no-op.
+#
+# Under gunicorn (serving.warm_up) every worker also writes its values to
+# <METRICS_DIR>/<pid>.json every METRICS_FLUSH_SECONDS, and /metrics
+# merges all files, so any worker answers for the whole server:
+#   - counters / histograms are summed over every worker that ever ran
+#     (files of exited workers are kept, so totals never go backwards)
+#   - gauges get a pid label and only live workers are shown
+# Other workers' values are at most METRICS_FLUSH_SECONDS old.
+# The dev server (one process) renders its own values directly.
+
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+
+from backend.utils.process_utils import pid_alive
+from backend.utils.tracing import record_span
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
+# Seconds: 1 ms … 60 s covers a DB lookup up to a receipt wait
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+    0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs, extra=None):
+    pairs = list(pairs)
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+# =====================================================
+# METRIC TYPES
+# =====================================================
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def family(self):
+        """
+        {"name", "kind", "help", "samples": [(label pairs, value)]}:
+        the form rendered, written to snapshot files and merged.
+        """
+        with self._lock:
+            items = [(labels, self._copy(value)) for labels, value in self._values.items()]
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "help": self.documentation,
+            "samples": [(tuple(zip(self.labelnames, labels)), value) for labels, value in items],
+        }
+
+    @staticmethod
+    def _copy(value):
+        return value
+
+    def after_fork(self):
+        self._lock = threading.Lock()
+        self._values = {}
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labelvalues, amount=1):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, *labelvalues, amount=1):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def dec(self, *labelvalues, amount=1):
+        self.inc(*labelvalues, amount=-amount)
+
+    def set(self, value, *labelvalues):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[labelvalues] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labelvalues):
+        if not METRICS_ENABLED:
+            return
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labelvalues)
+            if entry is None:
+                # per-bucket counts (+Inf last), sum
+                entry = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][i] += 1
+            entry[1] += value
+
+    @contextmanager
+    def time(self, *labelvalues):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, *labelvalues)
+
+    @staticmethod
+    def _copy(value):
+        counts, total = value
+        return [list(counts), total]
+
+    def family(self):
+        family = super().family()
+        family["buckets"] = list(self.buckets)
+        return family
+
+
+def _render_family(family):
+    name = family["name"]
+    lines = [
+        f"# HELP {name} {family['help']}",
+        f"# TYPE {name} {family['kind']}",
+    ]
+
+    for labels, value in sorted(family["samples"], key=lambda sample: sample[0]):
+        if family["kind"] != "histogram":
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            continue
+
+        counts, total = value
+        cumulative = 0
+        for bound, count in zip(family["buckets"] + [float("inf")], counts):
+            cumulative += count
+            le = ("le", _format_value(float(bound)))
+            lines.append(f"{name}_bucket{_format_labels(labels, le)} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+        lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+
+    return lines
+
+
+def merge_families(snapshots, alive=pid_alive):
+    """
+    [(pid, families)] from every worker's file → one list of families.
+    Counters and histograms add up; gauges keep one sample per live
+    worker under an extra pid label.
+    """
+    merged = {}
+    for pid, families in snapshots:
+        for family in families:
+            into = merged.setdefault(family["name"], {**family, "samples": {}})
+            samples = into["samples"]
+            gauge = family["kind"] == "gauge"
+            if gauge and not alive(pid):
+                continue
+
+            for labels, value in family["samples"]:
+                labels = tuple(tuple(pair) for pair in labels)
+                if gauge:
+                    samples[labels + (("pid", str(pid)),)] = value
+                elif family["kind"] == "histogram":
+                    counts, total = samples.get(labels, [[0] * len(value[0]), 0.0])
+                    samples[labels] = [
+                        [a + b for a, b in zip(counts, value[0])], total + value[1]
+                    ]
+                else:
+                    samples[labels] = samples.get(labels, 0) + value
+
+    for family in merged.values():
+        family["samples"] = list(family["samples"].items())
+    return list(merged.values())
+
+
+# =====================================================
+# REGISTRY
+# =====================================================
+class Registry:
+    """
+    Metrics plus collectors: callables returning
+    [(name, kind, help, [(labels dict, value)])] evaluated at scrape
+    time, for values another object already tracks (cache counters,
+    index size).
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        self._dir = None
+        self._context = None
+        self._flusher = None
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._add(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._add(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, documentation, labelnames, buckets))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn):
+        self._collectors.append(fn)
+        return fn
+
+    # ------------------------------------------------------------
+    # MULTI-PROCESS (ONE SNAPSHOT FILE PER WORKER)
+    # ------------------------------------------------------------
+    def enable_multiprocess(self, path=None):
+        """
+        Call once in the master before fork. Clears files left by a
+        previous server in the same directory.
+        """
+        path = path or os.getenv("METRICS_DIR") or os.path.join(
+            tempfile.gettempdir(), f"voting-metrics-{os.getpid()}"
+        )
+        os.makedirs(path, exist_ok=True)
+        for stale in glob.glob(os.path.join(path, "*.json")):
+            os.remove(stale)
+        self._dir = path
+
+    def after_fork(self, context=None):
+        """
+        Start every worker from zero instead of the master's counts.
+        `context` (e.g. app.app_context) wraps collectors run by the
+        flush thread.
+        """
+        for metric in self._metrics:
+            metric.after_fork()
+
+        self._context = context
+        if self._dir and METRICS_ENABLED:
+            self._flusher = threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(METRICS_FLUSH_SECONDS)
+            try:
+                self.flush()
+            except Exception as e:
+                print("⚠️ Metrics flush failed:", e)
+
+    def flush(self):
+        """
+        Write this worker's values to <dir>/<pid>.json (atomic replace).
+        """
+        if not self._dir:
+            return
+
+        if self._context is not None:
+            with self._context():
+                families = self.families()
+        else:
+            families = self.families()
+
+        path = os.path.join(self._dir, f"{os.getpid()}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(families, f)
+        os.replace(tmp, path)
+
+    def _read_snapshots(self):
+        snapshots = []
+        for path in glob.glob(os.path.join(self._dir, "*.json")):
+            try:
+                with open(path) as f:
+                    snapshots.append((int(os.path.basename(path)[:-5]), json.load(f)))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    # ------------------------------------------------------------
+    # RENDER
+    # ------------------------------------------------------------
+    def families(self):
+        families = [metric.family() for metric in self._metrics]
+
+        for collect in self._collectors:
+            try:
+                collected = collect()
+            except Exception:
+                continue
+            for name, kind, documentation, samples in collected:
+                families.append({
+                    "name": name,
+                    "kind": kind,
+                    "help": documentation,
+                    "samples": [(tuple(labels.items()), value) for labels, value in samples],
+                })
+
+        return families
+
+    def render(self):
+        if self._dir:
+            self.flush()
+            families = merge_families(self._read_snapshots())
+        else:
+            families = self.families()
+
+        lines = []
+        for family in families:
+            lines.extend(_render_family(family))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# =====================================================
+# SHARED METRICS
+# =====================================================
+STAGE_SECONDS = REGISTRY.histogram(
+    "voting_stage_duration_seconds",
+    "Time spent per processing stage (face.*, db.*, chain.*).",
+    ["stage"],
+)
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "voting_http_request_duration_seconds",
+    "HTTP request latency by route and status.",
+    ["route", "method", "status"],
+)
+
+REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "voting_http_requests_in_flight",
+    "Requests currently being handled, by blueprint.",
+    ["blueprint"],
+)
+
+RPC_CALLS = REGISTRY.counter(
+    "voting_rpc_calls_total",
+    "JSON-RPC round trips to the Ethereum node (a batch counts once).",
+    ["method"],
+)
+
+FACE_FRAMES = REGISTRY.counter(
+    "voting_face_frames_total",
+    "Camera frames processed, by outcome (encoded, cached or skip reason).",
+    ["result"],
+)
+
+VOTES = REGISTRY.counter(
+    "voting_votes_total",
+    "/voter/vote attempts by outcome.",
+    ["outcome"],
+)
+
+
+def observe_stage(stage, seconds):
+    """
+    Stage histogram + a span in the request trace (utils/tracing.py).
+    """
+    STAGE_SECONDS.observe(seconds, stage)
+    record_span("stage", stage, seconds)
+
+
+@contextmanager
+def stage(name):
+    """
+        with stage("chain.send"):
+            web3.eth.send_raw_transaction(...)
+    """
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(name, time.perf_counter() - t0)
+
+
+def timed(name):
+    """
+    Decorator form of stage() for whole service methods.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
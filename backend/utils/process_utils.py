@@ -0,0 +1,17 @@
+# backend/utils/process_utils.py
+
+import os
+
+
+def pid_alive(pid):
+    """
+    True if a process with this pid exists on this host (signal 0).
+    A process owned by another user counts as alive.
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
@@ -0,0 +1,124 @@
+# backend/utils/query_plans.py
+#
+# Query-plan regression check for the hot ORM queries.
+# Run with:  flask check-query-plans [--mysql-url mysql+pymysql://...]
+# Exits non-zero if any hot query falls back to a full table scan.
+
+from sqlalchemy import create_engine, func, select, text
+
+from backend.database import db
+from backend.models import Admin, AuthStreamSession, Candidate, CandidateTally, Election, Voter, VoterParticipation
+
+
+# =====================================================
+# HOT QUERIES (name → select statement)
+# =====================================================
+def hot_queries():
+    return {
+        "voter_by_enrollment": select(Voter.id).where(Voter.enrollment == "E123"),
+        "voter_by_id": select(Voter).where(Voter.id == 1),
+        "voter_by_hash": select(Voter).where(Voter.voter_hash == "ab" * 32),
+        "participation_lookup": select(VoterParticipation.id).where(
+            VoterParticipation.election_id == 1, VoterParticipation.voter_id == 1
+        ),
+        "participation_count": select(func.count()).select_from(VoterParticipation).where(
+            VoterParticipation.election_id == 1
+        ),
+        "participation_by_voter": select(VoterParticipation.id).where(VoterParticipation.voter_id == 1),
+        "active_election": select(Election).where(Election.is_active.is_(True)),
+        "candidate_by_chain_id": select(Candidate).where(
+            Candidate.election_id == 1, Candidate.on_chain_id == 1
+        ),
+        "candidate_duplicate_name": select(Candidate.id).where(
+            Candidate.election_id == 1, Candidate.name == "A"
+        ),
+        "candidates_by_election": select(Candidate).where(Candidate.election_id == 1),
+        "vote_target_confirm": select(Candidate.id).where(
+            Election.id == 1, Election.is_active.is_(True), Election.contract_address == "0x0",
+            Candidate.id == 1, Candidate.election_id == Election.id, Candidate.on_chain_id == 1,
+        ),
+        "admin_by_username": select(Admin).where(Admin.username == "admin"),
+        "tallies_by_election": select(CandidateTally).where(CandidateTally.election_id == 1),
+        "auth_session_by_id": select(AuthStreamSession).where(AuthStreamSession.id == "ab" * 16),
+        "auth_sessions_expired": select(AuthStreamSession.id).where(
+            AuthStreamSession.created_at < "2000-01-01"
+        ),
+    }
+
+
+def _compile(stmt, engine):
+    return str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+
+
+# =====================================================
+# PER-DIALECT PLAN INSPECTION
+# =====================================================
+def _sqlite_full_scans(conn, sql):
+    """
+    EXPLAIN QUERY PLAN rows look like 'SCAN voter' (full scan) or
+    'SEARCH voter USING INDEX ...' / 'SCAN voter USING COVERING INDEX ...'.
+    """
+    plan = [row[-1] for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql))]
+    scans = [
+        step for step in plan
+        if step.startswith("SCAN ") and "USING" not in step
+    ]
+    return plan, scans
+
+
+def _mysql_full_scans(conn, sql):
+    """
+    EXPLAIN access type ALL = full table scan.
+    """
+    result = conn.execute(text("EXPLAIN " + sql))
+    rows = [dict(r._mapping) for r in result]
+    plan = [f"{r.get('table')}: type={r.get('type')} key={r.get('key')}" for r in rows]
+    scans = [p for r, p in zip(rows, plan) if (r.get("type") or "").upper() == "ALL"]
+    return plan, scans
+
+
+def check_engine(engine):
+    """
+    Create the schema on `engine` (if missing) and EXPLAIN every hot
+    query. Returns {query_name: {"plan": [...], "full_scans": [...]}}.
+    """
+    db.metadata.create_all(engine)
+
+    inspect_plan = {
+        "sqlite": _sqlite_full_scans,
+        "mysql": _mysql_full_scans,
+        "mariadb": _mysql_full_scans,
+    }.get(engine.dialect.name)
+
+    if inspect_plan is None:
+        raise ValueError(f"No plan checker for dialect {engine.dialect.name}")
+
+    report = {}
+    with engine.connect() as conn:
+        for name, stmt in hot_queries().items():
+            plan, scans = inspect_plan(conn, _compile(stmt, engine))
+            report[name] = {"plan": plan, "full_scans": scans}
+
+    return report
+
+
+def check_query_plans(mysql_url=None):
+    """
+    Always checks a fresh in-memory SQLite schema built from the models;
+    also checks MySQL when a URL is given. Returns (ok, reports).
+    """
+    reports = {"sqlite": check_engine(create_engine("sqlite://"))}
+
+    if mysql_url:
+        engine = create_engine(mysql_url)
+        try:
+            reports["mysql"] = check_engine(engine)
+        finally:
+            engine.dispose()
+
+    ok = all(
+        not entry["full_scans"]
+        for report in reports.values()
+        for entry in report.values()
+    )
+    return ok, reports
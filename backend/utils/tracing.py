@@ -0,0 +1,387 @@
+# backend/utils/tracing.py
+#
+# Opt-in per-request tracing (TRACE_ENABLED=1 or POST /admin/tracing).
+#
+# - Every traced request collects a span timeline: SQL statements,
+#   face / db / chain stages (via utils/metrics.observe_stage) and
+#   JSON-RPC calls. Requests slower than TRACE_SLOW_MS are appended to
+#   a rotating JSONL log, one file per worker process.
+# - A PROFILE_SAMPLE_RATE fraction of requests to PROFILE_BLUEPRINTS
+#   also runs under cProfile and tracemalloc; the .prof and .tracemalloc
+#   files are written next to the log and summarized in its line.
+#
+# Settings are per process: the admin toggle changes the worker that
+# answers it (gunicorn workers each keep their own).
+
+import cProfile
+import json
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+
+DEFAULT_TRACE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "instance", "traces"
+)
+
+_current_trace = ContextVar("current_trace", default=None)
+
+
+def _env_flag(name, default="0"):
+    return os.getenv(name, default) == "1"
+
+
+def _blueprint_names(value):
+    # "admin_bp,voter" → {"admin", "voter"}
+    names = value.split(",") if isinstance(value, str) else value
+    return {n.strip().removesuffix("_bp") for n in names if n.strip()}
+
+
+# =====================================================
+# SPANS
+# =====================================================
+class Trace:
+    """
+    Span timeline of one request. Offsets are ms since the request
+    started; spans recorded after the fact (face stages measured in the
+    pool) end at the time they were recorded.
+    """
+
+    def __init__(self, max_spans):
+        self.t0 = time.perf_counter()
+        self.max_spans = max_spans
+        self.spans = []
+        self.dropped = 0
+
+    def add(self, kind, name, seconds):
+        if len(self.spans) >= self.max_spans:
+            self.dropped += 1
+            return
+        end_ms = (time.perf_counter() - self.t0) * 1000
+        ms = seconds * 1000
+        self.spans.append({
+            "kind": kind,
+            "name": name,
+            "start_ms": round(end_ms - ms, 3),
+            "ms": round(ms, 3),
+        })
+
+    def totals(self):
+        totals = {}
+        for span in self.spans:
+            entry = totals.setdefault(span["kind"], {"count": 0, "ms": 0.0})
+            entry["count"] += 1
+            entry["ms"] = round(entry["ms"] + span["ms"], 3)
+        return totals
+
+
+def record_span(kind, name, seconds):
+    """
+    Adds a span to the current request's trace; no-op outside a traced
+    request (one ContextVar lookup).
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(kind, name, seconds)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current_trace.get() is not None:
+        context._trace_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_trace_start", None)
+    if started is not None:
+        record_span("sql", " ".join(statement.split())[:300], time.perf_counter() - started)
+
+
+# =====================================================
+# PROFILER (SAMPLED REQUESTS)
+# =====================================================
+class _Profile:
+    """
+    cProfile + tracemalloc around one request. Only one runs per process
+    at a time: tracemalloc is process-wide and cProfile can not nest.
+    """
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.started_tracemalloc = False
+        self.profiler = cProfile.Profile()
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self.started_tracemalloc = True
+        tracemalloc.reset_peak()
+        self.before = self._snapshot()
+        self.profiler.enable()
+
+    def stop(self, path_prefix, top):
+        self.profiler.disable()
+        after = self._snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+
+        self.profiler.dump_stats(path_prefix + ".prof")
+        after.dump(path_prefix + ".tracemalloc")
+
+        stats = pstats.Stats(self.profiler)
+        functions = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        allocations = after.compare_to(self.before, "lineno")
+
+        return {
+            "pstats": path_prefix + ".prof",
+            "tracemalloc": path_prefix + ".tracemalloc",
+            "peak_kb": round(peak / 1024, 1),
+            "top_cumulative": [
+                {
+                    "function": f"{file}:{line}({name})",
+                    "calls": calls,
+                    "tottime_ms": round(tottime * 1000, 3),
+                    "cumtime_ms": round(cumtime * 1000, 3),
+                }
+                for (file, line, name), (_, calls, tottime, cumtime, _) in functions[:top]
+            ],
+            "top_allocations": [
+                {
+                    "where": str(stat.traceback[0]),
+                    "size_kb": round(stat.size_diff / 1024, 1),
+                    "count": stat.count_diff,
+                }
+                for stat in allocations[:top]
+            ],
+        }
+
+    @staticmethod
+    def _snapshot():
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ])
+
+
+# =====================================================
+# REQUEST TRACER
+# =====================================================
+class RequestTracer:
+    """
+    Flask extension: tracer.init_app(app) adds the request hooks and the
+    SQLAlchemy cursor listeners. Nothing is collected while disabled.
+    """
+
+    def __init__(self, enabled=False, slow_ms=500.0, sample_rate=0.0,
+                 blueprints=("admin", "voter"), trace_dir=DEFAULT_TRACE_DIR,
+                 max_bytes=10 * 1024 * 1024, backups=5, max_spans=500,
+                 top=20, tracemalloc_frames=10):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.sample_rate = sample_rate
+        self.blueprints = _blueprint_names(blueprints)
+        self.trace_dir = trace_dir
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.max_spans = max_spans
+        self.top = top
+        self.tracemalloc_frames = tracemalloc_frames
+
+        self.traced = 0
+        self.written = 0
+        self.profiled = 0
+
+        self._profile_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self._log = None
+        self._log_pid = None
+        self._listening = False
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            enabled=_env_flag("TRACE_ENABLED"),
+            slow_ms=float(os.getenv("TRACE_SLOW_MS", "500")),
+            sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+            blueprints=os.getenv("PROFILE_BLUEPRINTS", "admin,voter"),
+            trace_dir=os.getenv("TRACE_DIR", DEFAULT_TRACE_DIR),
+            max_bytes=int(float(os.getenv("TRACE_LOG_MAX_MB", "10")) * 1024 * 1024),
+            backups=int(os.getenv("TRACE_LOG_BACKUPS", "5")),
+            max_spans=int(os.getenv("TRACE_MAX_SPANS", "500")),
+            top=int(os.getenv("PROFILE_TOP", "20")),
+        )
+
+    # ------------------------------------------------------------
+    # CONFIGURATION (ENV AT STARTUP, /admin/tracing AT RUNTIME)
+    # ------------------------------------------------------------
+    def configure(self, enabled=None, slow_ms=None, sample_rate=None, blueprints=None):
+        if slow_ms is not None:
+            self.slow_ms = max(0.0, float(slow_ms))
+        if sample_rate is not None:
+            self.sample_rate = min(1.0, max(0.0, float(sample_rate)))
+        if blueprints is not None:
+            self.blueprints = _blueprint_names(blueprints)
+        if enabled is not None:
+            self.enabled = bool(enabled)
+
+    def status(self):
+        return {
+            "enabled": self.enabled,
+            "slow_ms": self.slow_ms,
+            "sample_rate": self.sample_rate,
+            "blueprints": sorted(self.blueprints),
+            "log_file": self._log_path(),
+            "traced": self.traced,
+            "written": self.written,
+            "profiled": self.profiled,
+            "pid": os.getpid(),
+        }
+
+    def after_fork(self):
+        self._profile_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self._log = None
+        self.traced = self.written = self.profiled = 0
+
+    # ------------------------------------------------------------
+    # FLASK / SQLALCHEMY HOOKS
+    # ------------------------------------------------------------
+    def init_app(self, app):
+        from flask import request
+
+        if not self._listening:
+            from sqlalchemy import event
+            from sqlalchemy.engine import Engine
+
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+            self._listening = True
+
+        @app.before_request
+        def _start_trace():
+            if not self.enabled:
+                return
+            request.environ["trace.token"] = _current_trace.set(Trace(self.max_spans))
+            if self._should_profile(request.blueprint):
+                profile = _Profile(self.tracemalloc_frames)
+                try:
+                    profile.start()
+                except Exception:
+                    self._profile_lock.release()
+                    return
+                request.environ["trace.profile"] = profile
+
+        @app.after_request
+        def _finish_trace(response):
+            trace = _current_trace.get()
+            if trace is not None and "trace.token" in request.environ:
+                self._finish(trace, request, response.status_code)
+            return response
+
+        @app.teardown_request
+        def _reset_trace(exc=None):
+            # Also runs when after_request did not (e.g. a failed
+            # response): never leave the profiler or trace behind on
+            # a reused worker thread
+            profile = request.environ.pop("trace.profile", None)
+            if profile is not None:
+                profile.profiler.disable()
+                if profile.started_tracemalloc:
+                    tracemalloc.stop()
+                self._profile_lock.release()
+
+            token = request.environ.pop("trace.token", None)
+            if token is not None:
+                _current_trace.reset(token)
+
+    def _should_profile(self, blueprint):
+        if self.sample_rate <= 0 or blueprint not in self.blueprints:
+            return False
+        if random.random() >= self.sample_rate:
+            return False
+        # Busy profiling another request → this one is only traced
+        return self._profile_lock.acquire(blocking=False)
+
+    def _finish(self, trace, request, status_code):
+        total_ms = (time.perf_counter() - trace.t0) * 1000
+        profile = request.environ.pop("trace.profile", None)
+
+        with self._counter_lock:
+            self.traced += 1
+
+        if profile is None and total_ms < self.slow_ms:
+            return
+
+        now = datetime.now(timezone.utc)
+        record = {
+            "ts": now.isoformat(timespec="milliseconds"),
+            "pid": os.getpid(),
+            "method": request.method,
+            "route": request.url_rule.rule if request.url_rule else request.path,
+            "endpoint": request.endpoint,
+            "status": status_code,
+            "ms": round(total_ms, 3),
+            "slow": total_ms >= self.slow_ms,
+            "totals": trace.totals(),
+            "spans": sorted(trace.spans, key=lambda span: span["start_ms"]),
+            "dropped_spans": trace.dropped,
+        }
+
+        if profile is not None:
+            prefix = os.path.join(
+                self.trace_dir,
+                f"{now:%Y%m%dT%H%M%S%f}-{os.getpid()}-{request.endpoint or 'unknown'}"
+            )
+            try:
+                os.makedirs(self.trace_dir, exist_ok=True)
+                record["profile"] = profile.stop(prefix, self.top)
+                with self._counter_lock:
+                    self.profiled += 1
+            except Exception as exc:
+                profile.profiler.disable()
+                if profile.started_tracemalloc and tracemalloc.is_tracing():
+                    tracemalloc.stop()
+                record["profile"] = {"error": str(exc)}
+            finally:
+                self._profile_lock.release()
+
+        self._write(record)
+
+    # ------------------------------------------------------------
+    # ROTATING JSONL LOG (ONE PER WORKER)
+    # ------------------------------------------------------------
+    def _log_path(self):
+        return os.path.join(self.trace_dir, f"slow_requests-{os.getpid()}.jsonl")
+
+    def _logger(self):
+        if self._log is None or self._log_pid != os.getpid():
+            os.makedirs(self.trace_dir, exist_ok=True)
+            handler = RotatingFileHandler(
+                self._log_path(), maxBytes=self.max_bytes, backupCount=self.backups
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+
+            log = logging.getLogger(f"{__name__}.{os.getpid()}")
+            log.handlers = [handler]
+            log.setLevel(logging.INFO)
+            log.propagate = False
+
+            self._log, self._log_pid = log, os.getpid()
+        return self._log
+
+    def _write(self, record):
+        try:
+            self._logger().info(json.dumps(record, default=str))
+        except Exception:
+            return
+        with self._counter_lock:
+            self.written += 1
+
+
+# Process-wide tracer (hooked up in create_app)
+tracer = RequestTracer.from_env()
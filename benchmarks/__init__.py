@@ -0,0 +1,4 @@
+# benchmarks/
+#
+# Reproducible benchmarks for the face, database and blockchain hot
+# paths; results are JSON so runs can be compared (see run.py).
@@ -0,0 +1,134 @@
+# benchmarks/bench_chain.py
+#
+# BlockchainService against an in-process chain (eth-tester + py-evm,
+# see benchmarks/requirements.txt): contract deploy, add_candidate,
+# vote() (one transaction per vote, receipt awaited), submit_vote()
+# under concurrency (voteBatch when the contract has it) and
+# get_results().
+#
+# eth-tester mines every transaction instantly, so the numbers measure
+# our signing / encoding / RPC overhead and the EVM, not block times.
+# It also rejects nonce gaps a real node would queue, so concurrent
+# single votes can exhaust their retries; those land in "errors".
+
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .common import log, measure, summarize
+
+CANDIDATES = 10
+
+
+def local_chain(service=None):
+    """
+    (BlockchainService, owner, private_key) on a fresh eth-tester chain.
+    Pass `service` (e.g. the process-wide one) to point it at the chain
+    instead of building a new BlockchainService.
+
+    eth-tester is not thread-safe; requests are serialized the way a
+    node would process them, while our client code stays concurrent.
+    """
+    from eth_tester import EthereumTester
+    from web3 import EthereumTesterProvider, Web3
+    from backend.services.blockchain_service import BlockchainService
+
+    class SerializedTesterProvider(EthereumTesterProvider):
+        _lock = threading.Lock()
+
+        def make_request(self, method, params):
+            with self._lock:
+                return super().make_request(method, params)
+
+    tester = EthereumTester()
+    web3 = Web3(SerializedTesterProvider(tester))
+    if service is None:
+        service = BlockchainService(web3=web3)
+    else:
+        service.web3 = web3
+
+    owner = service.web3.eth.accounts[0]
+    key = tester.backend.account_keys[0]
+    private_key = key.to_hex() if hasattr(key, "to_hex") else str(key)
+    return service, owner, private_key
+
+
+def voter_hashes(prefix):
+    counter = iter(range(10 ** 9))
+    return lambda: hashlib.sha256(f"{prefix}-{next(counter)}".encode()).hexdigest()
+
+
+def run(args):
+    service, owner, private_key = local_chain()
+    results = []
+
+    log("  deploy_contract")
+    addresses = []
+    samples = measure(lambda: addresses.append(service.deploy_contract(owner, private_key)[0]),
+                      repeat=3, warmup=0)
+    results.append(summarize("chain", "deploy_contract", samples))
+    contract_address = addresses[0]
+
+    log("  add_candidate")
+    names = iter(range(10 ** 6))
+    samples = measure(
+        lambda: service.add_candidate(contract_address, f"Candidate {next(names)}", owner, private_key),
+        repeat=CANDIDATES, warmup=0
+    )
+    results.append(summarize("chain", "add_candidate", samples))
+
+    log("  vote (single transaction, receipt awaited)")
+    next_hash = voter_hashes("single")
+    samples = measure(
+        lambda: service.vote(next_hash(), 1, contract_address, owner, private_key, wait=True),
+        repeat=args.repeat
+    )
+    results.append(summarize("chain", "vote", samples, {"wait": True}))
+
+    # Concurrent voters: coalesced into voteBatch when the deployed
+    # bytecode has it, else one vote() each through the nonce manager
+    batched = service.supports_function(contract_address, "voteBatch")
+    service.batching_enabled = batched
+    name = "submit_vote[batch]" if batched else "submit_vote[single]"
+    next_hash = voter_hashes("concurrent")
+    votes = args.repeat * 10
+
+    for concurrency in args.concurrency:
+        log(f"  {name}, {concurrency} concurrent voters")
+        hashes = [next_hash() for _ in range(votes)]
+
+        def cast(voter_hash):
+            t0 = time.perf_counter()
+            try:
+                service.submit_vote(voter_hash, 2, contract_address, owner, private_key)
+            except Exception as exc:
+                return None, type(exc).__name__
+            return (time.perf_counter() - t0) * 1000, None
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(cast, hashes))
+        elapsed = time.perf_counter() - started
+
+        samples = [ms for ms, error in outcomes if error is None]
+        errors = {}
+        for _, error in outcomes:
+            if error:
+                errors[error] = errors.get(error, 0) + 1
+        if not samples:
+            log(f"    every vote failed: {errors}")
+            continue
+
+        results.append(summarize(
+            "chain", name, samples,
+            {"concurrency": concurrency},
+            throughput_per_s=len(samples) / elapsed,
+            errors=errors
+        ))
+
+    log("  get_results")
+    samples = measure(lambda: service.get_results(contract_address), repeat=args.repeat * 5)
+    results.append(summarize("chain", "get_results", samples, {"candidates": CANDIDATES}))
+
+    return results
@@ -0,0 +1,153 @@
+# benchmarks/bench_db.py
+#
+# UserService / ORM hot paths against a seeded database:
+# voter lookups, participation checks and claims, voter list paging,
+# the active-election load and the index-backed is_face_duplicate.
+#
+# Uses a throwaway SQLite file unless --db-url points at a (scratch!)
+# MySQL database; the seeded tables are dropped first.
+
+import os
+import random
+import tempfile
+
+from .common import log, measure, summarize
+from .bench_face import synthetic_encodings
+
+ELECTION_ID = 424242
+CANDIDATES = 10
+
+
+def make_app(db_url):
+    os.environ["DATABASE_URL"] = db_url
+    os.environ["DEFER_BACKGROUND_TASKS"] = "1"
+    os.environ.setdefault("INDEXER_ENABLED", "0")
+
+    from backend.app import create_app
+    from backend.startup import get_bootstrap
+
+    app = create_app()
+    if not get_bootstrap(app).run_once():
+        raise RuntimeError(f"Database not ready: {get_bootstrap(app).last_error}")
+    return app
+
+
+def seed(voters, voted_fraction=0.5, batch=5000):
+    """
+    `voters` voters with packed synthetic encodings and voter hashes, an
+    active election with CANDIDATES candidates, and participation rows
+    for `voted_fraction` of the roll.
+    """
+    from sqlalchemy import insert
+    from backend.database import db
+    from backend.models import Candidate, Election, Voter, VoterParticipation
+    from backend.utils.encoding_utils import compute_voter_hash, pack_encodings
+
+    encodings = synthetic_encodings(voters, seed=7)
+    for start in range(0, voters, batch):
+        values = []
+        for i in range(start, min(start + batch, voters)):
+            face_data = pack_encodings([encodings[i]])
+            values.append({
+                "name": f"Voter {i}",
+                "enrollment": f"ENR{i:08d}",
+                "face_data": face_data,
+                "voter_hash": compute_voter_hash(face_data),
+                "has_voted": False,
+            })
+        db.session.execute(insert(Voter), values)
+    db.session.commit()
+
+    db.session.add(Election(id=ELECTION_ID, name="Benchmark", contract_address=None, is_active=True))
+    for c in range(1, CANDIDATES + 1):
+        db.session.add(Candidate(name=f"Candidate {c}", election_id=ELECTION_ID, on_chain_id=c))
+
+    voted = random.Random(3).sample(range(1, voters + 1), int(voters * voted_fraction))
+    for start in range(0, len(voted), batch):
+        db.session.execute(insert(VoterParticipation), [
+            {"election_id": ELECTION_ID, "voter_id": voter_id}
+            for voter_id in voted[start:start + batch]
+        ])
+    db.session.commit()
+
+    return encodings
+
+
+def bench_queries(voters, encodings, repeat):
+    from backend.database import db
+    from backend.services.election_service import ElectionCache
+    from backend.services.face_service import FaceService, face_index
+    from backend.services.user_service import UserService
+
+    users = UserService()
+    faces = FaceService()
+    rng = random.Random(11)
+    params = {"voters": voters, "dialect": db.engine.dialect.name}
+    results = []
+
+    def voter_id():
+        return rng.randint(1, voters)
+
+    def add(name, fn, n=repeat, **extra):
+        log(f"  {name}")
+        samples = measure(fn, repeat=n)
+        db.session.rollback()
+        results.append(summarize("db", name, samples, {**params, **extra}))
+
+    add("get_by_enrollment", lambda: users.get_by_enrollment(f"ENR{voter_id() - 1:08d}"))
+    add("get_by_id", lambda: users.get_by_id(voter_id()))
+    add("get_voter_hash", lambda: users.get_voter_hash(voter_id()))
+    add("has_voted", lambda: users.has_voted(ELECTION_ID, voter_id()))
+    add("list_voters", lambda: users.list_voters(limit=100), page="first")
+    add("list_voters", lambda: users.list_voters(after_id=voters - 150, limit=100), page="last")
+    add("list_voters", lambda: users.list_voters(limit=100, has_voted=False,
+                                                 election_id=ELECTION_ID), page="not_voted")
+    add("list_voters", lambda: users.list_voters(limit=100, enrollment_prefix="ENR0000"), page="prefix")
+    add("election_cache.load", ElectionCache._load)
+
+    # Write path: one INSERT + commit, then undone so the roll stays the same
+    unvoted = [
+        i for i in range(1, voters + 1)
+        if not users.has_voted(ELECTION_ID, i)
+    ][:repeat * 4]
+    cursor = iter(unvoted)
+
+    def claim():
+        participation = users.claim_participation(ELECTION_ID, next(cursor))
+        users.release_participation(participation)
+
+    add("claim_release_participation", claim, n=min(repeat, len(unvoted) - 2))
+
+    # 1:N duplicate check through the process-wide index (+ DB re-check)
+    face_index.load_from_db()
+    hit = iter(range(10 ** 9))
+
+    def duplicate():
+        i = next(hit) % voters
+        return faces.is_face_duplicate(encodings[i])
+
+    add("is_face_duplicate[index]", duplicate)
+
+    return results
+
+
+def run(args):
+    from backend.database import db
+
+    db_url = args.db_url
+    if not db_url:
+        workdir = tempfile.mkdtemp(prefix="voting-bench-")
+        db_url = "sqlite:///" + os.path.join(workdir, "bench.db")
+
+    app = make_app(db_url)
+    results = []
+    with app.app_context():
+        for voters in args.voters:
+            log(f"  seeding {voters:,} voters")
+            db.drop_all()
+            db.create_all()
+            encodings = seed(voters)
+            results.extend(bench_queries(voters, encodings, repeat=args.repeat * 5))
+        db.session.remove()
+
+    return results
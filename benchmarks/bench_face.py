@@ -0,0 +1,143 @@
+# benchmarks/bench_face.py
+#
+# Face hot paths without a database:
+#   - FaceService.encode_from_image per frame size (HOG detect + encode)
+#   - FramePipeline.process_frame (JPEG decode + quality gate + detect + encode)
+#   - duplicate search at 1k … 1M synthetic encodings:
+#       FaceIndex.nearest (exact / ivf), the kernel behind
+#       is_face_duplicate(), and the legacy list path of is_face_duplicate
+#
+# The index-backed is_face_duplicate (with its DB re-check) is timed by
+# the db suite against a seeded voter table.
+
+import glob
+import os
+
+import numpy as np
+
+from .common import check, log, measure, summarize
+
+FRAME_SIZES = [(320, 240), (640, 480), (1280, 720), (1920, 1080)]
+INDEX_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+IVF_MUST_WIN = 100_000      # from here on ivf slower than exact fails the run
+LIST_PATH_MAX = 100_000     # the per-row list path is far too slow beyond this
+
+UPLOADS = os.path.join(os.path.dirname(__file__), "..", "frontend", "public", "uploads")
+
+
+def synthetic_encodings(n, seed=0):
+    """Random vectors with the spread of real 128-d face encodings."""
+    rng = np.random.default_rng(seed)
+    return rng.normal(0.0, 0.09, size=(n, 128)).astype(np.float32)
+
+
+def find_face_image(path=None):
+    """
+    Returns (BGR image, has_face). Uses `path`, else the first upload
+    with a detectable face, else random noise (detection-only timing).
+    """
+    import cv2
+    from backend.services.face_service import FaceService
+
+    candidates = [path] if path else sorted(
+        glob.glob(os.path.join(UPLOADS, "*.jpg")) + glob.glob(os.path.join(UPLOADS, "*.png"))
+    )
+    service = FaceService()
+    for candidate in candidates:
+        img = cv2.imread(candidate)
+        if img is not None and service.encode_from_image(img) is not None:
+            return img, True
+
+    log("  no face image found, timing detection on noise")
+    return np.random.default_rng(0).integers(0, 255, (720, 1280, 3), dtype=np.uint8), False
+
+
+def bench_encode(image, has_face, repeat):
+    import cv2
+    from backend.services.face_service import FaceService, FramePipeline
+
+    service = FaceService()
+    results = []
+
+    for width, height in FRAME_SIZES:
+        frame = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+        params = {"width": width, "height": height, "face": has_face}
+
+        log(f"  encode_from_image {width}x{height}")
+        samples = measure(lambda: service.encode_from_image(frame), repeat=repeat)
+        results.append(summarize("face", "encode_from_image", samples, params))
+
+        ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        data = jpeg.tobytes()
+
+        log(f"  pipeline.process_frame {width}x{height}")
+        samples = measure(lambda: FramePipeline().process_frame(data), repeat=repeat)
+        results.append(summarize("face", "pipeline.process_frame", samples,
+                                 {**params, "jpeg_bytes": len(data)}))
+
+    return results
+
+
+def bench_duplicates(sizes, repeat):
+    from backend.services.face_service import FaceIndex, FaceService
+
+    service = FaceService()
+    results = []
+
+    for n in sizes:
+        log(f"  duplicate search over {n:,} encodings")
+        rows = synthetic_encodings(n, seed=n)
+        rng = np.random.default_rng(1)
+
+        # Half the probes are noisy copies of an enrolled row (a hit)
+        probes = [
+            rows[rng.integers(n)] + rng.normal(0, 0.01, 128).astype(np.float32)
+            if i % 2 == 0 else synthetic_encodings(1, seed=1000 + i)[0]
+            for i in range(max(repeat, 10))
+        ]
+        cursor = iter(range(10 ** 9))
+
+        def probe():
+            return probes[next(cursor) % len(probes)]
+
+        medians = {}
+        for mode in ("exact", "ivf"):
+            index = FaceIndex(initial_capacity=n, mode=mode, ann_min_size=min(n, 50_000))
+            for start in range(0, n, 10_000):
+                index.add(start, rows[start:start + 10_000])
+            if mode == "ivf" and not index.build_ann():
+                continue
+
+            samples = measure(lambda: index.nearest(probe()), repeat=repeat)
+            result = summarize("face", "face_index.nearest", samples,
+                               {"encodings": n, "mode": mode})
+            medians[mode] = result["median"]
+            results.append(result)
+
+        if n >= IVF_MUST_WIN and "ivf" in medians:
+            check(results[-1], medians["ivf"] < medians["exact"],
+                  f"ivf median {medians['ivf']:.2f} ms is not below exact "
+                  f"{medians['exact']:.2f} ms at {n:,} encodings")
+
+        if n <= LIST_PATH_MAX:
+            existing = list(rows)
+            samples = measure(
+                lambda: service.is_face_duplicate(probe(), existing_encodings=existing),
+                repeat=max(3, repeat // 4), warmup=1
+            )
+            results.append(summarize("face", "is_face_duplicate[list]", samples,
+                                     {"encodings": n}))
+
+    return results
+
+
+def run(args):
+    results = []
+
+    image, has_face = find_face_image(args.image)
+    results.extend(bench_encode(image, has_face, repeat=args.repeat))
+
+    sizes = [s for s in INDEX_SIZES if s <= args.max_encodings]
+    results.extend(bench_duplicates(sizes, repeat=args.repeat * 5))
+
+    return results
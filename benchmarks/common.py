@@ -0,0 +1,102 @@
+# benchmarks/common.py
+#
+# Timing helpers and the JSON result format shared by every suite.
+
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+
+def measure(fn, repeat=20, warmup=2, min_time=None):
+    """
+    Call fn() `warmup` times untimed, then `repeat` times (or until
+    `min_time` seconds have passed, whichever is later). Returns the
+    per-call durations in milliseconds.
+    """
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < repeat or (min_time and time.perf_counter() - started < min_time):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    k = (len(ordered) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def summarize(suite, name, samples, params=None, **extra):
+    """
+    One result row: latency statistics in ms plus free-form params.
+    """
+    return {
+        "suite": suite,
+        "name": name,
+        "params": params or {},
+        "unit": "ms",
+        "n": len(samples),
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "p95": percentile(samples, 0.95),
+        "max": max(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        **extra,
+    }
+
+
+def check(result, ok, message):
+    """
+    Mark a result row as failed (the run exits 1) when `ok` is false.
+    """
+    if not ok:
+        result["failed"] = message
+        log(f"  ❌ {message}")
+    return result
+
+
+def result_key(result):
+    params = ",".join(f"{k}={v}" for k, v in sorted(result["params"].items()))
+    return f"{result['suite']}/{result['name']}[{params}]"
+
+
+def log(message):
+    print(message, file=sys.stderr, flush=True)
+
+
+def environment():
+    """
+    Enough context to tell whether two result files are comparable.
+    """
+    import numpy as np
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+    }
@@ -0,0 +1,492 @@
+# benchmarks/loadsim.py
+#
+# Election-day load simulator:
+#
+#   python -m benchmarks.loadsim --voters 200 --concurrency 16
+#   python -m benchmarks.loadsim --rate 5 --duration 60 --target server
+#
+# 1. Seeds N voters on a throwaway database. Each voter gets one of the
+#    canned face photos (frontend/public/uploads or --frames) as its
+#    camera frame, and the photo's encoding (plus a little noise) as the
+#    enrolled face, so authentication really runs detection + encoding.
+# 2. Deploys the election contract on an in-process eth-tester chain and
+#    adds the candidates.
+# 3. Drives /voter/authenticate → /voter/vote per voter, closed loop at
+#    --concurrency or open loop at --rate arrivals/s, through Flask's
+#    test client or a real local HTTP server (--target server).
+# 4. Reports throughput, p50/p95/p99 per endpoint and an error
+#    breakdown (double votes, nonce collisions, auth failures, ...).
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .bench_face import UPLOADS
+from .common import environment, log, percentile
+
+
+# =====================================================
+# SETUP
+# =====================================================
+def load_canned_frames(frames_dir=None):
+    """
+    [(BGR image ≤ 640 px wide, 128-d encoding)] for every photo with a
+    detectable face.
+    """
+    import cv2
+    from backend.services.face_service import FaceService
+
+    service = FaceService()
+    paths = sorted(
+        glob.glob(os.path.join(frames_dir or UPLOADS, "*.jpg"))
+        + glob.glob(os.path.join(frames_dir or UPLOADS, "*.png"))
+    )
+
+    canned = []
+    for path in paths:
+        img = cv2.imread(path)
+        if img is None:
+            continue
+
+        # Webcam-sized frame, as the browser would send it
+        scale = min(1.0, 640 / img.shape[1])
+        img = cv2.resize(img, (int(img.shape[1] * scale), int(img.shape[0] * scale)))
+        encoding = service.encode_from_image(img)
+        if encoding is not None:
+            canned.append((img, encoding))
+
+    if not canned:
+        raise SystemExit(f"No face found in any image under {frames_dir or UPLOADS}")
+    return canned
+
+
+def unique_frame(img, rng):
+    """
+    The canned photo with a few pixels changed, so every voter uploads
+    different bytes (no frame cache hits across voters).
+    """
+    import cv2
+
+    frame = img.copy()
+    for _ in range(4):
+        y, x = rng.integers(frame.shape[0]), rng.integers(frame.shape[1])
+        frame[y, x] = rng.integers(0, 255, 3)
+    ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 90])
+    return jpeg.tobytes()
+
+
+def setup(args):
+    """
+    Fresh database + chain + election; returns (app, voters, candidates)
+    where voters is a list of {"name", "enrollment", "frame", "canned"}.
+    """
+    db_url = args.db_url or "sqlite:///" + os.path.join(
+        tempfile.mkdtemp(prefix="voting-loadsim-"), "loadsim.db"
+    )
+    os.environ["DATABASE_URL"] = db_url
+    os.environ["DEFER_BACKGROUND_TASKS"] = "1"
+    os.environ.setdefault("INDEXER_ENABLED", "0")
+    os.environ.setdefault("VOTE_BATCH_ENABLED", "1")
+
+    from sqlalchemy import insert
+    from backend.app import create_app
+    from backend.database import db
+    from backend.models import Candidate, Election, Voter
+    from backend.services.blockchain_service import get_blockchain_service
+    from backend.services.election_service import election_cache
+    from backend.services.face_service import face_index
+    from backend.startup import get_bootstrap
+    from backend.utils.encoding_utils import compute_voter_hash, pack_encodings
+    from .bench_chain import local_chain
+
+    # The app's own BlockchainService, pointed at the local chain
+    service, owner, private_key = local_chain(get_blockchain_service())
+    os.environ["OWNER_ADDRESS"] = owner
+    os.environ["PRIVATE_KEY"] = private_key
+
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+    bootstrap = get_bootstrap(app)
+    if not bootstrap.run_once():
+        raise SystemExit(f"Database not ready: {bootstrap.last_error}")
+
+    log("  encoding canned frames")
+    canned = load_canned_frames(args.frames)
+    rng = np.random.default_rng(args.seed)
+
+    log(f"  deploying contract + {args.candidates} candidates")
+    contract_address, _ = service.deploy_contract(owner, private_key)
+    candidates = [
+        service.add_candidate(contract_address, f"Candidate {c}", owner, private_key)
+        for c in range(1, args.candidates + 1)
+    ]
+
+    log(f"  seeding {args.voters} voters")
+    voters = []
+    with app.app_context():
+        election_id = 5150
+        db.session.add(Election(id=election_id, name="Load test",
+                                contract_address=contract_address, is_active=True))
+        for c, on_chain_id in enumerate(candidates, start=1):
+            db.session.add(Candidate(name=f"Candidate {c}", election_id=election_id,
+                                     on_chain_id=on_chain_id))
+
+        values = []
+        for i in range(args.voters):
+            img, encoding = canned[i % len(canned)]
+            enrolled = encoding + rng.normal(0, 0.005, encoding.shape)
+            face_data = pack_encodings([enrolled])
+            values.append({
+                "name": f"Voter {i}",
+                "enrollment": f"LOAD{i:07d}",
+                "face_data": face_data,
+                "voter_hash": compute_voter_hash(face_data),
+                "has_voted": False,
+            })
+            voters.append({
+                "name": f"Voter {i}",
+                "enrollment": f"LOAD{i:07d}",
+                "frame": unique_frame(img, rng) if not args.reuse_frames else None,
+                "canned": i % len(canned),
+            })
+        db.session.execute(insert(Voter), values)
+        db.session.commit()
+
+        face_index.load_from_db()
+        election_cache.invalidate()
+
+    if args.reuse_frames:
+        shared = [unique_frame(img, rng) for img, _ in canned]
+        for voter in voters:
+            voter["frame"] = shared[voter["canned"]]
+
+    return app, voters, candidates
+
+
+# =====================================================
+# CLIENTS
+# =====================================================
+class TestClientTarget:
+    """In-process: Flask test client, one per thread."""
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def _client(self):
+        if not hasattr(self._local, "client"):
+            self._local.client = self.app.test_client()
+        return self._local.client
+
+    def authenticate(self, voter):
+        r = self._client().post("/voter/authenticate", data={
+            "username": voter["name"],
+            "enrollment": voter["enrollment"],
+            "frames": [(io.BytesIO(voter["frame"]), "frame.jpg", "image/jpeg")],
+        }, content_type="multipart/form-data")
+        return r.status_code, r.get_json(silent=True) or {}
+
+    def vote(self, voter_id, candidate_id):
+        r = self._client().post("/voter/vote", json={"voter_id": voter_id, "candidate_id": candidate_id})
+        return r.status_code, r.get_json(silent=True) or {}
+
+    def results(self):
+        r = self._client().get("/admin/results")
+        return r.status_code, r.get_json(silent=True) or {}
+
+    def close(self):
+        pass
+
+
+class ServerTarget:
+    """Real HTTP: the app on a local threaded werkzeug server."""
+
+    def __init__(self, app, port=0):
+        import requests
+        from werkzeug.serving import make_server
+
+        self.server = make_server("127.0.0.1", port, app, threaded=True)
+        self.base = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self._requests = requests
+        self._local = threading.local()
+
+    def _session(self):
+        if not hasattr(self._local, "session"):
+            self._local.session = self._requests.Session()
+        return self._local.session
+
+    @staticmethod
+    def _json(r):
+        try:
+            return r.json()
+        except ValueError:
+            return {}
+
+    def authenticate(self, voter):
+        r = self._session().post(
+            f"{self.base}/voter/authenticate",
+            data={"username": voter["name"], "enrollment": voter["enrollment"]},
+            files=[("frames", ("frame.jpg", voter["frame"], "image/jpeg"))],
+            timeout=120,
+        )
+        return r.status_code, self._json(r)
+
+    def vote(self, voter_id, candidate_id):
+        r = self._session().post(f"{self.base}/voter/vote",
+                                 json={"voter_id": voter_id, "candidate_id": candidate_id},
+                                 timeout=180)
+        return r.status_code, self._json(r)
+
+    def results(self):
+        r = self._session().get(f"{self.base}/admin/results", timeout=60)
+        return r.status_code, self._json(r)
+
+    def close(self):
+        self.server.shutdown()
+
+
+# =====================================================
+# ERROR CLASSIFICATION
+# =====================================================
+def classify(endpoint, status, body):
+    """
+    (status, JSON body) → None on success, else an error category.
+    """
+    if endpoint == "authenticate" and status == 200 and body.get("success"):
+        return None
+    if endpoint == "vote" and status == 200 and body.get("success"):
+        return None
+
+    message = str(body.get("error") or "").lower()
+    if status == 503:
+        return "not_ready"
+    if "already voted" in message:
+        return "double_vote" if endpoint == "vote" else "already_voted_at_auth"
+    if "nonce" in message or "replacement transaction" in message:
+        return "nonce_collision"
+    if "not recorded" in message or "skipped" in message:
+        return "vote_not_recorded"
+    if "database is locked" in message or "deadlock" in message:
+        return "db_lock"
+    if status == 401:
+        return "face_mismatch"
+    if status == 404:
+        return "voter_not_found"
+    if status >= 500:
+        return f"server_error: {message[:60]}" if message else "server_error"
+    return f"http_{status}"
+
+
+# =====================================================
+# DRIVER
+# =====================================================
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {"authenticate": [], "vote": [], "flow": []}
+        self.errors = {}
+        self.votes_ok = 0
+        self.flows = 0
+
+    def request(self, endpoint, fn):
+        t0 = time.perf_counter()
+        try:
+            status, body = fn()
+            error = classify(endpoint, status, body)
+        except Exception as exc:
+            status, body, error = None, {}, f"exception: {type(exc).__name__}"
+        elapsed = (time.perf_counter() - t0) * 1000
+
+        with self._lock:
+            self.latencies[endpoint].append(elapsed)
+            if error:
+                key = f"{endpoint}/{error}"
+                self.errors[key] = self.errors.get(key, 0) + 1
+        return error, body
+
+    def flow_done(self, elapsed_ms, voted):
+        with self._lock:
+            self.flows += 1
+            self.latencies["flow"].append(elapsed_ms)
+            if voted:
+                self.votes_ok += 1
+
+
+def run_flow(target, recorder, voter, candidates, rng, double_vote):
+    t0 = time.perf_counter()
+
+    error, body = recorder.request("authenticate", lambda: target.authenticate(voter))
+    voted = False
+    if error is None:
+        voter_id = body["voter_id"]
+        candidate_id = rng.choice(candidates)
+        error, _ = recorder.request("vote", lambda: target.vote(voter_id, candidate_id))
+        voted = error is None
+
+        # A voter hitting "vote" again (double click, retry after timeout)
+        if voted and double_vote:
+            recorder.request("vote", lambda: target.vote(voter_id, candidate_id))
+
+    recorder.flow_done((time.perf_counter() - t0) * 1000, voted)
+
+
+def drive(target, voters, candidates, args):
+    """
+    Closed loop (every voter queued at once, --concurrency in flight) or
+    open loop (Poisson arrivals at --rate per second, --duration cap).
+    """
+    recorder = Recorder()
+    rng = random.Random(args.seed)
+    arrival_rng = random.Random(args.seed + 1)
+    double_votes = set(rng.sample(range(len(voters)), int(len(voters) * args.double_vote_rate)))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = []
+        next_arrival = started
+        for i, voter in enumerate(voters):
+            if args.rate:
+                next_arrival += arrival_rng.expovariate(args.rate)
+                delay = next_arrival - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                if args.duration and time.perf_counter() - started > args.duration:
+                    break
+
+            flow_rng = random.Random(args.seed * 1000 + i)
+            futures.append(pool.submit(run_flow, target, recorder, voter, candidates,
+                                       flow_rng, i in double_votes))
+
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    return recorder, elapsed
+
+
+def latency_stats(samples):
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 0.50),
+        "p95_ms": percentile(samples, 0.95),
+        "p99_ms": percentile(samples, 0.99),
+        "max_ms": max(samples),
+        "mean_ms": sum(samples) / len(samples),
+    }
+
+
+def build_report(args, recorder, elapsed, chain_votes):
+    return {
+        "meta": {**environment(), "args": sys.argv[1:]},
+        "config": {
+            "voters": args.voters,
+            "candidates": args.candidates,
+            "concurrency": args.concurrency,
+            "rate_per_s": args.rate,
+            "target": args.target,
+            "reuse_frames": args.reuse_frames,
+            "double_vote_rate": args.double_vote_rate,
+            "face_workers": os.getenv("FACE_WORKERS"),
+            "vote_batching": os.getenv("VOTE_BATCH_ENABLED"),
+        },
+        "elapsed_s": elapsed,
+        "flows": recorder.flows,
+        "votes_ok": recorder.votes_ok,
+        "votes_per_minute": recorder.votes_ok / elapsed * 60 if elapsed else None,
+        "chain_votes": chain_votes,
+        "latency": {name: latency_stats(s) for name, s in recorder.latencies.items()},
+        "errors": dict(sorted(recorder.errors.items(), key=lambda kv: -kv[1])),
+    }
+
+
+def print_summary(report):
+    log("")
+    log(f"🗳  {report['votes_ok']}/{report['flows']} votes in {report['elapsed_s']:.1f} s "
+        f"→ {report['votes_per_minute']:.1f} votes/min (on chain: {report['chain_votes']})")
+    for name, stats in report["latency"].items():
+        if stats["count"]:
+            log(f"   {name:<13} n={stats['count']:<6} p50 {stats['p50_ms']:8.1f}  "
+                f"p95 {stats['p95_ms']:8.1f}  p99 {stats['p99_ms']:8.1f} ms")
+    for error, count in report["errors"].items():
+        log(f"   ✗ {error}: {count}")
+
+
+# =====================================================
+# CLI
+# =====================================================
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadsim",
+                                     description="Simulate election-day voting load.")
+    parser.add_argument("--voters", type=int, default=100, help="Synthetic voters to seed")
+    parser.add_argument("--candidates", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=8, help="Flows in flight at once")
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="Open loop: voter arrivals per second (0 = closed loop)")
+    parser.add_argument("--duration", type=float, default=0.0,
+                        help="Stop admitting new voters after this many seconds (open loop)")
+    parser.add_argument("--target", choices=("client", "server"), default="client",
+                        help="Flask test client or a real local HTTP server")
+    parser.add_argument("--frames", help="Directory of face photos (default: frontend uploads)")
+    parser.add_argument("--reuse-frames", action="store_true",
+                        help="Voters sharing a photo send identical bytes (frame cache hits)")
+    parser.add_argument("--double-vote-rate", type=float, default=0.05,
+                        help="Fraction of voters that submit their vote twice")
+    parser.add_argument("--db-url", help="Scratch database (default: temp SQLite)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="Write the JSON report here (default: stdout)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # App startup output must not end up in the JSON on stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        log("▶ setup")
+        app, voters, candidates = setup(args)
+
+        target = TestClientTarget(app) if args.target == "client" else ServerTarget(app)
+        log(f"▶ {len(voters)} voters, concurrency {args.concurrency}"
+            + (f", {args.rate}/s arrivals" if args.rate else ""))
+        try:
+            recorder, elapsed = drive(target, voters, candidates, args)
+
+            # Every successful vote must be on chain exactly once
+            status, body = target.results()
+            chain_votes = (
+                sum(r["voteCount"] for r in body.get("results", [])) if status == 200 else None
+            )
+        finally:
+            target.close()
+
+    report = build_report(args, recorder, elapsed, chain_votes)
+    print_summary(report)
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+        log(f"✅ report written to {args.out}")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
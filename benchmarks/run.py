@@ -0,0 +1,126 @@
+# benchmarks/run.py
+#
+#   python -m benchmarks                          # all suites → stdout
+#   python -m benchmarks --quick --out bench.json
+#   python -m benchmarks --suites face,db --compare baseline.json
+#
+# --compare exits 1 when any benchmark's median is slower than the
+# baseline's by more than --max-regression (default 25%). A failed
+# in-suite check (e.g. ivf slower than the exact scan) also exits 1.
+
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import sys
+
+from .common import environment, log, result_key
+
+SUITES = ("face", "db", "chain")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark the face, database and blockchain hot paths."
+    )
+    parser.add_argument("--suites", default=",".join(SUITES),
+                        help="Comma-separated subset of: " + ", ".join(SUITES))
+    parser.add_argument("--out", help="Write the JSON results here (default: stdout)")
+    parser.add_argument("--repeat", type=int, default=10, help="Base sample count per benchmark")
+    parser.add_argument("--quick", action="store_true",
+                        help="Small sizes and few samples (smoke test)")
+
+    parser.add_argument("--image", help="Face photo for the encode benchmarks")
+    parser.add_argument("--max-encodings", type=int, default=1_000_000,
+                        help="Largest synthetic index for the duplicate search")
+
+    parser.add_argument("--voters", default="10000,100000",
+                        help="Comma-separated voter table sizes for the db suite")
+    parser.add_argument("--db-url", help="Scratch database for the db suite (default: temp SQLite)")
+
+    parser.add_argument("--concurrency", default="1,8,32",
+                        help="Concurrent voters for batched chain votes")
+
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="Allowed median slowdown vs the baseline (0.25 = 25%%)")
+
+    args = parser.parse_args(argv)
+    args.suites = [s.strip() for s in args.suites.split(",") if s.strip()]
+    args.voters = [int(v) for v in args.voters.split(",")]
+    args.concurrency = [int(c) for c in args.concurrency.split(",")]
+
+    if args.quick:
+        args.repeat = min(args.repeat, 3)
+        args.max_encodings = min(args.max_encodings, 10_000)
+        args.voters = [min(v, 2_000) for v in args.voters[:1]]
+        args.concurrency = args.concurrency[:2]
+
+    unknown = set(args.suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(sorted(unknown))}")
+    return args
+
+
+def compare(results, baseline, max_regression):
+    """
+    Returns the rows slower than the baseline beyond max_regression.
+    """
+    previous = {result_key(r): r for r in baseline["results"]}
+    regressions = []
+
+    for result in results:
+        old = previous.get(result_key(result))
+        if old is None or not old["median"]:
+            continue
+
+        ratio = result["median"] / old["median"]
+        marker = ""
+        if ratio > 1 + max_regression:
+            regressions.append({"benchmark": result_key(result), "baseline_ms": old["median"],
+                                "median_ms": result["median"], "ratio": ratio})
+            marker = "  ← REGRESSION"
+        log(f"{result_key(result):<70} {old['median']:10.3f} → {result['median']:10.3f} ms"
+            f"  ×{ratio:.2f}{marker}")
+
+    return regressions
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Keep the app quiet and local: no indexer thread, no live RPC node
+    os.environ.setdefault("INDEXER_ENABLED", "0")
+    os.environ.setdefault("FACE_WORKERS", "1")
+
+    results = []
+    # App startup output must not end up in the JSON on stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        for suite in args.suites:
+            log(f"▶ {suite}")
+            module = importlib.import_module(f"benchmarks.bench_{suite}")
+            results.extend(module.run(args))
+
+    report = {"meta": {**environment(), "args": sys.argv[1:]}, "results": results}
+
+    failures = [{"benchmark": result_key(r), "reason": r["failed"]} for r in results if r.get("failed")]
+    if failures:
+        report["failures"] = failures
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        report["regressions"] = regressions
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+        log(f"✅ {len(results)} results written to {args.out}")
+    else:
+        print(output)
+
+    return 1 if regressions or failures else 0
@@ -99,6 +99,44 @@ contract ManagedElection {
         emit VoteCast(_voterHash, _candidateId);
     }
 
+    // =====================================================
+    // 🗳️ BATCH VOTE (MANY VOTERS, ONE TRANSACTION)
+    // =====================================================
+    // Already-voted / invalid entries are SKIPPED (no VoteCast event)
+    // instead of reverting the whole batch.
+    function voteBatch(
+        bytes32[] calldata _voterHashes,
+        uint256[] calldata _candidateIds
+    )
+        external
+        returns (uint256 recorded)
+    {
+        require(_voterHashes.length == _candidateIds.length, "Length mismatch");
+
+        for (uint256 i = 0; i < _voterHashes.length; i++) {
+            bytes32 voterHash = _voterHashes[i];
+            uint256 candidateId = _candidateIds[i];
+
+            if (
+                voterHash == bytes32(0) ||
+                hasVoted[voterHash] ||
+                candidateId == 0 ||
+                candidateId > candidateCount ||
+                !candidates[candidateId].isActive
+            ) {
+                continue;
+            }
+
+            hasVoted[voterHash] = true;
+            candidates[candidateId].voteCount += 1;
+            recorded++;
+
+            emit VoteCast(voterHash, candidateId);
+        }
+
+        totalVotes += recorded;
+    }
+
     // =====================================================
     // 📊 GET CANDIDATE DETAILS
     // =====================================================
@@ -121,6 +159,33 @@ contract ManagedElection {
         return (c.id, c.name, c.voteCount, c.isActive);
     }
 
+    // =====================================================
+    // 📋 GET ALL CANDIDATES (RESULTS IN ONE CALL)
+    // =====================================================
+    function getAllCandidates()
+        external
+        view
+        returns (
+            uint256[] memory ids,
+            string[] memory names,
+            uint256[] memory voteCounts,
+            bool[] memory active
+        )
+    {
+        ids = new uint256[](candidateCount);
+        names = new string[](candidateCount);
+        voteCounts = new uint256[](candidateCount);
+        active = new bool[](candidateCount);
+
+        for (uint256 i = 0; i < candidateCount; i++) {
+            Candidate storage c = candidates[i + 1];
+            ids[i] = c.id;
+            names[i] = c.name;
+            voteCounts[i] = c.voteCount;
+            active[i] = c.isActive;
+        }
+    }
+
     // =====================================================
     // 📈 GET VOTES ONLY
     // =====================================================
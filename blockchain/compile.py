@@ -0,0 +1,76 @@
+# blockchain/compile.py
+#
+# Rebuilds backend/contract/ManagedElection.json (ABI + bytecode, always
+# together) from ManagedElection.sol with a pinned solc.
+#
+#   pip install py-solc-x
+#   python blockchain/compile.py            # rewrite the artifact
+#   python blockchain/compile.py --check    # exit 1 if it is stale
+#
+# Standard-JSON input with a relative source name keeps the output (and
+# the metadata hash in the bytecode) independent of the checkout path.
+
+import argparse
+import json
+import os
+import sys
+
+SOLC_VERSION = "0.8.19"
+OPTIMIZER_RUNS = 200
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SOURCE = os.path.join(HERE, "ManagedElection.sol")
+ARTIFACT = os.path.join(HERE, "..", "backend", "contract", "ManagedElection.json")
+
+
+def compile_contract():
+    import solcx
+
+    if SOLC_VERSION not in {str(v) for v in solcx.get_installed_solc_versions()}:
+        solcx.install_solc(SOLC_VERSION)
+
+    with open(SOURCE) as f:
+        source = f.read()
+
+    output = solcx.compile_standard({
+        "language": "Solidity",
+        "sources": {"ManagedElection.sol": {"content": source}},
+        "settings": {
+            "optimizer": {"enabled": True, "runs": OPTIMIZER_RUNS},
+            "outputSelection": {"*": {"ManagedElection": ["abi", "evm.bytecode.object"]}},
+        },
+    }, solc_version=SOLC_VERSION)
+
+    contract = output["contracts"]["ManagedElection.sol"]["ManagedElection"]
+    return {
+        "abi": contract["abi"],
+        "bytecode": contract["evm"]["bytecode"]["object"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile ManagedElection.sol into the backend artifact.")
+    parser.add_argument("--check", action="store_true",
+                        help="Do not write; exit 1 if the committed artifact differs")
+    args = parser.parse_args(argv)
+
+    artifact = compile_contract()
+
+    if args.check:
+        with open(ARTIFACT) as f:
+            current = json.load(f)
+        if current != artifact:
+            print("❌ ManagedElection.json is stale: run python blockchain/compile.py")
+            return 1
+        print("✅ ManagedElection.json matches ManagedElection.sol")
+        return 0
+
+    with open(ARTIFACT, "w") as f:
+        json.dump(artifact, f, indent=2)
+        f.write("\n")
+    print(f"✅ Wrote {os.path.normpath(ARTIFACT)} (solc {SOLC_VERSION})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
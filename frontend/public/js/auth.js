@@ -38,7 +38,7 @@ function stopCamera() {
     }
 }
 
-/* ---------- CAPTURE FRAME ---------- */
+/* ---------- CAPTURE FRAME (RAW JPEG BLOB) ---------- */
 function captureFrame() {
     const canvas = document.createElement("canvas");
     canvas.width = video.videoWidth;
@@ -47,7 +47,7 @@ function captureFrame() {
     const ctx = canvas.getContext("2d");
     ctx.drawImage(video, 0, 0);
 
-    return canvas.toDataURL("image/jpeg", 0.9);
+    return new Promise(resolve => canvas.toBlob(resolve, "image/jpeg", 0.9));
 }
 
 /* ---------- AUTH BUTTON ---------- */
@@ -73,27 +73,48 @@ authBtn.addEventListener("click", async () => {
 
         msg.innerText = "🔍 Capturing face...";
 
-        const frames = [];
-        for (let i = 0; i < 5; i++) {
-            frames.push(captureFrame());
-            await new Promise(r => setTimeout(r, 300));
-        }
+        // ⚡ STREAMING: each frame is verified while the next is captured
+        const startRes = await fetch(`${API_BASE}/voter/authenticate/start`, {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ username, enrollment })
+        });
+        const session = await startRes.json();
 
-        stopCamera();
+        if (!startRes.ok || !session.success) {
+            stopCamera();
+            msg.style.color = "red";
+            msg.innerText = session.error || "Face verification failed";
+            return;
+        }
 
         msg.innerText = "🔐 Verifying face...";
 
-        const res = await fetch(`${API_BASE}/voter/authenticate`, {
-            method: "POST",
-            headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({
-                username,
-                enrollment,
-                frames
-            })
-        });
+        let data = { success: false, error: "Face verification failed" };
+        let res = null;
+        let frame = await captureFrame();
+
+        for (let i = 0; i < session.max_frames; i++) {
+            const pending = fetch(`${API_BASE}/voter/authenticate/frame`, {
+                method: "POST",
+                headers: {
+                    "Content-Type": "image/jpeg",
+                    "X-Auth-Token": session.token
+                },
+                body: frame
+            });
+
+            // capture the next frame while the server encodes this one
+            const next = new Promise(r => setTimeout(r, 150)).then(captureFrame);
 
-        const data = await res.json();
+            res = await pending;
+            data = await res.json();
+            if (data.success || !res.ok) break;
+
+            frame = await next;
+        }
+
+        stopCamera();
 
         if (res.ok && data.success) {
             msg.style.color = "#00ff9d";
@@ -8,6 +8,10 @@ const statusBox = document.getElementById("status");
 
 const voterList = document.getElementById("voterList");
 const voterTable = document.getElementById("voterTable");
+const loadMoreBtn = document.getElementById("loadMoreVotersBtn");
+
+const VOTER_PAGE_SIZE = 100;
+let nextAfter = 0;
 
 let frames = [];
 let stream = null;
@@ -76,7 +80,7 @@ async function captureFrames(count = 30, delayMs = 120) {
 
   for (let i = 0; i < count; i++) {
     ctx.drawImage(video, 0, 0, off.width, off.height);
-    frames.push(off.toDataURL("image/jpeg", 0.8));
+    frames.push(await new Promise(r => off.toBlob(r, "image/jpeg", 0.8)));
     await new Promise(r => setTimeout(r, delayMs));
   }
 }
@@ -107,10 +111,15 @@ registerBtn.onclick = async () => {
   try {
     await captureFrames();
 
+    // multipart: one binary JPEG part per frame (no base64)
+    const form = new FormData();
+    form.append("name", name);
+    form.append("enrollment", enrollment);
+    frames.forEach((blob, i) => form.append("frames", blob, `frame${i}.jpg`));
+
     const res = await fetch("/admin/register_voter_faces", {
       method: "POST",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ name, enrollment, frames })
+      body: form
     });
 
     const data = await res.json();
@@ -133,41 +142,54 @@ registerBtn.onclick = async () => {
 
 /* ================= LOAD VOTERS ================= */
 
+function voterRow(v) {
+  return `
+    <tr>
+      <td>${v.name}</td>
+      <td>${v.enrollment}</td>
+      <td>${v.has_voted ? "Voted" : "Not Voted"}</td>
+      <td>
+        ${
+          v.has_voted
+            ? "—"
+            : `<button class="danger" onclick="deleteVoter(${v.id})">
+                 Delete
+               </button>`
+        }
+      </td>
+    </tr>
+  `;
+}
+
+async function loadVoterPage() {
+  const res = await fetch(
+    `/admin/get_voters?after=${nextAfter}&limit=${VOTER_PAGE_SIZE}`
+  );
+  const data = await res.json();
+
+  voterTable.insertAdjacentHTML(
+    "beforeend",
+    (data.voters || []).map(voterRow).join("")
+  );
+
+  nextAfter = data.next_after;
+  loadMoreBtn.style.display = nextAfter ? "inline-block" : "none";
+}
+
 async function loadVoters() {
   voterList.style.display = "block";
   voterTable.innerHTML =
     "<tr><td colspan='4'>Loading voters...</td></tr>";
 
   try {
-    const res = await fetch("/admin/get_voters");
-    const data = await res.json();
-
+    nextAfter = 0;
     voterTable.innerHTML = "";
+    await loadVoterPage();
 
-    if (!data.voters || data.voters.length === 0) {
+    if (!voterTable.children.length) {
       voterTable.innerHTML =
         "<tr><td colspan='4'>No voters found</td></tr>";
-      return;
     }
-
-    data.voters.forEach(v => {
-      voterTable.innerHTML += `
-        <tr>
-          <td>${v.name}</td>
-          <td>${v.enrollment}</td>
-          <td>${v.has_voted ? "Voted" : "Not Voted"}</td>
-          <td>
-            ${
-              v.has_voted
-                ? "—"
-                : `<button class="danger" onclick="deleteVoter(${v.id})">
-                     Delete
-                   </button>`
-            }
-          </td>
-        </tr>
-      `;
-    });
   } catch (err) {
     console.error(err);
     voterTable.innerHTML =
@@ -175,6 +197,19 @@ async function loadVoters() {
   }
 }
 
+if (loadMoreBtn) {
+  loadMoreBtn.onclick = async () => {
+    loadMoreBtn.disabled = true;
+    try {
+      await loadVoterPage();
+    } catch (err) {
+      console.error(err);
+    } finally {
+      loadMoreBtn.disabled = false;
+    }
+  };
+}
+
 if (showBtn) {
   showBtn.onclick = loadVoters;
 }
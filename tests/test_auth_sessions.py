@@ -0,0 +1,65 @@
+# tests/test_auth_sessions.py
+
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+
+from backend.database import db
+from backend.models import AuthStreamSession
+from backend.services.user_service import UserService
+
+
+@pytest.fixture
+def service():
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield UserService()
+        db.session.remove()
+
+
+def test_frames_are_capped_per_session(service):
+    session = service.start_auth_session(voter_id=1, ttl=30)
+
+    claimed = [service.claim_auth_frame(session.id, 1, max_frames=3) for _ in range(5)]
+
+    assert [c is not None for c in claimed] == [True, True, True, False, False]
+
+
+def test_session_is_bound_to_its_voter(service):
+    session = service.start_auth_session(voter_id=1, ttl=30)
+
+    assert service.claim_auth_frame(session.id, 2, max_frames=3) is None
+    assert service.claim_auth_frame(None, 1, max_frames=3) is None
+
+
+def test_match_closes_the_session(service):
+    session = service.start_auth_session(voter_id=1, ttl=30)
+
+    service.finish_auth_frame(service.claim_auth_frame(session.id, 1, 10), matched=True)
+
+    assert service.claim_auth_frame(session.id, 1, 10) is None
+
+
+def test_box_is_kept_for_the_next_frame(service):
+    session = service.start_auth_session(voter_id=1, ttl=30)
+
+    service.finish_auth_frame(service.claim_auth_frame(session.id, 1, 10), False, (10, 90, 80, 20))
+    assert service.claim_auth_frame(session.id, 1, 10).box == "10,90,80,20"
+
+    service.finish_auth_frame(service.claim_auth_frame(session.id, 1, 10), False, None)
+    assert service.claim_auth_frame(session.id, 1, 10).box is None
+
+
+def test_expired_sessions_are_dropped_on_start(service):
+    old = service.start_auth_session(voter_id=1, ttl=30)
+    old.created_at = datetime.utcnow() - timedelta(seconds=60)
+    db.session.commit()
+    old_id = old.id
+
+    service.start_auth_session(voter_id=2, ttl=30)
+
+    assert db.session.get(AuthStreamSession, old_id) is None
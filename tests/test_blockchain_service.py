@@ -0,0 +1,105 @@
+# tests/test_blockchain_service.py
+#
+# BlockchainService against the committed ManagedElection.json on an
+# in-process chain (eth-tester + py-evm).
+
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("eth_tester")
+
+from backend.services import blockchain_service  # noqa: E402
+from backend.services.blockchain_service import VoteNotRecorded  # noqa: E402
+from benchmarks.bench_chain import local_chain  # noqa: E402
+
+
+def _hash(n):
+    return hashlib.sha256(f"voter-{n}".encode()).hexdigest()
+
+
+@pytest.fixture
+def chain(monkeypatch, tmp_path):
+    # Every test starts a new chain: no nonces carried over
+    monkeypatch.setenv("NONCE_LOCK_DIR", str(tmp_path))
+    monkeypatch.setattr(blockchain_service, "_nonce_managers", {})
+    service, owner, private_key = local_chain()
+    address, _ = service.deploy_contract(owner, private_key)
+    for name in ("Alice", "Bob"):
+        service.add_candidate(address, name, owner, private_key)
+    return service, owner, private_key, address
+
+
+def test_concurrent_votes_share_one_vote_batch(chain):
+    service, owner, private_key, address = chain
+    assert service.supports_function(address, "voteBatch")
+
+    batcher = service.get_vote_batcher(owner, private_key)
+    batcher.window = 0.5
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        tx_hashes = list(pool.map(
+            lambda n: service.submit_vote(_hash(n), 1 + n % 2, address, owner, private_key),
+            range(6)
+        ))
+
+    assert len(set(tx_hashes)) == 1
+    contract = service.load_contract(address)
+    assert contract.functions.totalVotes().call() == 6
+    assert [contract.functions.getVotes(i).call() for i in (1, 2)] == [3, 3]
+
+
+def test_skipped_batch_entries_raise_vote_not_recorded(chain):
+    service, owner, private_key, address = chain
+    service.submit_vote(_hash(1), 1, address, owner, private_key)
+
+    with pytest.raises(VoteNotRecorded) as already:
+        service.submit_vote(_hash(1), 2, address, owner, private_key)
+
+    assert already.value.already_voted
+    assert service.load_contract(address).functions.totalVotes().call() == 1
+
+
+@pytest.mark.parametrize("candidate_id", [9, 2])
+def test_rejected_candidate_is_not_reported_as_voted(chain, candidate_id):
+    service, owner, private_key, address = chain
+    service.deactivate_candidate(address, owner, private_key, 2)
+
+    with pytest.raises(VoteNotRecorded) as rejected:
+        service.submit_vote(_hash(1), candidate_id, address, owner, private_key)
+
+    assert not rejected.value.already_voted
+    assert not service.load_contract(address).functions.hasVoted(
+        bytes.fromhex(_hash(1))
+    ).call()
+
+
+def test_repeated_hash_in_one_batch(chain):
+    service, owner, private_key, address = chain
+    batcher = service.get_vote_batcher(owner, private_key)
+    batcher.window = 0.5
+
+    first = batcher.submit(_hash(1), 1, address)
+    second = batcher.submit(_hash(1), 2, address)
+
+    assert first.result(timeout=10)
+    with pytest.raises(VoteNotRecorded) as repeat:
+        second.result(timeout=10)
+    assert repeat.value.already_voted
+
+
+def test_results_come_from_one_get_all_candidates_call(chain, monkeypatch):
+    service, owner, private_key, address = chain
+    service.vote(_hash(1), 2, address, owner, private_key, wait=True)
+    service.deactivate_candidate(address, owner, private_key, 1)
+
+    def per_candidate_fallback(*args):
+        raise AssertionError("candidates(i) fallback used")
+
+    monkeypatch.setattr(service, "_call_candidates_batched", per_candidate_fallback)
+
+    assert service.supports_function(address, "getAllCandidates")
+    assert service.get_results(address) == [
+        {"candidate_id": 1, "name": "Alice", "voteCount": 0, "isActive": False},
+        {"candidate_id": 2, "name": "Bob", "voteCount": 1, "isActive": True},
+    ]
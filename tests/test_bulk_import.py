@@ -0,0 +1,96 @@
+# tests/test_bulk_import.py
+
+import io
+import os
+import zipfile
+
+import cv2
+import pytest
+from flask import Flask
+from werkzeug.datastructures import FileStorage
+
+from backend.database import db
+from backend.models import ImportJob, Voter
+from backend.services import bulk_import_service, face_service
+from backend.services.bulk_import_service import ImportJobQueue
+from backend.services.face_service import FramePipeline
+
+PHOTO = os.path.join(os.path.dirname(__file__), "..", "frontend", "public", "uploads", "ankitchaurasiya.jpg")
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # Encode on the calling thread: no process pool in tests
+    monkeypatch.setattr(face_service.frame_encoder, "workers", 1)
+    # The service holds its own face_index binding
+    monkeypatch.setattr(bulk_import_service, "face_index", face_service.FaceIndex())
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'import.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+def _uploads(photo):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("E100.jpg", photo)
+    archive.seek(0)
+
+    csv_file = io.BytesIO(b"name,enrollment\nAnkit,E100\nNo Photo,E101\n")
+    return FileStorage(csv_file, "voters.csv"), FileStorage(archive, "photos.zip")
+
+
+def _blurred_photo():
+    img = cv2.GaussianBlur(cv2.imread(PHOTO), (9, 9), 0)
+    return cv2.imencode(".jpg", img)[1].tobytes()
+
+
+def test_import_runs_as_a_job(app, tmp_path):
+    queue = ImportJobQueue(job_dir=str(tmp_path / "jobs"))
+    with open(PHOTO, "rb") as fh:
+        job = queue.submit(app, *_uploads(fh.read()))
+    assert job.status == "queued"
+
+    queue._executor.shutdown(wait=True)
+    db.session.expire_all()
+    job = queue.get(job.id)
+
+    assert job.status == "done", job.error
+    assert job.summary["imported"] == 1
+    assert job.summary["skipped"] == {"missing_image": 1}
+    assert Voter.query.filter_by(enrollment="E100").count() == 1
+    # Duplicate checks ran against the test's index, not the process one
+    assert len(bulk_import_service.face_index) == 1
+    assert os.path.exists(queue.report_path(job.id))
+    assert not os.path.exists(queue.path(job.id, "photos.zip"))
+
+
+def test_job_of_an_exited_worker_is_failed(app, tmp_path):
+    queue = ImportJobQueue(job_dir=str(tmp_path / "jobs"))
+    db.session.add(ImportJob(id="a" * 32, status="running", worker_pid=2 ** 22 + 1))
+    db.session.commit()
+
+    job = queue.get("a" * 32)
+
+    assert job.status == "failed"
+    assert job.finished_at is not None
+
+
+def test_enrollment_photos_use_import_gates(app, tmp_path):
+    photo = _blurred_photo()
+
+    # The webcam blur gate rejects a soft but usable high-res portrait
+    webcam = FramePipeline(reduced=False, min_blur=25)
+    assert webcam.process_frame(photo) is None
+    assert webcam.report[0]["reason"] == "blurry"
+
+    queue = ImportJobQueue(job_dir=str(tmp_path / "jobs"))
+    job = queue.submit(app, *_uploads(photo))
+    queue._executor.shutdown(wait=True)
+    db.session.expire_all()
+
+    assert queue.get(job.id).summary["imported"] == 1
@@ -0,0 +1,43 @@
+# tests/test_contract_artifact.py
+
+import json
+import os
+
+import pytest
+from web3 import Web3
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARTIFACT = os.path.join(ROOT, "backend", "contract", "ManagedElection.json")
+
+
+def _artifact():
+    with open(ARTIFACT) as f:
+        return json.load(f)
+
+
+def _signature(fn):
+    return "{}({})".format(fn["name"], ",".join(i["type"] for i in fn["inputs"]))
+
+
+def test_every_abi_function_is_dispatched_by_the_bytecode():
+    # A hand-edited ABI over stale bytecode fails here
+    artifact = _artifact()
+    code = bytes.fromhex(artifact["bytecode"].removeprefix("0x"))
+
+    missing = [
+        _signature(fn) for fn in artifact["abi"]
+        if fn["type"] == "function"
+        and (b"\x63" + Web3.keccak(text=_signature(fn))[:4]) not in code
+    ]
+    assert not missing, f"ABI functions without bytecode: {missing}"
+
+
+def test_artifact_matches_the_solidity_source():
+    solcx = pytest.importorskip("solcx")
+    from blockchain.compile import SOLC_VERSION, compile_contract
+
+    if SOLC_VERSION not in {str(v) for v in solcx.get_installed_solc_versions()}:
+        pytest.skip(f"solc {SOLC_VERSION} not installed (python -c 'import solcx; solcx.install_solc(\"{SOLC_VERSION}\")')")
+
+    compiled = compile_contract()
+    assert compiled["abi"] == _artifact()["abi"], "stale artifact: run python blockchain/compile.py"
@@ -0,0 +1,63 @@
+# tests/test_election_cache.py
+
+import pytest
+from flask import Flask
+
+from backend.database import db
+from backend.models import Candidate, Election
+from backend.services.election_service import ElectionService, election_cache
+
+
+@pytest.fixture
+def service():
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.session.add(Election(id=1001, name="E", contract_address="0x" + "a" * 40, is_active=True))
+        db.session.add(Candidate(id=1, name="Alice", election_id=1001, on_chain_id=1))
+        db.session.commit()
+        election_cache.invalidate()
+        yield ElectionService()
+        election_cache.invalidate()
+        db.session.remove()
+
+
+def _behind_the_cache(statement):
+    # A write made by another worker: this process' cache is not told
+    db.session.execute(statement)
+    db.session.commit()
+
+
+def test_vote_target_from_warm_cache(service):
+    election, candidate = service.get_vote_target(1)
+
+    assert election.id == 1001
+    assert candidate.name == "Alice"
+
+
+def test_candidate_deleted_elsewhere_is_rejected(service):
+    service.get_vote_target(1)
+    _behind_the_cache(db.delete(Candidate).where(Candidate.id == 1))
+
+    election, candidate = service.get_vote_target(1)
+
+    assert election.id == 1001
+    assert candidate is None
+
+
+def test_election_replaced_elsewhere_is_not_voted_on(service):
+    service.get_vote_target(1)
+    _behind_the_cache(db.update(Election).values(is_active=False))
+
+    assert service.get_vote_target(1) == (None, None)
+
+
+def test_candidate_added_elsewhere_is_found(service):
+    service.get_vote_target(1)
+    _behind_the_cache(db.insert(Candidate).values(id=2, name="Bob", election_id=1001, on_chain_id=2))
+
+    _, candidate = service.get_vote_target(2)
+
+    assert candidate.name == "Bob"
@@ -0,0 +1,74 @@
+# tests/test_encoding_utils.py
+
+import hashlib
+import json
+
+import numpy as np
+
+from backend.utils.encoding_utils import (
+    ENCODING_BYTES,
+    compute_voter_hash,
+    load_encodings,
+    normalize_voter_hash,
+    pack_encodings,
+    unpack_encodings,
+)
+
+
+def _encodings(k, seed=0):
+    return [np.random.default_rng(seed + i).normal(0, 0.1, 128) for i in range(k)]
+
+
+def test_pack_unpack_round_trip():
+    encodings = _encodings(3)
+
+    blob = pack_encodings(encodings)
+    unpacked = unpack_encodings(blob)
+
+    assert len(blob) == 3 * ENCODING_BYTES
+    assert unpacked.shape == (3, 128)
+    assert unpacked.dtype == np.float32
+    np.testing.assert_allclose(unpacked, np.vstack(encodings), rtol=1e-6, atol=1e-7)
+
+
+def test_unpack_rejects_empty_and_truncated_blobs():
+    blob = pack_encodings(_encodings(1))
+
+    assert unpack_encodings(b"").shape == (0, 128)
+    assert unpack_encodings(None).shape == (0, 128)
+    assert unpack_encodings(blob[:-1]).shape == (0, 128)
+
+
+def test_load_prefers_binary_over_legacy_json():
+    binary, legacy = _encodings(1, seed=1), _encodings(1, seed=2)
+
+    loaded = load_encodings(pack_encodings(binary), json.dumps([e.tolist() for e in legacy]))
+
+    np.testing.assert_allclose(loaded[0], binary[0], rtol=1e-6, atol=1e-7)
+
+
+def test_legacy_json_skips_malformed_entries():
+    good = _encodings(1)[0]
+    raw = json.dumps([good.tolist(), [1.0, 2.0], "junk"])
+
+    loaded = load_encodings(None, raw)
+
+    assert loaded.shape == (1, 128)
+    assert loaded.dtype == np.float64
+    np.testing.assert_array_equal(loaded[0], good)
+
+
+def test_voter_hash_of_legacy_rows_is_unchanged():
+    # Rows registered before face_data hashed the JSON float64 values
+    first = _encodings(1)[0]
+    expected = hashlib.sha256(first.astype(np.float64).tobytes()).hexdigest()
+
+    assert compute_voter_hash(None, json.dumps([first.tolist()])) == expected
+    assert compute_voter_hash(None, None) is None
+
+
+def test_normalize_voter_hash():
+    raw = bytes(range(32))
+
+    assert normalize_voter_hash(raw) == raw.hex()
+    assert normalize_voter_hash("0x" + raw.hex().upper()) == raw.hex()
@@ -0,0 +1,198 @@
+# tests/test_face_index.py
+
+import threading
+
+import numpy as np
+import pytest
+from flask import Flask
+
+from backend.database import db
+from backend.models import Voter
+from backend.services.face_service import FaceIndex
+from backend.utils.encoding_utils import pack_encodings
+
+
+def _clustered(n, clusters=64, seed=0):
+    # Face encodings are not uniform: voters cluster by appearance
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(0, 0.3, (clusters, 128))
+    return (centers[rng.integers(clusters, size=n)] + rng.normal(0, 0.05, (n, 128))).astype(np.float32)
+
+
+def test_exact_nearest_matches_brute_force():
+    rows = _clustered(500)
+    index = FaceIndex(initial_capacity=16)
+    for voter_id, row in enumerate(rows, start=1):
+        index.add(voter_id, [row])
+
+    q = rows[123] + 0.01
+    voter_id, distance = index.nearest(q)
+
+    expected = np.linalg.norm(rows.astype(np.float64) - q, axis=1)
+    assert voter_id == int(np.argmin(expected)) + 1
+    assert distance == pytest.approx(expected.min(), abs=1e-4)
+
+
+def test_remove_drops_every_row_of_the_voter():
+    index = FaceIndex()
+    index.add(1, _clustered(3, seed=1))
+    index.add(2, _clustered(1, seed=2))
+
+    index.remove(1)
+
+    assert len(index) == 1
+    assert index.nearest(_clustered(1, seed=1)[0])[0] == 2
+
+
+def test_ivf_recall_against_exact_scan():
+    index = FaceIndex(initial_capacity=20000, mode="ivf", nprobe=8, ann_min_size=1000)
+    index.add(1, _clustered(20000))
+    assert index.build_ann()
+
+    report = index.recall_report(n_queries=200, seed=1)
+
+    assert report["recall_at_1"] >= 0.95
+
+
+def test_ann_rebuild_runs_off_the_request_thread():
+    index = FaceIndex(mode="ivf", ann_min_size=2000)
+    index.add(1, _clustered(2000))
+
+    # Answered by the exact scan while the partition trains
+    build_started = threading.Event()
+    release = threading.Event()
+    build_ann = index.build_ann
+
+    def slow_build():
+        build_started.set()
+        release.wait(5)
+        return build_ann()
+
+    index.build_ann = slow_build
+    voter_id, _ = index.nearest(_clustered(1)[0])
+
+    assert voter_id == 1
+    assert build_started.wait(5)
+    assert index._ivf is None
+
+    release.set()
+    index._build_thread.join(5)
+    assert index._ivf is not None
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'voters.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+def test_concurrent_refresh_loads_each_voter_once(app):
+    index = FaceIndex()
+    index.load_from_db()
+
+    for i, row in enumerate(_clustered(200)):
+        db.session.add(Voter(name=f"v{i}", enrollment=f"E{i}", face_data=pack_encodings([row])))
+    db.session.commit()
+
+    def refresh():
+        with app.app_context():
+            index.refresh(batch_size=10)
+
+    threads = [threading.Thread(target=refresh) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(index) == 200
+
+
+def test_add_after_refresh_does_not_duplicate(app):
+    index = FaceIndex()
+    index.load_from_db()
+
+    voter = Voter(name="a", enrollment="A1", face_data=pack_encodings(_clustered(1)))
+    db.session.add(voter)
+    db.session.commit()
+
+    # Another request's refresh sees the committed row first
+    index.refresh()
+    index.add(voter.id, _clustered(1))
+
+    assert len(index) == 1
+
+
+def test_ivf_lists_are_balanced():
+    index = FaceIndex(initial_capacity=20000, mode="ivf", ann_min_size=1000)
+    index.add(1, _clustered(20000))
+    assert index.build_ann()
+
+    sizes = np.array([len(rows) for rows in index._ivf.lists])
+
+    # A probe scans whole lists: no giant list, no wasted centroid
+    assert sizes.min() > 0
+    assert sizes.max() <= 3 * sizes.mean()
+
+
+def test_approx_reranks_to_the_exact_distance():
+    rows = _clustered(5000)
+    index = FaceIndex(initial_capacity=5000, mode="ivf", ann_min_size=1000)
+    index.add(1, rows)
+    assert index.build_ann()
+
+    q = rows[42] + 0.01
+    _, distance = index.nearest_approx(q)
+
+    assert distance == pytest.approx(np.linalg.norm(rows[42].astype(np.float64) - q), abs=1e-6)
+
+
+def _commit_voter(voter_id, encoding):
+    db.session.add(Voter(id=voter_id, name=f"v{voter_id}", enrollment=f"E{voter_id}",
+                         face_data=pack_encodings([encoding])))
+    db.session.commit()
+
+
+def test_refresh_loads_ids_committed_out_of_order(app):
+    rows = _clustered(3, seed=3)
+    index = FaceIndex()
+    index.load_from_db()
+
+    # Voter 12 commits first; 11 was allocated earlier but commits later
+    _commit_voter(12, rows[0])
+    index.refresh()
+    _commit_voter(11, rows[1])
+    index.refresh()
+
+    assert len(index) == 2
+    assert index.nearest(rows[1])[0] == 11
+
+
+def test_add_does_not_skip_rows_committed_by_other_workers(app):
+    rows = _clustered(3, seed=4)
+    index = FaceIndex()
+    index.load_from_db()
+
+    _commit_voter(5, rows[0])           # another worker's registration
+    _commit_voter(6, rows[1])
+    index.add(6, [rows[1]])             # our own, added without a refresh
+
+    index.refresh()
+
+    assert len(index) == 2
+    assert index.nearest(rows[0])[0] == 5
+
+
+def test_gaps_expire(app):
+    index = FaceIndex(gap_ttl=0)
+    index.load_from_db()
+    _commit_voter(3, _clustered(1)[0])
+
+    index.refresh()     # ids 1 and 2 never commit (rolled back)
+    index.refresh()
+
+    assert index._gaps == {}
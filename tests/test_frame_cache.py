@@ -0,0 +1,100 @@
+# tests/test_frame_cache.py
+
+import base64
+import time
+
+import numpy as np
+
+from backend.services.face_service import FrameCache
+
+
+JPEG = b"\xff\xd8\xff\xe0not-really-a-jpeg"
+
+
+def _entry(reason=None, frame=0):
+    return {"frame": frame, "reason": reason, "decode_ms": 3.0,
+            "detect_ms": 5.0, "encode_ms": 40.0, "tracked": True}
+
+
+def test_hit_after_put_resets_timings():
+    cache = FrameCache(ttl=60, max_bytes=1 << 20)
+    key = cache.key(JPEG)
+    cache.put(key, np.ones(128), _entry())
+
+    encoding, entry = cache.get(key)
+    assert np.array_equal(encoding, np.ones(128))
+    assert entry["encode_ms"] == 0.0 and entry["tracked"] is False
+    assert cache.stats()["hits"] == 1
+
+
+def test_base64_data_url_and_raw_bytes_share_a_key():
+    b64 = base64.b64encode(JPEG).decode()
+    assert FrameCache.key(JPEG) == FrameCache.key(b64)
+    assert FrameCache.key(JPEG) == FrameCache.key("data:image/jpeg;base64," + b64)
+
+
+def test_entries_expire_after_ttl():
+    cache = FrameCache(ttl=0.05, max_bytes=1 << 20)
+    key = cache.key(JPEG)
+    cache.put(key, None, _entry("no_face"))
+    time.sleep(0.1)
+
+    assert cache.get(key) is None
+    stats = cache.stats()
+    assert stats["expirations"] == 1 and stats["entries"] == 0 and stats["bytes"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    per_entry = FrameCache.ENTRY_OVERHEAD + np.ones(128).nbytes
+    cache = FrameCache(ttl=60, max_bytes=2 * per_entry)
+    a, b, c = (cache.key(bytes([i]) * 8) for i in range(3))
+
+    cache.put(a, np.ones(128), _entry())
+    cache.put(b, np.ones(128), _entry())
+    cache.get(a)                        # b is now least recently used
+    cache.put(c, np.ones(128), _entry())
+
+    assert cache.get(b) is None
+    assert cache.get(a) is not None and cache.get(c) is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 2 * per_entry
+
+
+def test_cheap_rejections_and_timeouts_are_not_stored():
+    cache = FrameCache(ttl=60, max_bytes=1 << 20)
+    for i, reason in enumerate(("blurry", "too_dark", "decode_failed", "timeout")):
+        cache.put(cache.key(bytes([i])), None, _entry(reason))
+
+    assert cache.stats()["entries"] == 0
+
+
+def test_zero_budget_disables_the_cache():
+    cache = FrameCache(ttl=60, max_bytes=0)
+    keys, hits, misses, repeats = cache.lookup([JPEG, JPEG])
+
+    assert keys == [None, None]
+    assert hits == {} and misses == [0, 1] and repeats == {}
+    cache.store(keys, misses, [(None, _entry("no_face", 0)), (None, _entry("no_face", 1))])
+    assert cache.stats()["entries"] == 0
+
+
+def test_lookup_collapses_repeats_and_store_renumbers():
+    cache = FrameCache(ttl=60, max_bytes=1 << 20)
+    other = b"\xff\xd8other"
+    cache.put(cache.key(other), None, _entry("face_too_small"))
+
+    frames = [JPEG, other, JPEG, b"\xff\xd8third"]
+    keys, hits, misses, repeats = cache.lookup(frames)
+
+    assert list(hits) == [1]
+    assert hits[1][1]["frame"] == 1 and hits[1][1]["cached"] is True
+    assert misses == [0, 3]
+    assert repeats == {2: 0}
+
+    # The pipeline ran over [frames[0], frames[3]] only
+    results = [(np.ones(128), _entry(None, 0)), (None, _entry("no_face", 1))]
+    cache.store(keys, misses, results)
+
+    assert [entry["frame"] for _, entry in results] == [0, 3]
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[3])[1]["reason"] == "no_face"
@@ -0,0 +1,102 @@
+# tests/test_frame_encoder.py
+
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from backend.services import face_service
+from backend.services.face_service import (
+    FrameCache, FrameEncoder, FramePipeline, _largest, frames_timed_out,
+)
+
+
+def _stuck_chunk(frames, offset=0, box=None):
+    # Runs in the pool (fork start method inherits the patch)
+    time.sleep(2)
+    return []
+
+
+@pytest.fixture
+def stuck_encoder(monkeypatch):
+    monkeypatch.setattr(face_service, "_encode_chunk_worker", _stuck_chunk)
+    encoder = FrameEncoder(workers=2, start_method="fork", timeout=0.2,
+                           match_chunk=1, cache=FrameCache())
+    yield encoder
+    encoder.shutdown()
+
+
+def _warm_marker():
+    return getattr(face_service, "_warm_marker", None)
+
+
+def test_pool_processes_inherit_state_warmed_before_start(monkeypatch):
+    monkeypatch.delenv("FACE_POOL_START_METHOD", raising=False)
+    # Stands in for the dlib models loaded by serving.warm_up()
+    monkeypatch.setattr(face_service, "_warm_marker", "warmed", raising=False)
+    encoder = FrameEncoder(workers=2, cache=FrameCache())
+    try:
+        pool = encoder.start()
+        assert encoder.start_method == "fork"
+        assert pool.submit(_warm_marker).result(timeout=10) == "warmed"
+    finally:
+        encoder.shutdown()
+
+
+def test_first_match_reports_timeout_instead_of_raising(stuck_encoder):
+    frames = [b"frame-1", b"frame-2", b"frame-3"]
+
+    matched, report = stuck_encoder.first_match(frames, np.zeros((1, 128)), 0.45)
+
+    assert not matched
+    assert sorted(entry["frame"] for entry in report) == [0, 1, 2]
+    assert frames_timed_out(report)
+
+
+def test_encode_all_reports_timeout_and_does_not_cache_it(stuck_encoder):
+    frames = [b"frame-1", b"frame-2", b"frame-3"]
+
+    encodings, report = stuck_encoder.encode_all(frames)
+
+    assert encodings == []
+    assert [entry["reason"] for entry in report] == ["timeout"] * 3
+    assert stuck_encoder.cache.stats()["entries"] == 0
+
+
+def test_largest_face_wins():
+    # (top, right, bottom, left)
+    bystander = (10, 60, 60, 10)
+    voter = (100, 400, 400, 100)
+
+    assert _largest([bystander, voter]) == voter
+
+
+def test_failed_frame_report_only_in_debug(monkeypatch):
+    report = [{"frame": 0, "status": "skipped", "reason": "too_dark", "box": None,
+               "tracked": False, "cached": False, "detect_ms": 0.0}]
+
+    monkeypatch.delenv("FACE_DEBUG_REPORTS", raising=False)
+    assert face_service.failed_frame_report(report) == {}
+
+    monkeypatch.setenv("FACE_DEBUG_REPORTS", "1")
+    assert face_service.failed_frame_report(report)["frame_report"]["skipped"] == {"too_dark": 1}
+
+
+@pytest.mark.parametrize("detect_width, searched_width, expected", [
+    (None, 640, (10, 110, 110, 10)),
+    (320, 320, (20, 220, 220, 20)),     # box scaled back to the full frame
+])
+def test_detection_is_full_resolution_unless_opted_in(monkeypatch, detect_width, searched_width, expected):
+    monkeypatch.delenv("FACE_DETECT_WIDTH", raising=False)
+    searched = []
+
+    def face_locations(img, model):
+        searched.append(img.shape[1])
+        return [(10, 110, 110, 10)]
+
+    monkeypatch.setattr(face_service, "face_recognition", SimpleNamespace(face_locations=face_locations))
+    box = FramePipeline(detect_width=detect_width)._detect_full(np.zeros((480, 640, 3), np.uint8))
+
+    assert searched == [searched_width]
+    assert box == expected
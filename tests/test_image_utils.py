@@ -0,0 +1,56 @@
+# tests/test_image_utils.py
+
+import io
+
+import pytest
+from flask import Flask, request
+from werkzeug.exceptions import UnsupportedMediaType
+
+from backend.utils.image_utils import read_frame_request
+
+app = Flask(__name__)
+
+
+def _read(**kwargs):
+    allow_raw = kwargs.pop("allow_raw", True)
+    with app.test_request_context("/", method="POST", **kwargs):
+        return read_frame_request(request, allow_raw=allow_raw)
+
+
+def test_multipart_fields_and_frames():
+    data, frames = _read(data={
+        "username": "a",
+        "frames": [(io.BytesIO(b"jpeg-1"), "f1.jpg"), (io.BytesIO(b"jpeg-2"), "f2.jpg")],
+    }, content_type="multipart/form-data")
+
+    assert data["username"] == "a"
+    assert frames == [b"jpeg-1", b"jpeg-2"]
+
+
+def test_raw_body_is_one_frame():
+    data, frames = _read(query_string={"enrollment": "E1"}, data=b"jpeg", content_type="image/jpeg")
+
+    assert data["enrollment"] == "E1"
+    assert frames == [b"jpeg"]
+
+
+def test_raw_body_rejected_where_credentials_are_expected():
+    with pytest.raises(UnsupportedMediaType):
+        _read(query_string={"password": "secret"}, data=b"jpeg",
+              content_type="image/jpeg", allow_raw=False)
+
+
+def test_json_without_content_type_is_still_read():
+    data, frames = _read(data='{"username": "a", "frames": ["data:image/jpeg;base64,AA=="]}',
+                         content_type="text/plain")
+
+    assert data["username"] == "a"
+    assert frames == ["data:image/jpeg;base64,AA=="]
+
+
+@pytest.mark.parametrize("body", ["[1, 2]", "not json", '{"frames": "x"}'])
+def test_malformed_json_reads_as_empty(body):
+    data, frames = _read(data=body, content_type="application/json")
+
+    assert frames == []
+    assert isinstance(data, dict)
@@ -0,0 +1,74 @@
+# tests/test_metrics.py
+
+import json
+
+from backend.utils.metrics import Registry, merge_families
+
+
+def _registry():
+    registry = Registry()
+    votes = registry.counter("votes_total", "Votes.", ["outcome"])
+    latency = registry.histogram("latency_seconds", "Latency.", ["stage"], buckets=(0.1, 1.0))
+    in_flight = registry.gauge("in_flight", "In flight.")
+    return registry, votes, latency, in_flight
+
+
+def test_render_counter_and_histogram():
+    registry, votes, latency, _ = _registry()
+    votes.inc("recorded")
+    votes.inc("recorded")
+    latency.observe(0.05, "db")
+    latency.observe(0.5, "db")
+    latency.observe(5.0, "db")
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE votes_total counter" in lines
+    assert 'votes_total{outcome="recorded"} 2' in lines
+    assert 'latency_seconds_bucket{stage="db",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{stage="db",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{stage="db",le="+Inf"} 3' in lines
+    assert 'latency_seconds_sum{stage="db"} 5.55' in lines
+    assert 'latency_seconds_count{stage="db"} 3' in lines
+
+
+def test_label_values_are_escaped():
+    registry, votes, _, _ = _registry()
+    votes.inc('a"b\\c')
+
+    assert 'votes_total{outcome="a\\"b\\\\c"} 1' in registry.render()
+
+
+def test_workers_are_merged():
+    first, votes_a, latency_a, flight_a = _registry()
+    second, votes_b, latency_b, flight_b = _registry()
+    votes_a.inc("recorded")
+    votes_b.inc("recorded", amount=2)
+    latency_a.observe(0.05, "db")
+    latency_b.observe(0.5, "db")
+    flight_a.set(1)
+    flight_b.set(3)
+
+    # Worker 20 has exited: its counts stay, its gauge goes
+    merged = merge_families(
+        [(10, first.families()), (20, second.families())],
+        alive=lambda pid: pid == 10,
+    )
+    by_name = {family["name"]: dict(family["samples"]) for family in merged}
+
+    assert by_name["votes_total"] == {(("outcome", "recorded"),): 3}
+    assert by_name["latency_seconds"] == {(("stage", "db"),): [[1, 1, 0], 0.55]}
+    assert by_name["in_flight"] == {(("pid", "10"),): 1}
+
+
+def test_multiprocess_render_reads_every_snapshot(tmp_path):
+    registry, votes, _, _ = _registry()
+    registry.enable_multiprocess(str(tmp_path))
+    votes.inc("recorded")
+
+    # Another worker's snapshot file
+    other, other_votes, _, _ = _registry()
+    other_votes.inc("recorded", amount=4)
+    (tmp_path / "1.json").write_text(json.dumps(other.families()))
+
+    assert 'votes_total{outcome="recorded"} 5' in registry.render().splitlines()
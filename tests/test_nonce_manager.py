@@ -0,0 +1,106 @@
+# tests/test_nonce_manager.py
+
+import multiprocessing
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from backend.services.blockchain_service import NonceManager
+
+
+class FakeNode:
+    """
+    Accepts a transaction only with nonce == pending count, like a node
+    that rejects reused nonces and gaps.
+    """
+
+    def __init__(self, pending, lock):
+        self.pending = pending          # multiprocessing.Value("i")
+        self.lock = lock
+        self.eth = SimpleNamespace(get_transaction_count=self._count)
+
+    def _count(self, address, block):
+        return self.pending.value
+
+    def send(self, nonce):
+        with self.lock:
+            if nonce != self.pending.value:
+                raise ValueError(f"Invalid transaction nonce: Expected {self.pending.value}, but got {nonce}")
+            self.pending.value += 1
+
+
+def _send_many(node, lock_path, count, fail_rate, seed):
+    rng = random.Random(seed)
+    manager = NonceManager(node, "0xsender", lock_path)
+    sent = failed = 0
+    for _ in range(count):
+        try:
+            with manager.reserve() as nonce:
+                if rng.random() < fail_rate:
+                    raise ConnectionError("RPC timeout before broadcast")
+                time.sleep(0.001)   # signing: let the other workers run
+                node.send(nonce)
+            sent += 1
+        except ConnectionError:
+            failed += 1
+    return sent, failed
+
+
+def _worker(pending, lock, lock_path, count, seed, results):
+    try:
+        results.put(_send_many(FakeNode(pending, lock), lock_path, count, 0.1, seed))
+    except ValueError as exc:
+        results.put(exc)
+
+
+def test_failed_sends_do_not_rewind_nonces_held_by_other_threads():
+    node = FakeNode(multiprocessing.Value("i", 7), threading.Lock())
+    manager = NonceManager(node, "0xsender")
+    rng = random.Random(1)
+
+    def send():
+        with manager.reserve() as nonce:
+            if rng.random() < 0.2:
+                raise ConnectionError("RPC timeout before broadcast")
+            node.send(nonce)
+
+    def attempt(_):
+        try:
+            send()
+            return True
+        except ConnectionError:
+            return False
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        outcomes = list(pool.map(attempt, range(200)))
+
+    assert node.pending.value == 7 + sum(outcomes)
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_worker_processes_share_the_sender(tmp_path):
+    ctx = multiprocessing.get_context("fork")
+    pending, lock = ctx.Value("i", 0), ctx.Lock()
+    results = ctx.Queue()
+    lock_path = str(tmp_path / "nonce.lock")
+
+    workers = [
+        ctx.Process(target=_worker, args=(pending, lock, lock_path, 100, seed, results))
+        for seed in range(3)
+    ]
+    for w in workers:
+        w.start()
+    outcomes = [results.get(timeout=60) for _ in workers]
+    for w in workers:
+        w.join(timeout=10)
+
+    errors = [o for o in outcomes if isinstance(o, Exception)]
+    assert not errors, errors
+
+    # Every successful send used the next nonce: no reuse, no gaps
+    assert pending.value == sum(sent for sent, _ in outcomes)
+    assert all(w.exitcode == 0 for w in workers)
@@ -0,0 +1,69 @@
+# tests/test_participation.py
+
+import threading
+
+import pytest
+from flask import Flask
+
+from backend.database import db
+from backend.models import Voter
+from backend.services.user_service import UserService
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'votes.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.session.add(Voter(id=1, name="v", enrollment="E1"))
+        db.session.commit()
+        yield app
+        db.session.remove()
+
+
+def test_second_claim_is_rejected(app):
+    service = UserService()
+
+    assert service.claim_participation(1001, 1) is not None
+    assert service.claim_participation(1001, 1) is None
+    assert service.has_voted(1001, 1)
+
+
+def test_racing_claims_record_one_vote(app):
+    service = UserService()
+    results = []
+    start = threading.Barrier(8)
+
+    def claim():
+        with app.app_context():
+            start.wait()
+            results.append(service.claim_participation(1001, 1) is not None)
+            db.session.remove()
+
+    threads = [threading.Thread(target=claim) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(results) == [False] * 7 + [True]
+
+
+def test_claims_are_per_election(app):
+    service = UserService()
+
+    assert service.claim_participation(1001, 1) is not None
+    assert service.claim_participation(1002, 1) is not None
+    assert not service.has_voted(1003, 1)
+
+
+def test_released_claim_can_be_made_again(app):
+    service = UserService()
+    participation = service.claim_participation(1001, 1)
+
+    service.release_participation(participation)
+
+    assert not service.has_voted(1001, 1)
+    assert service.claim_participation(1001, 1) is not None
@@ -0,0 +1,31 @@
+# tests/test_query_plans.py
+
+from sqlalchemy import create_engine
+
+from backend.utils.query_plans import check_engine, check_query_plans, hot_queries
+
+
+def test_every_hot_query_is_index_backed_on_sqlite():
+    ok, reports = check_query_plans()
+
+    scans = {
+        name: entry["full_scans"]
+        for name, entry in reports["sqlite"].items()
+        if entry["full_scans"]
+    }
+    assert ok, f"full table scans: {scans}"
+    assert set(reports["sqlite"]) == set(hot_queries())
+
+
+def test_a_query_on_an_unindexed_column_is_reported(monkeypatch):
+    # The check itself must notice a scan, or the test above proves nothing
+    from sqlalchemy import select
+    from backend.models import Voter
+    from backend.utils import query_plans
+
+    monkeypatch.setattr(query_plans, "hot_queries", lambda: {
+        "voter_by_name": select(Voter.id).where(Voter.name == "x"),
+    })
+    report = check_engine(create_engine("sqlite://"))
+
+    assert report["voter_by_name"]["full_scans"]
@@ -0,0 +1,58 @@
+# tests/test_vote_route.py
+
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+from backend.database import db
+from backend.models import Candidate, Election, Voter
+from backend.routes.voter_routes import voter_bp
+from backend.services import blockchain_service
+from backend.services.chain_common import VoteNotRecorded
+from backend.services.election_service import election_cache
+from backend.services.user_service import UserService
+
+
+@pytest.fixture
+def client(tmp_path):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'votes.db'}"
+    db.init_app(app)
+    app.register_blueprint(voter_bp)
+    with app.app_context():
+        db.create_all()
+        db.session.add(Election(id=1001, name="E", contract_address="0x" + "a" * 40, is_active=True))
+        db.session.add(Candidate(id=1, name="Alice", election_id=1001, on_chain_id=1))
+        db.session.add(Voter(id=1, name="v", enrollment="E1", voter_hash="ab" * 32))
+        db.session.commit()
+        election_cache.invalidate()
+        yield app.test_client()
+        election_cache.invalidate()
+        db.session.remove()
+
+
+def _chain_rejects(monkeypatch, error):
+    def submit_vote(*args):
+        raise error
+
+    service = SimpleNamespace(submit_vote=submit_vote)
+    monkeypatch.setattr(blockchain_service, "get_blockchain_service", lambda: service)
+
+
+def test_rejected_candidate_releases_the_claim(client, monkeypatch):
+    _chain_rejects(monkeypatch, VoteNotRecorded("Vote not recorded: candidate rejected by the contract"))
+
+    response = client.post("/voter/vote", json={"voter_id": 1, "candidate_id": 1})
+
+    assert response.status_code == 400
+    assert not UserService().has_voted(1001, 1)
+
+
+def test_hash_that_already_voted_keeps_the_claim(client, monkeypatch):
+    _chain_rejects(monkeypatch, VoteNotRecorded("Already voted", already_voted=True))
+
+    response = client.post("/voter/vote", json={"voter_id": 1, "candidate_id": 1})
+
+    assert response.status_code == 403
+    assert UserService().has_voted(1001, 1)